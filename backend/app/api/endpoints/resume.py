@@ -1,24 +1,142 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from fastapi.responses import JSONResponse
-from typing import Dict, Any, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, UploadFile, File, Form
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from typing import AsyncIterator, Dict, Any, List, Literal, Optional
+import json
 import tempfile
 import os
 import logging
-from app.services.resume_analyzer import ResumeAnalyzer
-from app.models.resume_analysis import ResumeAnalysisRequest
-from app.utils.validation import ResumeAnalysisResponse, validate_analysis_response
+from app.services.resume_analyzer import AnalysisNotFoundError, ResumeAnalyzer
+from app.services.resume_analyzer.pipeline import empty_token_usage
+from app.models.resume_analysis import RankingRequest, ResumeAnalysisRequest
+from app.utils.validation import (
+    PointRationaleResponse,
+    RankingResponse,
+    ResumeAnalysisResponse,
+    ValidatedResponse,
+    dump_analysis_response,
+    validate_analysis_response
+)
+from app.core import metrics
 from app.dependencies import get_resume_analyzer
-from app.utils.file_utils import extract_text_from_pdf, extract_text_from_docx
+from app.services.response_cache import CachedResponse, etag_matches, make_etag
+from app.utils.file_utils import (
+    FileTooLargeError,
+    detect_file_type,
+    extract_text_from_docx,
+    extract_text_from_pdf,
+    save_upload_to_file
+)
+from app.core.config import settings
+from app.core.tracing import set_attributes, traced
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+async def _read_upload_text(file: UploadFile) -> str:
+    """
+    Extract the text of an uploaded PDF or DOCX resume.
+    
+    Raises:
+        HTTPException: 413 for oversized files, 400 for unsupported or unreadable ones
+    """
+    # Reject oversized uploads early when the size is already known
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE_BYTES:
+        logger.warning("Upload too large: %s (%s bytes)", file.filename, file.size)
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE_BYTES} bytes."
+        )
+
+    temp_file_path = ""
+    try:
+        # Stream uploaded file to disk, counting bytes as chunks arrive
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file, metrics.time_stage("upload"):
+            temp_file_path = temp_file.name
+            await save_upload_to_file(
+                file,
+                temp_file,
+                max_bytes=settings.MAX_UPLOAD_SIZE_BYTES,
+                chunk_size=settings.UPLOAD_CHUNK_SIZE
+            )
+
+        # Validate file type from its content, not its name
+        file_type = detect_file_type(temp_file_path)
+        if file_type is None:
+            logger.warning("Invalid file type: %s", file.filename)
+            raise HTTPException(
+                status_code=400,
+                detail="Unsupported file type. Please upload a PDF or DOCX file."
+            )
+
+        # Extract text based on file type
+        with metrics.time_stage("extract"):
+            if file_type == "pdf":
+                resume_text = extract_text_from_pdf(temp_file_path, max_pages=settings.MAX_PDF_PAGES)
+            else:  # docx
+                resume_text = extract_text_from_docx(temp_file_path)
+
+        if not resume_text or not resume_text.strip():
+            logger.error("Empty text extracted from file")
+            raise HTTPException(
+                status_code=400,
+                detail="Could not extract text from the uploaded file"
+            )
+        return resume_text
+
+    except FileTooLargeError as e:
+        logger.warning("Upload rejected: %s", e)
+        raise HTTPException(
+            status_code=413,
+            detail=str(e)
+        )
+    except ValueError as e:
+        logger.error("Text extraction failed: %s", e)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to extract text from file: {str(e)}"
+        )
+    finally:
+        # Clean up temporary file
+        if temp_file_path and os.path.exists(temp_file_path):
+            try:
+                os.unlink(temp_file_path)
+            except Exception as e:
+                logger.warning("Failed to clean up temporary file %s: %s", temp_file_path, e)
+
+def _serialize_analysis(response: Dict[str, Any]) -> bytes:
+    """Serialize a validated analysis, timed as a stage."""
+    with metrics.time_stage("serialize"):
+        return dump_analysis_response(response)
+
+def _analysis_response(cached: CachedResponse, if_none_match: Optional[str], safe: bool = True) -> Response:
+    """
+    Send a serialized analysis. A client that already has this version gets a
+    304 on GET, and a 412 on POST, where a 304 is not allowed (RFC 9110).
+    """
+    headers = {"ETag": cached.etag}
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304 if safe else 412, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+def _new_analysis_response(analyzer: ResumeAnalyzer, analysis_id: Optional[str], response: Dict[str, Any]) -> Response:
+    """
+    Send a new analysis with its token usage, and cache it without, like a
+    stored analysis: replaying it spends nothing.
+    """
+    body = _serialize_analysis(response)
+    if settings.RESPONSE_CACHE_ENABLED:
+        analyzer.cache_response(
+            analysis_id, _serialize_analysis(ValidatedResponse({**response, "tokenUsage": empty_token_usage()}))
+        )
+    return Response(content=body, media_type="application/json", headers={"ETag": make_etag(body)})
+
 @router.post("/analyze", response_model=ResumeAnalysisResponse)
 async def analyze_resume(
     request: ResumeAnalysisRequest,
-    analyzer: ResumeAnalyzer = Depends(get_resume_analyzer)
-) -> Dict[str, Any]:
+    analyzer: ResumeAnalyzer = Depends(get_resume_analyzer),
+    if_none_match: Optional[str] = Header(None)
+) -> Response:
     """
     Analyze a resume text and optionally match against a job description.
     """
@@ -32,13 +150,23 @@ async def analyze_resume(
                 detail="Empty resume text provided"
             )
 
+        job_description = request.job_description if request.job_description else None
+        analysis_id = analyzer.analysis_id(
+            request.resume_text, job_description, request.analysis_mode, request.include_improvements
+        )
+        cached = analyzer.get_cached_response(analysis_id) if analysis_id else None
+        if cached is not None:
+            return _analysis_response(cached, if_none_match, safe=False)
+
         result = await analyzer.analyze_resume(
             resume_text=request.resume_text,
-            job_description=request.job_description if request.job_description else None
+            job_description=job_description,
+            analysis_mode=request.analysis_mode,
+            include_improvements=request.include_improvements
         )
         
         if result.get("status") == "error":
-            logger.error(f"Analysis failed: {result.get('message')}")
+            logger.error("Analysis failed: %s", result.get("message"))
             raise HTTPException(
                 status_code=400,
                 detail=result.get("message", "Analysis failed")
@@ -47,93 +175,242 @@ async def analyze_resume(
         # Validate the response format
         validated_response = validate_analysis_response(result)
         if validated_response.get("status") == "error":
-            logger.error(f"Response validation failed: {validated_response.get('message')}")
+            logger.error("Response validation failed: %s", validated_response.get("message"))
             raise HTTPException(
                 status_code=500,
                 detail=f"Invalid analysis response format: {validated_response.get('message')}"
             )
             
-        return validated_response
+        return _new_analysis_response(analyzer, analysis_id, validated_response)
         
     except Exception as e:
-        logger.error(f"Unexpected error in analyze_resume: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in analyze_resume: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=str(e)
         )
 
-@router.post("/analyze/file", response_model=ResumeAnalysisResponse)
-async def analyze_resume_file(
-    file: UploadFile = File(...),
-    job_description: Optional[str] = Form(None),
+@router.get("/analysis/{analysis_id}", response_model=ResumeAnalysisResponse)
+async def get_analysis(
+    analysis_id: str,
+    analyzer: ResumeAnalyzer = Depends(get_resume_analyzer),
+    if_none_match: Optional[str] = Header(None)
+) -> Response:
+    """
+    Get an earlier analysis from storage without regenerating it.
+    """
+    cached = analyzer.get_cached_response(analysis_id)
+    if cached is None:
+        try:
+            result = await analyzer.get_analysis(analysis_id)
+        except AnalysisNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        cached = analyzer.cache_response(analysis_id, _serialize_analysis(result))
+    return _analysis_response(cached, if_none_match)
+
+@router.get(
+    "/analysis/{analysis_id}/sections/{section_index}/points/{point_index}/rationale",
+    response_model=PointRationaleResponse
+)
+async def get_point_rationale(
+    analysis_id: str,
+    section_index: int,
+    point_index: int,
     analyzer: ResumeAnalyzer = Depends(get_resume_analyzer)
 ) -> Dict[str, Any]:
     """
-    Analyze a resume file (PDF or DOCX) and provide detailed feedback.
+    Get the STAR rationales for a single point of an earlier analysis.
     """
-    temp_file_path = ""
-    logger.debug(f"Starting file analysis for {file.filename}")
     try:
-        # Validate file type
-        if not file.filename.lower().endswith(('.pdf', '.docx')):
-            logger.warning(f"Invalid file type: {file.filename}")
-            raise HTTPException(
-                status_code=400,
-                detail="Unsupported file type. Please upload a PDF or DOCX file."
-            )
+        result = await analyzer.explain_point(analysis_id, section_index, point_index)
+    except AnalysisNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if result.get("status") == "error":
+        logger.error("Point rationale failed: %s", result.get("message"))
+        raise HTTPException(
+            status_code=400,
+            detail=result.get("message", "Point rationale failed")
+        )
+    return result
 
-        # Save uploaded file
-        suffix = '.pdf' if file.filename.lower().endswith('.pdf') else '.docx'
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            temp_file_path = temp_file.name
-            content = await file.read()
-            temp_file.write(content)
+async def _prepend(first_chunk: str, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Stream a chunk that was already read, then the rest."""
+    if first_chunk:
+        yield first_chunk
+    async for chunk in chunks:
+        yield chunk
 
-        try:
-            # Extract text based on file type
-            if temp_file_path.lower().endswith('.pdf'):
-                resume_text = extract_text_from_pdf(temp_file_path)
-            else:  # .docx
-                resume_text = extract_text_from_docx(temp_file_path)
+@router.get("/analysis/{analysis_id}/sections/{section_index}/points/{point_index}/improvement")
+async def get_point_improvement(
+    analysis_id: str,
+    section_index: int,
+    point_index: int,
+    analyzer: ResumeAnalyzer = Depends(get_resume_analyzer)
+) -> StreamingResponse:
+    """
+    Stream an improved version of a single point of an earlier analysis.
+    """
+    try:
+        chunks = await analyzer.improve_point(analysis_id, section_index, point_index)
+    except AnalysisNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Wait for the first chunk, so a failed LLM call is an error status rather than a cut-off 200
+    try:
+        first_chunk = await anext(chunks, "")
+    except Exception as e:
+        logger.error("Point improvement failed: %s", e, exc_info=not metrics.is_rate_limit_error(e))
+        raise HTTPException(status_code=502, detail=f"Point improvement failed: {e}")
+    return StreamingResponse(_prepend(first_chunk, chunks), media_type="text/plain; charset=utf-8")
 
-            if not resume_text or not resume_text.strip():
-                logger.error("Empty text extracted from file")
-                raise HTTPException(
-                    status_code=400,
-                    detail="Could not extract text from the uploaded file"
-                )
+@router.post("/analyze/file", response_model=ResumeAnalysisResponse)
+@traced("analyze_resume_file")
+async def analyze_resume_file(
+    file: UploadFile = File(...),
+    job_description: Optional[str] = Form(None),
+    analysis_mode: Literal["full", "compact"] = Form("full"),
+    include_improvements: bool = Form(True),
+    analyzer: ResumeAnalyzer = Depends(get_resume_analyzer),
+    if_none_match: Optional[str] = Header(None)
+) -> Response:
+    """
+    Analyze a resume file (PDF or DOCX) and provide detailed feedback.
+    """
+    logger.debug("Starting file analysis for %s", file.filename)
+    try:
+        resume_text = await _read_upload_text(file)
+        analysis_id = analyzer.analysis_id(resume_text, job_description, analysis_mode, include_improvements)
+        cached = analyzer.get_cached_response(analysis_id) if analysis_id else None
+        set_attributes(resume__characters=len(resume_text), response_cache__hit=cached is not None)
+        if cached is not None:
+            return _analysis_response(cached, if_none_match, safe=False)
 
-            # Analyze the extracted text
-            result = await analyzer.analyze_resume(resume_text, job_description)
-            
-            # Validate response format
-            validated_response = validate_analysis_response(result)
-            if validated_response.get("status") == "error":
-                logger.error(f"Response validation failed: {validated_response.get('message')}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Invalid analysis response format: {validated_response.get('message')}"
-                )
-                
-            return validated_response
-
-        except ValueError as e:
-            logger.error(f"Text extraction failed: {str(e)}")
+        # Analyze the extracted text
+        result = await analyzer.analyze_resume(
+            resume_text, job_description, analysis_mode, include_improvements
+        )
+        
+        # Validate response format
+        validated_response = validate_analysis_response(result)
+        if validated_response.get("status") == "error":
+            logger.error("Response validation failed: %s", validated_response.get("message"))
             raise HTTPException(
-                status_code=400,
-                detail=f"Failed to extract text from file: {str(e)}"
+                status_code=500,
+                detail=f"Invalid analysis response format: {validated_response.get('message')}"
             )
+            
+        return _new_analysis_response(analyzer, analysis_id, validated_response)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Unexpected error in analyze_resume_file: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in analyze_resume_file: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=str(e)
         )
-    finally:
-        # Clean up temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-            except Exception as e:
-                logger.warning(f"Failed to clean up temporary file {temp_file_path}: {str(e)}") 
\ No newline at end of file
+
+def _ranking_page(
+    update: Dict[str, Any],
+    candidate_ids: List[Optional[str]],
+    page: int,
+    page_size: int
+) -> Dict[str, Any]:
+    """Cut one page out of a ranking update and label its resumes."""
+    start = (page - 1) * page_size
+    rankings = [
+        {**ranking, "candidateId": candidate_ids[ranking["index"]]}
+        for ranking in update["rankings"][start:start + page_size]
+    ]
+    return {
+        "status": "success",
+        "total": len(update["rankings"]),
+        "page": page,
+        "pageSize": page_size,
+        "completed": update["completed"],
+        "matchTotal": update["total"],
+        "rankings": rankings,
+        "tokenUsage": update["tokenUsage"]
+    }
+
+async def _rank(
+    analyzer: ResumeAnalyzer,
+    resumes: List[str],
+    candidate_ids: List[Optional[str]],
+    job_description: str,
+    top_k: Optional[int],
+    page: int,
+    page_size: int,
+    stream: bool
+) -> Any:
+    """Rank resumes and return one page, or stream the page as scores arrive."""
+    if not resumes:
+        raise HTTPException(status_code=400, detail="No resumes to rank")
+    if len(resumes) > settings.RANKING_MAX_RESUMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many resumes. Maximum is {settings.RANKING_MAX_RESUMES} per ranking."
+        )
+    try:
+        updates = await analyzer.stream_rankings(resumes, job_description, top_k)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if stream:
+        async def lines():
+            async for update in updates:
+                yield json.dumps(_ranking_page(update, candidate_ids, page, page_size)) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    update = None
+    async for update in updates:
+        pass
+    return _ranking_page(update, candidate_ids, page, page_size)
+
+@router.post("/rank", response_model=RankingResponse)
+async def rank_resumes(
+    request: RankingRequest,
+    analyzer: ResumeAnalyzer = Depends(get_resume_analyzer)
+) -> Any:
+    """
+    Rank earlier analyses and resume texts against a job description.
+    """
+    try:
+        resumes = [await analyzer.get_resume_text(analysis_id) for analysis_id in request.analysis_ids]
+    except AnalysisNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    resumes += request.resumes
+    candidate_ids = [*request.analysis_ids, *[None] * len(request.resumes)]
+    return await _rank(
+        analyzer, resumes, candidate_ids, request.job_description,
+        request.top_k, request.page, request.page_size, request.stream
+    )
+
+@router.post("/rank/files", response_model=RankingResponse)
+async def rank_resume_files(
+    files: List[UploadFile] = File(...),
+    job_description: str = Form(...),
+    top_k: Optional[int] = Form(None, ge=0),
+    page: int = Form(1, ge=1),
+    page_size: int = Form(20, ge=1, le=100),
+    stream: bool = Form(False),
+    analyzer: ResumeAnalyzer = Depends(get_resume_analyzer)
+) -> Any:
+    """
+    Rank uploaded resume files (PDF or DOCX) against a job description.
+    """
+    if len(files) > settings.RANKING_MAX_RESUMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many resumes. Maximum is {settings.RANKING_MAX_RESUMES} per ranking."
+        )
+    resumes = [await _read_upload_text(file) for file in files]
+    return await _rank(
+        analyzer, resumes, [file.filename for file in files], job_description,
+        top_k, page, page_size, stream
+    )
@@ -12,9 +12,11 @@ class Settings(BaseSettings):
     # OpenAI settings
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4.1-mini-2025-04-14")
+    OPENAI_LARGE_MODEL: str = os.getenv("OPENAI_LARGE_MODEL", "gpt-4o-2024-08-06")
     
-    # Token cost settings (per token)
+    # Token cost settings (per 1K tokens), for models without known pricing in app/services/pricing.py
     COST_PER_INPUT_TOKEN: float = 0.0004  # $0.4 per 1M input tokens
+    COST_PER_CACHED_INPUT_TOKEN: float = 0.0001  # $0.1 per 1M cached input tokens
     COST_PER_OUTPUT_TOKEN: float = 0.0016  # $1.6 per 1M output tokens
     
     # API settings
@@ -30,6 +32,33 @@ class Settings(BaseSettings):
     # Rate limiting
     RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
     
+    # Upload limits
+    MAX_UPLOAD_SIZE_BYTES: int = int(os.getenv("MAX_UPLOAD_SIZE_BYTES", str(5 * 1024 * 1024)))  # 5MB
+    MAX_PDF_PAGES: int = int(os.getenv("MAX_PDF_PAGES", "10"))
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(64 * 1024)))  # 64KB
+    
+    # Analysis settings
+    PRE_ANALYSIS_ENABLED: bool = os.getenv("PRE_ANALYSIS_ENABLED", "True").lower() == "true"
+    MODEL_ROUTING_ENABLED: bool = os.getenv("MODEL_ROUTING_ENABLED", "True").lower() == "true"
+    MODEL_ESCALATION_ENABLED: bool = os.getenv("MODEL_ESCALATION_ENABLED", "True").lower() == "true"
+    SMALL_MODEL_MAX_TOKENS: int = int(os.getenv("SMALL_MODEL_MAX_TOKENS", "1500"))
+    MAX_PROMPT_TOKENS: int = int(os.getenv("MAX_PROMPT_TOKENS", "20000"))  # Per analysis, 0 for no limit
+    RANKING_TOP_K: int = int(os.getenv("RANKING_TOP_K", "10"))
+    RANKING_CONCURRENCY: int = int(os.getenv("RANKING_CONCURRENCY", "5"))
+    RANKING_MAX_RESUMES: int = int(os.getenv("RANKING_MAX_RESUMES", "500"))
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "True").lower() == "true"
+    
+    # Observability
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    EVENT_LOOP_LAG_INTERVAL_MS: int = int(os.getenv("EVENT_LOOP_LAG_INTERVAL_MS", "100"))  # 0 disables
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "")  # "", "console" or "otlp"
+    TRACING_SERVICE_NAME: str = os.getenv("TRACING_SERVICE_NAME", "resume-analyzer-api")
+    
+    # Logging
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")  # "json" or "text"
+    LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))  # Share of hot-path debug logs kept
+    
     class Config:
         """Pydantic config."""
         env_file = ".env"
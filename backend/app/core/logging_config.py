@@ -0,0 +1,127 @@
+"""Logging setup.
+
+Records are put on a queue by the thread that logs them and written by a
+listener thread, so request handlers never wait on log I/O. Lines are JSON
+objects (LOG_FORMAT=json) or plain text (LOG_FORMAT=text), at LOG_LEVEL.
+Loggers on the hot path, such as the cache's, only pass LOG_SAMPLE_RATE of
+their records below WARNING.
+
+Log with lazy %-formatting, logger.debug("Cache hit for %s", key), so
+filtered records are never formatted; fields given as `extra` become keys
+of the JSON object.
+"""
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, TextIO
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from app.core.config import settings
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Loggers called on every request, whose records below WARNING are sampled
+HOT_PATH_LOGGERS = ("app.services.cache",)
+
+# Attributes every record has, as opposed to fields passed as `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class SamplingFilter(logging.Filter):
+    """Passes a fraction of the records below WARNING and all others."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Queues records with their message merged but everything else unformatted.
+
+    The default QueueHandler formats whole records, tracebacks included, in
+    the logging thread; here that is left to the listener's formatter.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now, they may change before the listener gets to them
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+def configure_logging(
+    level: Optional[str] = None,
+    log_format: Optional[str] = None,
+    sample_rate: Optional[float] = None,
+    stream: Optional[TextIO] = None
+) -> QueueListener:
+    """
+    Send all logging through a queue to one stream, replacing earlier configuration.
+
+    Args:
+        level: Root log level name, defaults to the LOG_LEVEL setting
+        log_format: "json" or "text", defaults to the LOG_FORMAT setting
+        sample_rate: Fraction of hot-path records below WARNING to keep, defaults to LOG_SAMPLE_RATE
+        stream: Stream to write to, defaults to stderr
+
+    Returns:
+        QueueListener: The started listener writing the records
+    """
+    global _listener
+    level = (level or settings.LOG_LEVEL).upper()
+    log_format = (log_format or settings.LOG_FORMAT).lower()
+    sample_rate = settings.LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+
+    stop_logging()
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(records, handler)
+    _listener.start()
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_DeferredQueueHandler(records))
+    root.setLevel(level)
+
+    for name in HOT_PATH_LOGGERS:
+        hot_logger = logging.getLogger(name)
+        for existing in [f for f in hot_logger.filters if isinstance(f, SamplingFilter)]:
+            hot_logger.removeFilter(existing)
+        if sample_rate < 1:
+            hot_logger.addFilter(SamplingFilter(sample_rate))
+    return _listener
+
+def stop_logging() -> None:
+    """Write out the queued records and stop the listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop_logging)
@@ -0,0 +1,138 @@
+"""Prometheus metrics for requests, analysis stages, LLM calls, caches and the event loop."""
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+import asyncio
+import time
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# Analyses take from milliseconds (cache hits) to tens of seconds (LLM calls)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+# Cache calls and event loop stalls take from microseconds to seconds
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+REQUEST_SECONDS = Histogram(
+    "resume_api_request_duration_seconds",
+    "Time to handle an HTTP request",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+STAGE_SECONDS = Histogram(
+    "resume_analysis_stage_duration_seconds",
+    "Time spent in one stage of an analysis, including upload extraction and serialization",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_SECONDS = Histogram(
+    "resume_llm_request_duration_seconds",
+    "Time from sending an LLM request to its complete response",
+    ["operation", "model"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_FIRST_TOKEN_SECONDS = Histogram(
+    "resume_llm_time_to_first_token_seconds",
+    "Time from sending an LLM request to its first output, equal to the total for unstreamed calls",
+    ["operation", "model"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter("resume_llm_tokens", "Tokens used by LLM calls", ["model", "kind"])
+LLM_COST = Counter("resume_llm_cost_dollars", "Estimated cost of LLM calls in dollars", ["model"])
+LLM_RETRIES = Counter("resume_llm_retries", "LLM calls retried after an error", ["operation"])
+LLM_ERRORS = Counter("resume_llm_errors", "Failed LLM calls, by reason", ["operation", "reason"])
+CACHE_LOOKUPS = Counter("resume_cache_lookups", "Cache lookups by key namespace and result", ["namespace", "result"])
+CACHE_SECONDS = Histogram(
+    "resume_cache_operation_duration_seconds",
+    "Time spent in cache calls by backend and operation; Redis calls block the event loop",
+    ["backend", "operation"],
+    buckets=FAST_BUCKETS
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "resume_event_loop_lag_seconds",
+    "How late a periodic timer fires on the event loop, the time the loop was blocked",
+    buckets=FAST_BUCKETS
+)
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Record the duration of one stage."""
+    STAGE_SECONDS.labels(stage=stage).observe(seconds)
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    """Record the duration of the enclosed block as a stage."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+def _amount(value: Any) -> float:
+    """A usage value as a non-negative float, 0 for anything that is not a number."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return 0.0
+    return max(0.0, float(value))
+
+def record_llm_call(
+    operation: str,
+    model: str,
+    seconds: float,
+    token_usage: Mapping[str, Any],
+    first_token_seconds: Optional[float] = None
+) -> None:
+    """Record the latency, tokens and cost of a successful LLM call."""
+    LLM_SECONDS.labels(operation=operation, model=model).observe(seconds)
+    LLM_FIRST_TOKEN_SECONDS.labels(operation=operation, model=model).observe(
+        seconds if first_token_seconds is None else first_token_seconds
+    )
+    cached_tokens = _amount(token_usage.get("cached_tokens"))
+    prompt_tokens = _amount(token_usage.get("prompt_tokens"))
+    LLM_TOKENS.labels(model=model, kind="prompt").inc(max(0.0, prompt_tokens - cached_tokens))
+    LLM_TOKENS.labels(model=model, kind="cached_prompt").inc(cached_tokens)
+    LLM_TOKENS.labels(model=model, kind="completion").inc(_amount(token_usage.get("completion_tokens")))
+    LLM_COST.labels(model=model).inc(_amount(token_usage.get("total_cost")))
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether an error is an HTTP 429 from the LLM provider."""
+    return getattr(error, "status_code", None) == 429
+
+def record_llm_error(operation: str, error: BaseException) -> None:
+    """Count a failed LLM call, separating rate limiting from other errors."""
+    reason = "rate_limited" if is_rate_limit_error(error) else "error"
+    LLM_ERRORS.labels(operation=operation, reason=reason).inc()
+
+def record_llm_retry(operation: str) -> None:
+    """Count a retried LLM call."""
+    LLM_RETRIES.labels(operation=operation).inc()
+
+def cache_namespace(key: str) -> str:
+    """Namespace of a cache key, its part before the first colon, for low-cardinality labels."""
+    namespace, separator, _ = key.partition(":")
+    return namespace if separator else "default"
+
+def record_cache_lookup(key: str, hit: bool) -> None:
+    """Count a cache hit or miss."""
+    CACHE_LOOKUPS.labels(namespace=cache_namespace(key), result="hit" if hit else "miss").inc()
+
+@contextmanager
+def time_cache_operation(backend: str, operation: str) -> Iterator[None]:
+    """Record the duration of the enclosed cache call."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        CACHE_SECONDS.labels(backend=backend, operation=operation).observe(time.perf_counter() - started)
+
+async def monitor_event_loop_lag(interval: float) -> None:
+    """Record, until cancelled, how much later than due a timer fires every interval seconds."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - started - interval))
+
+def record_stage_timings(timings: Dict[str, float]) -> None:
+    """Record the stage durations of one analysis."""
+    for stage, seconds in timings.items():
+        record_stage(stage, seconds)
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Metrics in the Prometheus text format, with their content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
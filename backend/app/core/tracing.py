@@ -0,0 +1,147 @@
+"""Optional OpenTelemetry tracing.
+
+Spans are recorded only when TRACING_EXPORTER is set and the OpenTelemetry
+SDK is installed; otherwise span() hands out a shared no-op span, so
+instrumented code costs next to nothing. Exporters:
+
+    console  print finished spans to stdout
+    otlp     send spans over OTLP/HTTP to a collector, by default
+             http://localhost:4318, or OTEL_EXPORTER_OTLP_ENDPOINT
+
+Attribute names are passed as keyword arguments, with a double underscore
+for each dot: span("cache.get", cache__hit=True).
+"""
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+import logging
+from app.core.config import settings
+
+try:
+    from opentelemetry import trace
+except ImportError:  # Tracing is optional
+    trace = None
+
+logger = logging.getLogger(__name__)
+
+TRACER_NAME = "resume-analyzer"
+
+_tracer = None
+
+T = TypeVar("T")
+
+class _NoopSpan:
+    """Stand-in for a span while tracing is off."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[dict] = None) -> None:
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+def _span_exporter(exporter: str) -> Any:
+    """The SDK span exporter for a TRACING_EXPORTER value."""
+    if exporter == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    raise ValueError(f"Unknown tracing exporter: {exporter}")
+
+def configure_tracing(exporter: Optional[str] = None, span_processor: Any = None) -> bool:
+    """
+    Start recording spans.
+
+    Args:
+        exporter: "console" or "otlp", defaults to the TRACING_EXPORTER setting
+        span_processor: Processor to use instead of batching spans to the exporter, e.g. in tests
+
+    Returns:
+        bool: Whether tracing is on
+    """
+    global _tracer
+    exporter = (exporter if exporter is not None else settings.TRACING_EXPORTER).lower()
+    if not exporter and span_processor is None:
+        return False
+    if trace is None:
+        logger.warning("Tracing requested but OpenTelemetry is not installed")
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        provider = TracerProvider(resource=Resource.create({
+            "service.name": settings.TRACING_SERVICE_NAME
+        }))
+        provider.add_span_processor(span_processor or BatchSpanProcessor(_span_exporter(exporter)))
+    except (ImportError, ValueError) as e:
+        logger.warning("Tracing disabled: %s", e)
+        return False
+
+    # Use the provider directly, the global one can only be set once per process
+    _tracer = provider.get_tracer(TRACER_NAME)
+    logger.info("Tracing enabled with the %s exporter", exporter or "given")
+    return True
+
+def disable_tracing() -> None:
+    """Stop recording spans."""
+    global _tracer
+    _tracer = None
+
+def tracing_enabled() -> bool:
+    return _tracer is not None
+
+@contextmanager
+def span(name: str, current: bool = True, **attributes: Any) -> Iterator[Any]:
+    """
+    Record the enclosed block as a span, a child of the current one.
+    Exceptions are recorded on the span and re-raised.
+
+    Args:
+        name: Span name
+        current: Whether spans started in the block are its children. Pass False
+            in async generators, whose blocks may end in another context.
+        attributes: Span attributes
+    """
+    if _tracer is None:
+        yield _NOOP_SPAN
+        return
+    if current:
+        with _tracer.start_as_current_span(name, attributes=_clean(attributes)) as started:
+            yield started
+        return
+    started = _tracer.start_span(name, attributes=_clean(attributes))
+    try:
+        yield started
+    except BaseException as e:
+        started.record_exception(e)
+        started.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
+        raise
+    finally:
+        started.end()
+
+def set_attributes(**attributes: Any) -> None:
+    """Set attributes on the current span, if any."""
+    if _tracer is None:
+        return
+    current = trace.get_current_span()
+    for key, value in _clean(attributes).items():
+        current.set_attribute(key, value)
+
+def traced(name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Record every call of an async function as a span."""
+    def decorator(function: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @wraps(function)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            with span(name):
+                return await function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _clean(attributes: dict) -> dict:
+    """Attributes with dots for underscores in their names, without None values, which spans reject."""
+    return {key.replace("__", "."): value for key, value in attributes.items() if value is not None}
@@ -1,20 +1,44 @@
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from app.api.endpoints import resume
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+from app.core.tracing import configure_tracing
+from openai import OpenAIError
+import asyncio
 import logging
+import time
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# Errors of known cause, logged on one line; anything else gets its traceback
+EXPECTED_ERRORS = (HTTPException, OpenAIError)
+
+# Record spans when TRACING_EXPORTER is set
+configure_tracing()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Configure logging and watch event loop lag while the app serves requests."""
+    # Level and format come from LOG_LEVEL and LOG_FORMAT; done here so importing the app leaves logging alone
+    configure_logging()
+    monitor = None
+    if settings.METRICS_ENABLED and settings.EVENT_LOOP_LAG_INTERVAL_MS > 0:
+        monitor = asyncio.create_task(
+            metrics.monitor_event_loop_lag(settings.EVENT_LOOP_LAG_INTERVAL_MS / 1000)
+        )
+    yield
+    if monitor is not None:
+        monitor.cancel()
+
 app = FastAPI(
     title="Resume Analyzer API",
     description="API for analyzing and providing feedback on resumes",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -29,10 +53,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record the duration of every request by route template, so paths with IDs share a series."""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.REQUEST_SECONDS.labels(
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status)
+        ).observe(time.perf_counter() - started)
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler to ensure consistent error responses."""
-    logger.error(f"Global exception handler caught: {str(exc)}", exc_info=True)
+    extra = {"method": request.method, "path": request.url.path}
+    if isinstance(exc, EXPECTED_ERRORS):
+        logger.error("Global exception handler caught %s: %s", type(exc).__name__, exc, extra=extra)
+    else:
+        logger.error("Global exception handler caught: %s", exc, exc_info=exc, extra=extra)
     return JSONResponse(
         status_code=500,
         content={
@@ -54,4 +99,11 @@ async def root():
 @app.get("/health")
 async def health_check():
     logger.debug("Health check endpoint called")
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"} 
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        """Metrics in the Prometheus text format."""
+        body, content_type = metrics.render_metrics()
+        return Response(content=body, media_type=content_type)
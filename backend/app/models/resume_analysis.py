@@ -1,19 +1,38 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Literal, Optional
 from pydantic import BaseModel, Field
-from app.utils.validation import ResumeAnalysisResponse, TokenUsage
+from app.utils.validation import RankingResponse, ResumeAnalysisResponse, TokenUsage
 
 class ResumeAnalysisRequest(BaseModel):
     """Request model for resume analysis."""
     resume_text: str = Field(..., min_length=1, description="The text content of the resume to analyze")
     job_description: Optional[str] = Field(None, description="Optional job description to match against")
+    analysis_mode: Literal["full", "compact"] = Field(
+        "full",
+        description="Compact mode skips rationales and improvements, which can be fetched per point later"
+    )
+    include_improvements: bool = Field(
+        True,
+        description="Generate an improvement for every point up front instead of on demand"
+    )
+
+class RankingRequest(BaseModel):
+    """Request model for ranking resumes against a job description."""
+    job_description: str = Field(..., min_length=1, description="The job description to rank against")
+    analysis_ids: List[str] = Field(default_factory=list, description="Ids of earlier analyses whose resumes to rank")
+    resumes: List[str] = Field(default_factory=list, description="Resume texts to rank, after those of analysis_ids")
+    top_k: Optional[int] = Field(None, ge=0, description="Number of pre-scored resumes that get a detailed LLM match")
+    page: int = Field(1, ge=1, description="Page of the ranking to return")
+    page_size: int = Field(20, ge=1, le=100, description="Rankings per page")
+    stream: bool = Field(False, description="Stream NDJSON updates of the ranking as match scores arrive")
 
 # Export the response model from utils
-__all__ = ['ResumeAnalysisRequest', 'ResumeAnalysisResponse']
+__all__ = ['ResumeAnalysisRequest', 'ResumeAnalysisResponse', 'RankingRequest', 'RankingResponse']
 
 class TokenUsage(BaseModel):
     total_tokens: int
     prompt_tokens: int
     completion_tokens: int
+    cached_tokens: int = 0
     total_cost: float
 
 class Scores(BaseModel):
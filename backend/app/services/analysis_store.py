@@ -0,0 +1,252 @@
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+import os
+
+logger = logging.getLogger(__name__)
+
+# Record fields that can be used to look analyses up
+INDEXED_FIELDS = ("resume_hash", "job_hash", "model", "prompt_version")
+
+# Saves between two sweeps for expired and surplus records
+PRUNE_INTERVAL = 100
+
+class AnalysisStoreBase:
+    """
+    Abstract base class for durable analysis storage.
+
+    A record is a dict with analysis_id, resume_hash, job_hash (None when no
+    job was matched), model, prompt_version, analysis_mode, resume_text,
+    result (the response returned to the client) and created_at (seconds
+    since the epoch, set on save when missing).
+
+    Records older than retention_seconds, and the oldest beyond max_records,
+    are pruned every PRUNE_INTERVAL saves; None means no limit.
+    """
+    # Whether calls block on I/O, in which case the analyzer runs them in a worker thread
+    blocking = False
+
+    def __init__(self, retention_seconds: Optional[float] = None, max_records: Optional[int] = None):
+        self.retention_seconds = retention_seconds
+        self.max_records = max_records
+        self._saves_since_prune = 0
+
+    def save(self, record: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def find(
+        self,
+        resume_hash: Optional[str] = None,
+        job_hash: Optional[str] = None,
+        model: Optional[str] = None,
+        prompt_version: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Records matching every given filter, newest first, without their result and resume text."""
+        raise NotImplementedError
+
+    def prune(self) -> int:
+        """Delete expired and surplus records, returning how many were deleted."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def _after_save(self) -> None:
+        """Prune once every PRUNE_INTERVAL saves, so retention costs one sweep per batch of writes."""
+        self._saves_since_prune += 1
+        if self._saves_since_prune < PRUNE_INTERVAL:
+            return
+        self._saves_since_prune = 0
+        removed = self.prune()
+        if removed:
+            logger.info("Pruned %d stored analyses", removed)
+
+def _summary(record: Dict[str, Any]) -> Dict[str, Any]:
+    """A record without its bulky fields, for listings."""
+    return {key: value for key, value in record.items() if key not in ("result", "resume_text")}
+
+class InMemoryAnalysisStore(AnalysisStoreBase):
+    """
+    Analysis store in a Python dict.
+    For development and testing only, records are lost on restart.
+    """
+    def __init__(self, retention_seconds: Optional[float] = None, max_records: Optional[int] = None):
+        super().__init__(retention_seconds, max_records)
+        self._records: Dict[str, Dict[str, Any]] = {}
+        logger.info("InMemoryAnalysisStore initialized (dev mode)")
+
+    def save(self, record: Dict[str, Any]) -> None:
+        self._records[record["analysis_id"]] = {"created_at": time.time(), **record}
+        self._after_save()
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        return self._records.get(analysis_id)
+
+    def find(
+        self,
+        resume_hash: Optional[str] = None,
+        job_hash: Optional[str] = None,
+        model: Optional[str] = None,
+        prompt_version: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        filters = dict(zip(INDEXED_FIELDS, (resume_hash, job_hash, model, prompt_version)))
+        records = [
+            record for record in self._records.values()
+            if all(value is None or record.get(key) == value for key, value in filters.items())
+            and (since is None or record["created_at"] >= since)
+        ]
+        records.sort(key=lambda record: record["created_at"], reverse=True)
+        return [_summary(record) for record in records[:limit]]
+
+    def prune(self) -> int:
+        count = len(self._records)
+        records = list(self._records.values())
+        if self.retention_seconds is not None:
+            cutoff = time.time() - self.retention_seconds
+            records = [record for record in records if record["created_at"] >= cutoff]
+        if self.max_records is not None and len(records) > self.max_records:
+            records.sort(key=lambda record: record["created_at"], reverse=True)
+            records = records[:self.max_records]
+        self._records = {record["analysis_id"]: record for record in records}
+        return count - len(self._records)
+
+    def clear(self) -> None:
+        self._records.clear()
+
+class SQLiteAnalysisStore(AnalysisStoreBase):
+    """
+    Analysis store in a local SQLite database.
+    Lookups by resume hash, job hash, model and creation time are indexed.
+    Calls block on disk I/O, so the analyzer makes them from a worker thread.
+    """
+    blocking = True
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS analyses (
+            analysis_id TEXT PRIMARY KEY,
+            resume_hash TEXT NOT NULL,
+            job_hash TEXT,
+            model TEXT NOT NULL,
+            prompt_version TEXT NOT NULL,
+            analysis_mode TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            resume_text TEXT NOT NULL,
+            result TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_analyses_resume_hash ON analyses (resume_hash);
+        CREATE INDEX IF NOT EXISTS idx_analyses_job_hash ON analyses (job_hash);
+        CREATE INDEX IF NOT EXISTS idx_analyses_model_version ON analyses (model, prompt_version);
+        CREATE INDEX IF NOT EXISTS idx_analyses_created_at ON analyses (created_at);
+    """
+    _COLUMNS = (
+        "analysis_id", "resume_hash", "job_hash", "model", "prompt_version",
+        "analysis_mode", "created_at", "resume_text", "result"
+    )
+    _SUMMARY_COLUMNS = _COLUMNS[:7]
+
+    def __init__(self, path: str, retention_seconds: Optional[float] = None, max_records: Optional[int] = None):
+        super().__init__(retention_seconds, max_records)
+        # One connection shared by all requests and threads, serialized by the lock
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            if path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(self._SCHEMA)
+        self.prune()
+        logger.info("SQLiteAnalysisStore initialized at %s", path)
+
+    def save(self, record: Dict[str, Any]) -> None:
+        row = {"created_at": time.time(), **record}
+        row["result"] = json.dumps(row["result"])
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO analyses ({', '.join(self._COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in self._COLUMNS)})",
+                [row.get(column) for column in self._COLUMNS]
+            )
+        self._after_save()
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT * FROM analyses WHERE analysis_id = ?", (analysis_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record["result"] = json.loads(record["result"])
+        return record
+
+    def find(
+        self,
+        resume_hash: Optional[str] = None,
+        job_hash: Optional[str] = None,
+        model: Optional[str] = None,
+        prompt_version: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        filters = dict(zip(INDEXED_FIELDS, (resume_hash, job_hash, model, prompt_version)))
+        conditions = [f"{key} = ?" for key, value in filters.items() if value is not None]
+        parameters: List[Any] = [value for value in filters.values() if value is not None]
+        if since is not None:
+            conditions.append("created_at >= ?")
+            parameters.append(since)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {', '.join(self._SUMMARY_COLUMNS)} FROM analyses {where} "
+                "ORDER BY created_at DESC LIMIT ?",
+                [*parameters, limit]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def prune(self) -> int:
+        removed = 0
+        with self._lock, self._connection:
+            if self.retention_seconds is not None:
+                removed += self._connection.execute(
+                    "DELETE FROM analyses WHERE created_at < ?", (time.time() - self.retention_seconds,)
+                ).rowcount
+            if self.max_records is not None:
+                removed += self._connection.execute(
+                    "DELETE FROM analyses WHERE analysis_id NOT IN "
+                    "(SELECT analysis_id FROM analyses ORDER BY created_at DESC LIMIT ?)",
+                    (self.max_records,)
+                ).rowcount
+        return removed
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM analyses")
+
+# Factory function to select the analysis store based on environment variables
+
+def get_analysis_store() -> AnalysisStoreBase:
+    """
+    Returns the analysis store selected by the ANALYSIS_STORE environment variable.
+    'sqlite' (default) stores analyses in the file at ANALYSIS_STORE_PATH,
+    'memory' keeps them only for the lifetime of the process. Either keeps
+    analyses for ANALYSIS_STORE_RETENTION_DAYS and at most
+    ANALYSIS_STORE_MAX_RECORDS of them, 0 meaning no limit.
+    """
+    backend = os.getenv('ANALYSIS_STORE', 'sqlite').lower()
+    retention_days = float(os.getenv('ANALYSIS_STORE_RETENTION_DAYS', '30'))
+    max_records = int(os.getenv('ANALYSIS_STORE_MAX_RECORDS', '100000'))
+    limits = {"retention_seconds": retention_days * 86400 or None, "max_records": max_records or None}
+    if backend == 'memory':
+        return InMemoryAnalysisStore(**limits)
+    return SQLiteAnalysisStore(os.getenv('ANALYSIS_STORE_PATH', 'analyses.db'), **limits)
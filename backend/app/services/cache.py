@@ -6,6 +6,8 @@ from typing import Any, Optional
 import os
 from urllib.parse import urlparse
 import redis  # Add the redis import
+from app.core.metrics import cache_namespace, record_cache_lookup, time_cache_operation
+from app.core.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -34,22 +36,32 @@ class InMemoryCache(CacheBase):
         logger.info("InMemoryCache initialized (dev mode)")
 
     def get(self, key: str) -> Optional[Any]:
-        entry = self._store.get(key)
-        if entry:
-            value, expire_time = entry
-            if expire_time is None or expire_time > time.time():
-                logger.info(f"[CACHE HIT] InMemoryCache for key: {key}")
-                return value
-            else:
-                logger.info(f"[CACHE EXPIRED] InMemoryCache for key: {key}")
-                del self._store[key]
-        logger.info(f"[CACHE MISS] InMemoryCache for key: {key}")
-        return None
+        with time_cache_operation("memory", "get"), span(
+            "cache.get", cache__backend="memory", cache__namespace=cache_namespace(key)
+        ) as current:
+            entry = self._store.get(key)
+            if entry:
+                value, expire_time = entry
+                if expire_time is None or expire_time > time.time():
+                    logger.debug("[CACHE HIT] InMemoryCache for key: %s", key)
+                    record_cache_lookup(key, hit=True)
+                    current.set_attribute("cache.hit", True)
+                    return value
+                else:
+                    logger.debug("[CACHE EXPIRED] InMemoryCache for key: %s", key)
+                    del self._store[key]
+            logger.debug("[CACHE MISS] InMemoryCache for key: %s", key)
+            record_cache_lookup(key, hit=False)
+            current.set_attribute("cache.hit", False)
+            return None
 
     def set(self, key: str, value: Any, ttl: int = 86400) -> None:
-        expire_time = time.time() + ttl if ttl else None
-        self._store[key] = (value, expire_time)
-        logger.info(f"[CACHE SET] InMemoryCache for key: {key} (ttl={ttl}s)")
+        with time_cache_operation("memory", "set"), span(
+            "cache.set", cache__backend="memory", cache__namespace=cache_namespace(key)
+        ):
+            expire_time = time.time() + ttl if ttl else None
+            self._store[key] = (value, expire_time)
+            logger.debug("[CACHE SET] InMemoryCache for key: %s (ttl=%ss)", key, ttl)
 
     def clear(self) -> None:
         self._store.clear()
@@ -83,22 +95,22 @@ class RedisCache(CacheBase):
             db=redis_db,
             decode_responses=True
         )
-        logger.info(f"RedisCache initialized at {redis_host}:{redis_port} (db={redis_db})")
+        logger.info("RedisCache initialized at %s:%s (db=%s)", redis_host, redis_port, redis_db)
 
     def get(self, key: str) -> Optional[Any]:
         value = self.redis.get(key)
         if value is not None:
-            logger.info(f"[CACHE HIT] RedisCache for key: {key}")
+            logger.debug("[CACHE HIT] RedisCache for key: %s", key)
             return value
         else:
-            logger.info(f"[CACHE MISS] RedisCache for key: {key}")
+            logger.debug("[CACHE MISS] RedisCache for key: %s", key)
             return None
 
     def set(self, key: str, value: Any, ttl: int = None) -> None:
         # Use provided TTL or default
         ttl = ttl if ttl is not None else self.ttl
         self.redis.setex(key, ttl, value)
-        logger.info(f"[CACHE SET] RedisCache for key: {key} (ttl={ttl}s)")
+        logger.debug("[CACHE SET] RedisCache for key: %s (ttl=%ss)", key, ttl)
 
     def clear(self) -> None:
         # WARNING: This will delete all keys in the current Redis DB!
@@ -106,26 +118,35 @@ class RedisCache(CacheBase):
         logger.info("[CACHE CLEAR] RedisCache cleared (all keys deleted)")
 
     def get(self, key: str) -> Optional[Any]:
-        value = self.redis.get(key)
-        if value is not None:
-            logger.info(f"[CACHE HIT] RedisCache for key: {key}")
-            try:
-                # Try to parse JSON back to dict
-                return json.loads(value)
-            except Exception:
-                # If not JSON, just return as is
-                return value
-        else:
-            logger.info(f"[CACHE MISS] RedisCache for key: {key}")
-            return None
+        with time_cache_operation("redis", "get"), span(
+            "cache.get", cache__backend="redis", cache__namespace=cache_namespace(key)
+        ) as current:
+            value = self.redis.get(key)
+            current.set_attribute("cache.hit", value is not None)
+            if value is not None:
+                logger.debug("[CACHE HIT] RedisCache for key: %s", key)
+                record_cache_lookup(key, hit=True)
+                try:
+                    # Try to parse JSON back to dict
+                    return json.loads(value)
+                except Exception:
+                    # If not JSON, just return as is
+                    return value
+            else:
+                logger.debug("[CACHE MISS] RedisCache for key: %s", key)
+                record_cache_lookup(key, hit=False)
+                return None
 
     def set(self, key: str, value: Any, ttl: int = None) -> None:
-        ttl = ttl if ttl is not None else self.ttl
-        # Serialize dicts to JSON before storing
-        if isinstance(value, (dict, list)):
-            value = json.dumps(value)
-        self.redis.setex(key, ttl, value)
-        logger.info(f"[CACHE SET] RedisCache for key: {key} (ttl={ttl}s)")
+        with time_cache_operation("redis", "set"), span(
+            "cache.set", cache__backend="redis", cache__namespace=cache_namespace(key)
+        ):
+            ttl = ttl if ttl is not None else self.ttl
+            # Serialize dicts to JSON before storing
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value)
+            self.redis.setex(key, ttl, value)
+            logger.debug("[CACHE SET] RedisCache for key: %s (ttl=%ss)", key, ttl)
 
 # Factory function to select cache backend based on environment variable
 
@@ -145,4 +166,15 @@ def make_cache_key(resume_text: str) -> str:
     Generate a cache key by hashing the resume text.
     This ensures that identical resumes map to the same cache entry.
     """
-    return hashlib.sha256(resume_text.encode('utf-8')).hexdigest() 
\ No newline at end of file
+    return hashlib.sha256(resume_text.encode('utf-8')).hexdigest() 
+
+# ASCII unit separator, which normalized text never contains
+KEY_PART_SEPARATOR = "\x1f"
+
+def make_namespaced_key(namespace: str, *parts: str) -> str:
+    """
+    Generate a cache key for one kind of entry from several parts.
+    The namespace keeps kinds of entries apart and readable in the cache,
+    and the parts are hashed together so keys have a fixed length.
+    """
+    return f"{namespace}:{make_cache_key(KEY_PART_SEPARATOR.join(parts))}"
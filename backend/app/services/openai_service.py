@@ -1,156 +1,202 @@
 """OpenAI service for resume analysis."""
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Type
 import json
 import logging
+import time
 import httpx
-from openai import AsyncOpenAI
+from openai import APIConnectionError, AsyncOpenAI
+from openai.types.completion_usage import CompletionUsage
+from pydantic import BaseModel, ValidationError
+from app.core import metrics
 from app.core.config import settings
+from app.core.tracing import set_attributes, span, traced
 import tenacity
-from app.services.cache import make_cache_key, get_cache_backend
+from app.services.cache import get_cache_backend, make_cache_key, make_namespaced_key
+from app.services.pricing import estimate_cost
+from app.services.prompts import (
+    ANALYSIS_MODE_COMPACT,
+    ANALYSIS_MODE_FULL,
+    IMPROVEMENT_SYSTEM_PROMPT,
+    JOB_MATCH_SYSTEM_PROMPT,
+    PROMPT_VERSION,
+    RESUME_ANALYSIS_SYSTEM_PROMPT,
+    build_chat_request,
+    build_text_request,
+    job_match_user_messages,
+    point_improvement_user_messages,
+    point_rationale_user_messages,
+    resume_analysis_system_prompt,
+    resume_analysis_user_messages,
+    section_system_prompt
+)
+from app.utils.schema import function_schema
+from app.utils.validation import (
+    CompactResumeSectionsAnalysis,
+    JobMatchAnalysis,
+    JobMatchWithRequirements,
+    JobRequirements,
+    ResumeSectionsAnalysis,
+    ResumeSectionsAnalysisWithoutImprovements,
+    StarRationales
+)
 
 logger = logging.getLogger(__name__)
 
-# Function schemas for OpenAI API
+# Function schemas for OpenAI API, generated from the models the output is validated with
 RESUME_ANALYSIS_FUNCTIONS = [
-    {
-        "name": "analyze_resume_section",
-        "description": "Analyze different sections of a resume",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "sections": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "type": {"type": "string", "description": "Type of section (Experience, Projects, Education, Skills)"},
-                            "points": {
-                                "type": "array",
-                                "items": {
-                                    "oneOf": [
-                                        {
-                                            "type": "object",
-                                            "properties": {
-                                                "text": {"type": "string", "description": "Full text of the point"},
-                                                "star": {
-                                                    "type": "object",
-                                                    "properties": {
-                                                        "situation": {"type": "boolean", "description": "Whether situation is present"},
-                                                        "situation_rationale": {"type": "string", "description": "Explanation for situation assessment"},
-                                                        "action": {"type": "boolean", "description": "Whether action is present"},
-                                                        "action_rationale": {"type": "string", "description": "Explanation for action assessment"},
-                                                        "result": {"type": "boolean", "description": "Whether result is present"},
-                                                        "result_rationale": {"type": "string", "description": "Explanation for result assessment"},
-                                                        "complete": {"type": "boolean", "description": "Whether all STAR components are present"}
-                                                    },
-                                                    "required": ["situation", "situation_rationale", "action", "action_rationale", "result", "result_rationale", "complete"]
-                                                },
-                                                "metrics": {
-                                                    "type": "array",
-                                                    "items": {"type": "string"},
-                                                    "description": "Identified metrics and achievements"
-                                                },
-                                                "technical_score": {
-                                                    "type": "number",
-                                                    "description": "Technical depth score (0-5)",
-                                                    "minimum": 0,
-                                                    "maximum": 5
-                                                },
-                                                "improvement": {
-                                                    "type": "string",
-                                                    "description": "Suggested updated resume point following STAR format and with metrics"
-                                                }
-                                            },
-                                            "required": ["text", "star", "metrics", "technical_score", "improvement"]
-                                        },
-                                        {
-                                            "type": "object",
-                                            "properties": {
-                                                "text": {"type": "string", "description": "Full text of the education entry"},
-                                                "subject": {"type": "string", "description": "Subject/field of study"},
-                                                "course": {"type": "string", "description": "Degree/course name"},
-                                                "school": {"type": "string", "description": "Institution name"},
-                                                "subject_course_school_reputation": {
-                                                    "type": "object",
-                                                    "properties": {
-                                                        "domestic_score": {
-                                                            "type": "number",
-                                                            "description": "Domestic reputation score (0-10)",
-                                                            "minimum": 0,
-                                                            "maximum": 10
-                                                        },
-                                                        "domestic_score_rationale": {
-                                                            "type": "string",
-                                                            "description": "Explanation for domestic reputation score"
-                                                        },
-                                                        "international_score": {
-                                                            "type": "number",
-                                                            "description": "International reputation score (0-10)",
-                                                            "minimum": 0,
-                                                            "maximum": 10
-                                                        },
-                                                        "international_score_rationale": {
-                                                            "type": "string",
-                                                            "description": "Explanation for international reputation score"
-                                                        }
-                                                    },
-                                                    "required": ["domestic_score", "domestic_score_rationale", "international_score", "international_score_rationale"]
-                                                }
-                                            },
-                                            "required": ["text", "subject", "course", "school", "subject_course_school_reputation"]
-                                        }
-                                    ]
-                                }
-                            }
-                        },
-                        "required": ["type", "points"]
-                    }
-                }
-            },
-            "required": ["sections"]
-        }
-    }
+    function_schema(
+        "analyze_resume_section",
+        "Analyze different sections of a resume",
+        ResumeSectionsAnalysis
+    )
+]
+
+# Improvements are left out when they will be generated per point on demand
+RESUME_ANALYSIS_WITHOUT_IMPROVEMENTS_FUNCTIONS = [
+    function_schema(
+        "analyze_resume_section",
+        "Analyze different sections of a resume",
+        ResumeSectionsAnalysisWithoutImprovements
+    )
+]
+
+COMPACT_RESUME_ANALYSIS_FUNCTIONS = [
+    function_schema(
+        "analyze_resume_section",
+        "Analyze different sections of a resume",
+        CompactResumeSectionsAnalysis
+    )
+]
+
+STAR_RATIONALE_FUNCTIONS = [
+    function_schema(
+        "explain_star_assessment",
+        "Explain each component of the given STAR assessment of a resume point",
+        StarRationales
+    )
 ]
 
 JOB_MATCH_FUNCTIONS = [
-    {
-        "name": "analyze_job_match",
-        "description": "Analyze how well a resume matches a job description",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "match_score": {"type": "number", "minimum": 0, "maximum": 100},
-                "technical_match": {
-                    "type": "object",
-                    "properties": {
-                        "matched_skills": {"type": "array", "items": {"type": "string"}},
-                        "missing_skills": {"type": "array", "items": {"type": "string"}},
-                        "skill_coverage_score": {"type": "number", "minimum": 0, "maximum": 100}
-                    }
-                },
-                "experience_match": {
-                    "type": "object",
-                    "properties": {
-                        "required_years": {"type": "integer"},
-                        "actual_years": {"type": "integer"},
-                        "experience_score": {"type": "number", "minimum": 0, "maximum": 100}
-                    }
-                },
-                "key_requirements": {
-                    "type": "object",
-                    "properties": {
-                        "met": {"type": "array", "items": {"type": "string"}},
-                        "partially_met": {"type": "array", "items": {"type": "string"}},
-                        "not_met": {"type": "array", "items": {"type": "string"}}
-                    }
-                },
-                "recommendations": {"type": "array", "items": {"type": "string"}}
-            },
-            "required": ["match_score", "technical_match", "experience_match", "key_requirements", "recommendations"]
-        }
-    }
+    function_schema(
+        "analyze_job_match",
+        "Analyze how well a resume matches a job description",
+        JobMatchAnalysis
+    )
 ]
 
+# Used the first time a job is matched, so its requirements can be cached
+JOB_MATCH_WITH_REQUIREMENTS_FUNCTIONS = [
+    function_schema(
+        "analyze_job_match",
+        "Analyze how well a resume matches a job description",
+        JobMatchWithRequirements
+    )
+]
+
+# Backoff between attempts of a retried block, see _retrying
+RETRY_WAIT = tenacity.wait_exponential(multiplier=1, min=4, max=10)
+
+# Job postings change rarely and are shared by many candidates
+JOB_REQUIREMENTS_TTL_SECONDS = 7 * 86400
+
+def _parse_function_arguments(message: Any) -> Dict[str, Any]:
+    """Parse the arguments of the forced tool call, or of a legacy function call."""
+    arguments = None
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        arguments = tool_calls[0].function.arguments
+    if not isinstance(arguments, str):
+        arguments = message.function_call.arguments
+    return json.loads(arguments)
+
+def _check_output(output: Dict[str, Any], model: Type[BaseModel]) -> bool:
+    """Whether output validates against the model its schema came from, failures are logged."""
+    try:
+        model.model_validate(output)
+        return True
+    except ValidationError as e:
+        logger.warning("OpenAI output failed %s validation, not caching it: %s", model.__name__, e)
+        return False
+
+def _is_retryable(error: BaseException) -> bool:
+    """Whether an OpenAI call failed transiently: a timeout, a dropped connection, a 429 or a 5xx."""
+    if isinstance(error, (APIConnectionError, httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return isinstance(status_code, int) and (status_code == 429 or status_code >= 500)
+
+def _retrying(operation: str, current: Optional[Any] = None) -> tenacity.AsyncRetrying:
+    """
+    Retry policy for the API call inside a method, used as
+    `async for attempt in _retrying(...): with attempt: ...`.
+    Only transient errors are retried. The last error is re-raised as is
+    once the attempts are used up, for the method to turn into its result.
+    
+    Args:
+        operation: Name the retries are counted under
+        current: Span to put the retry count on, the current span if None
+    """
+    def before_sleep(retry_state: tenacity.RetryCallState) -> None:
+        logger.warning("Retrying OpenAI API call after error: %s", retry_state.outcome.exception())
+        metrics.record_llm_retry(operation)
+        if current is None:
+            set_attributes(llm__retries=retry_state.attempt_number)
+        else:
+            current.set_attribute("llm.retries", retry_state.attempt_number)
+
+    return tenacity.AsyncRetrying(
+        stop=tenacity.stop_after_attempt(3),
+        wait=RETRY_WAIT,
+        retry=tenacity.retry_if_exception(_is_retryable),
+        before_sleep=before_sleep,
+        reraise=True
+    )
+
+async def _read_until_text(chunks: AsyncIterator[Any]) -> List[Any]:
+    """Read streamed chunks up to and including the first one with text, or to the end."""
+    read = []
+    async for chunk in chunks:
+        read.append(chunk)
+        if chunk.choices and chunk.choices[0].delta.content:
+            break
+    return read
+
+def _trace_llm_call(model: str, token_usage: Dict[str, Any]) -> None:
+    """Put the model and token counts of an LLM call on the current span."""
+    set_attributes(llm__model=model, llm__cache_hit=False, **{
+        f"llm__{name}": value for name, value in token_usage.items()
+        if name.endswith("tokens") and isinstance(value, int)
+    })
+
+def _served_model(response: Any, requested: str) -> str:
+    """Model that answered a call, as the response names it, e.g. with its date, else the one requested."""
+    served = getattr(response, "model", None)
+    return served if isinstance(served, str) and served else requested
+
+def _build_token_usage(usage: Any, model: str) -> Dict[str, Any]:
+    """
+    Build token usage statistics from an API response's usage block,
+    priced for the model that served the call.
+    
+    Prompt tokens served from the provider's prefix cache are reported
+    separately and billed at the cheaper cached input rate.
+    """
+    details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(details, dict):
+        cached_tokens = details.get("cached_tokens")
+    else:
+        cached_tokens = getattr(details, "cached_tokens", None)
+    if not isinstance(cached_tokens, int):
+        cached_tokens = 0
+    
+    return {
+        "total_tokens": usage.total_tokens,
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "cached_tokens": cached_tokens,
+        "total_cost": estimate_cost(usage.prompt_tokens, usage.completion_tokens, model, cached_tokens=cached_tokens)
+    }
+
 class OpenAIService:
     """Service for interacting with OpenAI API."""
     
@@ -163,84 +209,158 @@ class OpenAIService:
         # Initialize the cache (in-memory for dev; swap to RedisCache for prod)
         self.cache = get_cache_backend()
 
-    @tenacity.retry(
-        stop=tenacity.stop_after_attempt(3),
-        wait=tenacity.wait_exponential(multiplier=1, min=4, max=10),
-        retry=tenacity.retry_if_exception_type(Exception),
-        before_sleep=lambda retry_state: logger.warning(f"Retrying OpenAI API call after error: {retry_state.outcome.exception()}")
-    )
-    async def analyze_resume_content(self, resume_text: str) -> Dict[str, Any]:
+    @traced("openai.analyze_resume_content")
+    async def analyze_resume_content(
+        self,
+        resume_text: str,
+        hints: Optional[str] = None,
+        model: Optional[str] = None,
+        analysis_mode: str = ANALYSIS_MODE_FULL,
+        include_improvements: bool = True
+    ) -> Dict[str, Any]:
         """
         Analyze resume content using function calling.
         Uses cache to avoid redundant OpenAI calls for the same resume.
+        
+        Args:
+            resume_text: The text content of the resume
+            hints: Optional locally pre-extracted signals for the model to verify
+            model: Model to use, defaults to the large model
+            analysis_mode: "compact" leaves out rationales and improvements
+            include_improvements: Whether full analyses include an improvement per point
         """
-        # Generate a cache key from the resume text
-        cache_key = make_cache_key(resume_text)
+        model = model or settings.OPENAI_LARGE_MODEL
+        user_messages = resume_analysis_user_messages(resume_text, hints)
+        if analysis_mode == ANALYSIS_MODE_COMPACT:
+            functions, output_model = COMPACT_RESUME_ANALYSIS_FUNCTIONS, CompactResumeSectionsAnalysis
+        elif not include_improvements:
+            functions = RESUME_ANALYSIS_WITHOUT_IMPROVEMENTS_FUNCTIONS
+            output_model = ResumeSectionsAnalysisWithoutImprovements
+        else:
+            functions, output_model = RESUME_ANALYSIS_FUNCTIONS, ResumeSectionsAnalysis
+        
+        # Generate a cache key from the model, output schema and resume text
+        cache_key = make_namespaced_key(
+            "resume_analysis", model, PROMPT_VERSION, output_model.__name__, *user_messages
+        )
         # Check the cache first
         cached_result = self.cache.get(cache_key)
         if cached_result is not None:
-            logger.info(f"Returning cached resume analysis for key: {cache_key}")
+            logger.debug("Returning cached resume analysis for key: %s", cache_key)
+            set_attributes(llm__model=model, llm__cache_hit=True)
             return cached_result
 
         # If not cached, proceed with OpenAI call
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-2024-08-06",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are an expert resume analyzer. For each section in the resume:
-
-1. For Experience and Projects sections:
-   - Extract each bullet point
-   - Analyze STAR format with STRICT criteria - do not assume anything is implied unless it is extremely obvious:
-     * Situation (S): Should clearly describe the context or scenario with minimal ambiguity. Should answer the questions "What was the challenge you faced?" or "WHY did you perform the action?". If either of these criteria is met, mention clearly. If not, mention which is not met.
-     * Action (A): Should describe specific actions taken with concrete methodology. Should answer the questions "What did you do to face the challenge?" or "WHAT did you do to achieve the result?". If either of these criteria is met, mention clearly. If not, mention which is not met.  
-     * Result (R): Should clearly indicate the outcome with quantifiable metrics and numbers. Should answer the questions "What metric did you move by doing the task?" or "What was the indicator of your success in the action / in the situation?". If either of these criteria is met, mention clearly. If not, mention which is not met.
-   - Mark components as present only with clear evidence. 
-   - Identify metrics and quantifiable achievements
-   - Provide detailed rationale for each STAR component assessment
-
-2. For Education section:
-   - Extract school name, degree, graduation date
-   - Identify relevant coursework (if any)
-   - List projects completed (if any)
-   - List co-curricular activities (if any)
-
-3. For Skills/Certifications:
-   - List all technical skills
-   - List all certifications with dates
-   - Group skills by category (e.g., Programming Languages, Frameworks, Tools)"""
-                    },
-                    {"role": "user", "content": resume_text}
-                ],
-                functions=RESUME_ANALYSIS_FUNCTIONS,
-                function_call={"name": "analyze_resume_section"},
-                temperature=0
-            )
+            async for attempt in _retrying("analyze_resume_content"):
+                with attempt:
+                    started = time.perf_counter()
+                    response = await self.client.chat.completions.create(**build_chat_request(
+                        model=model,
+                        system_prompt=resume_analysis_system_prompt(analysis_mode),
+                        functions=functions,
+                        function_name="analyze_resume_section",
+                        user_messages=user_messages
+                    ))
+            token_usage = _build_token_usage(response.usage, _served_model(response, model))
+            metrics.record_llm_call("analyze_resume_content", model, time.perf_counter() - started, token_usage)
+            _trace_llm_call(model, token_usage)
             
             # Parse the function call response
-            function_response = json.loads(response.choices[0].message.function_call.arguments)
+            function_response = _parse_function_arguments(response.choices[0].message)
+            valid = _check_output(function_response, output_model)
             result = {
                 "status": "success",
                 "content": function_response,
+                "model": model,
+                "token_usage": token_usage
+            }
+            # Store valid results in cache (24h TTL), invalid ones are regenerated next time
+            if valid:
+                self.cache.set(cache_key, result, ttl=86400)
+                logger.debug("Cached resume analysis for key: %s", cache_key)
+            return result
+            
+        except Exception as e:
+            # Rate limiting is expected under load, its tracebacks are noise
+            logger.error("Error in analyze_resume_content: %s", e, exc_info=not metrics.is_rate_limit_error(e))
+            metrics.record_llm_error("analyze_resume_content", e)
+            return {
+                "status": "error",
+                "message": f"OpenAI API error: {str(e)}",
                 "token_usage": {
-                    "total_tokens": response.usage.total_tokens,
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_cost": (
-                        response.usage.prompt_tokens * settings.COST_PER_INPUT_TOKEN +
-                        response.usage.completion_tokens * settings.COST_PER_OUTPUT_TOKEN
-                    )
+                    "total_tokens": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "cached_tokens": 0,
+                    "total_cost": 0
                 }
             }
-            # Store the result in cache (24h TTL)
-            self.cache.set(cache_key, result, ttl=86400)
-            logger.info(f"Cached resume analysis for key: {cache_key}")
+    
+    @traced("openai.explain_point")
+    async def explain_point(
+        self,
+        section_type: str,
+        point_text: str,
+        star: Dict[str, Any],
+        model: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Explain the stored STAR flags of a single resume point, one rationale per component.
+        Used to fill in rationales for points from a compact analysis on demand;
+        the flags are sent as given, so they are explained rather than reassessed.
+        
+        Args:
+            section_type: Type of section the point belongs to
+            point_text: The text of the point
+            star: Stored STAR flags of the point
+            model: Model to use, defaults to the large model
+            
+        Returns:
+            Dict containing the rationales and token usage
+        """
+        model = model or settings.OPENAI_LARGE_MODEL
+        # The flags are part of the messages, and so of the cache key
+        user_messages = point_rationale_user_messages(section_type, point_text, star)
+        
+        cache_key = make_namespaced_key("star_rationale", model, PROMPT_VERSION, *user_messages)
+        cached_result = self.cache.get(cache_key)
+        if cached_result is not None:
+            logger.debug("Returning cached point rationale for key: %s", cache_key)
+            set_attributes(llm__model=model, llm__cache_hit=True)
+            return cached_result
+        
+        try:
+            async for attempt in _retrying("explain_point"):
+                with attempt:
+                    started = time.perf_counter()
+                    response = await self.client.chat.completions.create(**build_chat_request(
+                        model=model,
+                        system_prompt=RESUME_ANALYSIS_SYSTEM_PROMPT,
+                        functions=STAR_RATIONALE_FUNCTIONS,
+                        function_name="explain_star_assessment",
+                        user_messages=user_messages
+                    ))
+            token_usage = _build_token_usage(response.usage, _served_model(response, model))
+            metrics.record_llm_call("explain_point", model, time.perf_counter() - started, token_usage)
+            _trace_llm_call(model, token_usage)
+            
+            # Parse the function call response
+            function_response = _parse_function_arguments(response.choices[0].message)
+            valid = _check_output(function_response, StarRationales)
+            result = {
+                "status": "success",
+                "content": function_response,
+                "model": model,
+                "token_usage": token_usage
+            }
+            if valid:
+                self.cache.set(cache_key, result, ttl=86400)
             return result
             
         except Exception as e:
-            logger.error(f"Error in analyze_resume_content: {str(e)}", exc_info=True)
+            logger.error("Error in explain_point: %s", e, exc_info=not metrics.is_rate_limit_error(e))
+            metrics.record_llm_error("explain_point", e)
             return {
                 "status": "error",
                 "message": f"OpenAI API error: {str(e)}",
@@ -248,81 +368,187 @@ class OpenAIService:
                     "total_tokens": 0,
                     "prompt_tokens": 0,
                     "completion_tokens": 0,
+                    "cached_tokens": 0,
                     "total_cost": 0
                 }
             }
     
-    async def analyze_job_match(self, resume_text: str, job_description: str) -> Dict[str, Any]:
+    async def stream_improvement(
+        self,
+        section_type: str,
+        point_text: str,
+        star: Dict[str, Any],
+        model: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate an improved version of a resume point, streaming it as it is written.
+        The complete text is cached, so repeated requests are served without a call.
+        
+        Args:
+            section_type: Type of section the point belongs to
+            point_text: The text of the point
+            star: STAR assessment of the point, with or without rationales
+            model: Model to use, defaults to the large model
+            
+        Yields:
+            str: Chunks of the improved point
+        """
+        model = model or settings.OPENAI_LARGE_MODEL
+        user_messages = point_improvement_user_messages(section_type, point_text, star)
+        
+        cache_key = make_namespaced_key("improvement", model, PROMPT_VERSION, *user_messages)
+        cached_result = self.cache.get(cache_key)
+        if cached_result is not None:
+            logger.debug("Returning cached improvement for key: %s", cache_key)
+            yield cached_result
+            return
+        
+        chunks = []
+        usage = None
+        served_model = model
+        started = time.perf_counter()
+        first_token_seconds = None
+        # The generator is suspended at every chunk, so its span is not made the current one
+        with span("openai.stream_improvement", current=False, llm__model=model, llm__cache_hit=False) as current:
+            try:
+                # Retried up to the first text chunk; after that the caller may already have sent part of it
+                async for attempt in _retrying("stream_improvement", current):
+                    with attempt:
+                        stream = aiter(await self.client.chat.completions.create(**build_text_request(
+                            model=model,
+                            system_prompt=IMPROVEMENT_SYSTEM_PROMPT,
+                            user_messages=user_messages
+                        )))
+                        head = await _read_until_text(stream)
+                first_token_seconds = time.perf_counter() - started
+                current.add_event("first_token")
+
+                async def read_all() -> AsyncIterator[Any]:
+                    for chunk in head:
+                        yield chunk
+                    async for chunk in stream:
+                        yield chunk
+
+                async for chunk in read_all():
+                    # Requested with include_usage, the last chunk has the usage and no choices
+                    usage = getattr(chunk, "usage", None) or usage
+                    served_model = _served_model(chunk, served_model)
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if text:
+                        chunks.append(text)
+                        yield text
+            except Exception as e:
+                metrics.record_llm_error("stream_improvement", e)
+                raise
+            token_usage = _build_token_usage(CompletionUsage.model_validate(usage), served_model) if usage else {}
+            for name, value in token_usage.items():
+                if name.endswith("tokens"):
+                    current.set_attribute(f"llm.{name}", value)
+        metrics.record_llm_call(
+            "stream_improvement", model, time.perf_counter() - started, token_usage,
+            first_token_seconds=first_token_seconds
+        )
+        
+        # Only complete improvements are cached
+        self.cache.set(cache_key, "".join(chunks), ttl=86400)
+    
+    def get_job_requirements(self, job_description: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached structured requirements of a job description.
+        
+        Requirements are extracted as part of the first match against a job
+        and indexed by the hash of its normalized description.
+        
+        Returns:
+            Optional[Dict[str, Any]]: The requirements, or None if not extracted yet
+        """
+        return self.cache.get(make_namespaced_key(
+            "job_requirements", make_cache_key(job_description), PROMPT_VERSION
+        ))
+    
+    @traced("openai.analyze_job_match")
+    async def analyze_job_match(
+        self,
+        resume_text: str,
+        job_description: str,
+        model: Optional[str] = None,
+        known_skills: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Analyze how well a resume matches a job description.
+        Results are cached per resume, job, model and prompt version.
         
         Args:
             resume_text: The text content of the resume
             job_description: The job description to match against
+            model: Model to use, defaults to the large model
+            known_skills: Skills matched locally, given to the model as evidence
             
         Returns:
             Dict containing match analysis and token usage
         """
+        model = model or settings.OPENAI_LARGE_MODEL
+        job_hash = make_cache_key(job_description)
+        cache_key = make_namespaced_key(
+            "job_match", make_cache_key(resume_text), job_hash, model, PROMPT_VERSION
+        )
+        cached_result = self.cache.get(cache_key)
+        if cached_result is not None:
+            logger.debug("Returning cached job match for key: %s", cache_key)
+            set_attributes(llm__model=model, llm__cache_hit=True)
+            return cached_result
+        
+        # The job description is sent either way; the requirements are only extracted once per job
+        requirements_key = make_namespaced_key("job_requirements", job_hash, PROMPT_VERSION)
+        if self.cache.get(requirements_key) is None:
+            functions, output_model = JOB_MATCH_WITH_REQUIREMENTS_FUNCTIONS, JobMatchWithRequirements
+        else:
+            functions, output_model = JOB_MATCH_FUNCTIONS, JobMatchAnalysis
+        
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-2024-08-06",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are an expert at matching resumes to job descriptions. Analyze the match and provide a detailed response following this structure:
-
-1. Overall Match Score (0-100):
-   - Consider skills alignment, experience relevance, and qualifications match
-   - Provide a numerical score where 100 means perfect match
-
-2. Technical Skills Match:
-   - List all skills mentioned in job description that match the resume
-   - List all required/preferred skills from job that are missing in resume
-   - Calculate a skill coverage score (0-100) based on matched vs required skills
-
-3. Experience Match:
-   - Extract required years of experience from job description
-   - Calculate actual relevant years from resume
-   - Provide experience match score (0-100) based on both quantity and relevance
-
-4. Key Requirements Analysis:
-   - List skill requirements that are fully met
-   - List skill requirements that are partially met
-   - List skill requirements that are not met at all
-
-5. Specific Recommendations:
-   - Provide actionable suggestions to better align with job requirements
-   - Focus on addressing gaps in skills and experience
-   - Suggest ways to better present existing qualifications (including skills, experience, and education)
-
-Your response MUST include all these components in the specified format."""
-                    },
-                    {"role": "user", "content": f"Resume:\n{resume_text}\n\nJob Description:\n{job_description}"}
-                ],
-                functions=JOB_MATCH_FUNCTIONS,
-                function_call={"name": "analyze_job_match"},
-                temperature=0
-            )
+            async for attempt in _retrying("analyze_job_match"):
+                with attempt:
+                    started = time.perf_counter()
+                    response = await self.client.chat.completions.create(**build_chat_request(
+                        model=model,
+                        system_prompt=JOB_MATCH_SYSTEM_PROMPT,
+                        functions=functions,
+                        function_name="analyze_job_match",
+                        user_messages=job_match_user_messages(resume_text, job_description, known_skills)
+                    ))
+            token_usage = _build_token_usage(response.usage, _served_model(response, model))
+            metrics.record_llm_call("analyze_job_match", model, time.perf_counter() - started, token_usage)
+            _trace_llm_call(model, token_usage)
             
             # Parse the function call response
-            function_response = json.loads(response.choices[0].message.function_call.arguments)
+            function_response = _parse_function_arguments(response.choices[0].message)
+            valid = _check_output(function_response, output_model)
             
-            return {
+            extracted = None
+            if isinstance(function_response, dict):
+                extracted = function_response.pop("job_requirements", None)
+            if extracted is not None:
+                try:
+                    JobRequirements.model_validate(extracted)
+                    self.cache.set(requirements_key, extracted, ttl=JOB_REQUIREMENTS_TTL_SECONDS)
+                except ValidationError as e:
+                    logger.warning("Not caching invalid job requirements: %s", e)
+            
+            result = {
                 "status": "success",
                 "content": function_response,
-                "token_usage": {
-                    "total_tokens": response.usage.total_tokens,
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_cost": (
-                        response.usage.prompt_tokens * settings.COST_PER_INPUT_TOKEN +
-                        response.usage.completion_tokens * settings.COST_PER_OUTPUT_TOKEN
-                    )
-                }
+                "model": model,
+                "token_usage": token_usage
             }
+            if valid:
+                self.cache.set(cache_key, result, ttl=86400)
+            return result
             
         except Exception as e:
-            logger.error(f"Error in analyze_job_match: {str(e)}", exc_info=True)
+            logger.error("Error in analyze_job_match: %s", e, exc_info=not metrics.is_rate_limit_error(e))
+            metrics.record_llm_error("analyze_job_match", e)
             return {
                 "status": "error",
                 "message": f"OpenAI API error: {str(e)}",
@@ -330,53 +556,43 @@ Your response MUST include all these components in the specified format."""
                     "total_tokens": 0,
                     "prompt_tokens": 0,
                     "completion_tokens": 0,
+                    "cached_tokens": 0,
                     "total_cost": 0
                 }
             }
 
-    @tenacity.retry(
-        stop=tenacity.stop_after_attempt(3),
-        wait=tenacity.wait_exponential(multiplier=1, min=4, max=10),
-        retry=tenacity.retry_if_exception_type(Exception),
-        before_sleep=lambda retry_state: logger.warning(f"Retrying OpenAI API call after error: {retry_state.outcome.exception()}")
-    )
-    async def analyze_section(self, section_type: str, text: str) -> Dict[str, Any]:
+    @traced("openai.analyze_section")
+    async def analyze_section(self, section_type: str, text: str, model: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyze a specific section of a resume.
         
         Args:
             section_type: Type of section (Education, Experience, etc.)
             text: The text content of the section
+            model: Model to use, defaults to the large model
             
         Returns:
             Dict containing analysis results and token usage
         """
+        model = model or settings.OPENAI_LARGE_MODEL
         try:
-            # Create section-specific system prompt
-            system_prompt = """You are an expert resume analyzer. Analyze the following section of the resume."""
-            
-            if section_type == "Education":
-                system_prompt += """
-                For each education entry:
-                1. Extract school name, degree, and graduation date
-                2. Identify subject/field of study
-                3. List relevant coursework and achievements
-                4. Provide reputation scores (0-10) for both domestic and international recognition
-                5. Include detailed rationales for the reputation scores"""
-            
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-2024-08-06",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": text}
-                ],
-                functions=RESUME_ANALYSIS_FUNCTIONS,
-                function_call={"name": "analyze_resume_section"},
-                temperature=0
-            )
+            async for attempt in _retrying("analyze_section"):
+                with attempt:
+                    started = time.perf_counter()
+                    response = await self.client.chat.completions.create(**build_chat_request(
+                        model=model,
+                        system_prompt=section_system_prompt(section_type),
+                        functions=RESUME_ANALYSIS_FUNCTIONS,
+                        function_name="analyze_resume_section",
+                        user_messages=[text]
+                    ))
+            token_usage = _build_token_usage(response.usage, _served_model(response, model))
+            metrics.record_llm_call("analyze_section", model, time.perf_counter() - started, token_usage)
+            _trace_llm_call(model, token_usage)
             
             # Parse the function call response
-            function_response = json.loads(response.choices[0].message.function_call.arguments)
+            function_response = _parse_function_arguments(response.choices[0].message)
+            _check_output(function_response, ResumeSectionsAnalysis)
             
             # Extract the relevant section
             section = next(
@@ -387,18 +603,10 @@ Your response MUST include all these components in the specified format."""
             return {
                 "status": "success",
                 "content": section,
-                "token_usage": {
-                    "total_tokens": response.usage.total_tokens,
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_cost": (
-                        response.usage.prompt_tokens * settings.COST_PER_INPUT_TOKEN +
-                        response.usage.completion_tokens * settings.COST_PER_OUTPUT_TOKEN
-                    )
-                }
+                "token_usage": token_usage
             }
             
         except Exception as e:
-            logger.error(f"Error in analyze_section: {str(e)}", exc_info=True)
-            # Let tenacity handle the retry
-            raise e 
\ No newline at end of file
+            logger.error("Error in analyze_section: %s", e, exc_info=not metrics.is_rate_limit_error(e))
+            metrics.record_llm_error("analyze_section", e)
+            raise 
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""Per-model prices of OpenAI calls."""
+from dataclasses import dataclass
+from typing import Optional
+from app.core.config import settings
+
+@dataclass(frozen=True)
+class ModelPricing:
+    """Prices of a model in USD per 1K tokens."""
+    prompt_cost_per_1k: float
+    cached_prompt_cost_per_1k: float
+    completion_cost_per_1k: float
+
+MODEL_PRICING = {
+    "gpt-4-turbo-preview": ModelPricing(0.01, 0.01, 0.03),  # No prompt caching
+    "gpt-4o-2024-08-06": ModelPricing(0.0025, 0.00125, 0.01),  # $2.50, $1.25 cached, $10 per 1M
+    "gpt-4.1-mini-2025-04-14": ModelPricing(0.0004, 0.0001, 0.0016),  # $0.40, $0.10 cached, $1.60 per 1M
+    "gpt-4o-mini-2024-07-18": ModelPricing(0.00015, 0.000075, 0.0006),  # $0.15, $0.075 cached, $0.60 per 1M
+    "gpt-3.5-turbo": ModelPricing(0.0005, 0.0005, 0.0015)  # No prompt caching
+}
+
+def get_model_pricing(model: Optional[str]) -> ModelPricing:
+    """Pricing of a model, the configured COST_PER_* prices for models not listed."""
+    pricing = MODEL_PRICING.get(model or "")
+    if pricing is not None:
+        return pricing
+    return ModelPricing(
+        settings.COST_PER_INPUT_TOKEN, settings.COST_PER_CACHED_INPUT_TOKEN, settings.COST_PER_OUTPUT_TOKEN
+    )
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int, model: Optional[str], cached_tokens: int = 0) -> float:
+    """Cost in USD of a call, with cached prompt tokens billed at the cached rate."""
+    pricing = get_model_pricing(model)
+    return (
+        (prompt_tokens - cached_tokens) * pricing.prompt_cost_per_1k
+        + cached_tokens * pricing.cached_prompt_cost_per_1k
+        + completion_tokens * pricing.completion_cost_per_1k
+    ) / 1000
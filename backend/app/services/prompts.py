@@ -0,0 +1,225 @@
+"""Prompt assembly for OpenAI calls.
+
+Requests are laid out so everything identical across calls comes first: the
+static system prompt, then the function schemas, then the per-request content.
+The provider caches the longest previously seen prefix, so keeping that prefix
+byte-stable makes repeated calls bill most of their input at the cached rate.
+Nothing per-request (resume text, dates, ids) may go into the static parts,
+and any edit to them should bump PROMPT_VERSION.
+"""
+from typing import Any, Dict, List, Optional
+
+# Bump whenever a system prompt or function schema changes
+PROMPT_VERSION = "5"
+
+RESUME_ANALYSIS_SYSTEM_PROMPT = """You are an expert resume analyzer. For each section in the resume:
+
+1. For Experience and Projects sections:
+   - Extract each bullet point
+   - Analyze STAR format with STRICT criteria - do not assume anything is implied unless it is extremely obvious:
+     * Situation (S): Should clearly describe the context or scenario with minimal ambiguity. Should answer the questions "What was the challenge you faced?" or "WHY did you perform the action?". If either of these criteria is met, mention clearly. If not, mention which is not met.
+     * Action (A): Should describe specific actions taken with concrete methodology. Should answer the questions "What did you do to face the challenge?" or "WHAT did you do to achieve the result?". If either of these criteria is met, mention clearly. If not, mention which is not met.  
+     * Result (R): Should clearly indicate the outcome with quantifiable metrics and numbers. Should answer the questions "What metric did you move by doing the task?" or "What was the indicator of your success in the action / in the situation?". If either of these criteria is met, mention clearly. If not, mention which is not met.
+   - Mark components as present only with clear evidence. 
+   - Identify metrics and quantifiable achievements
+   - Provide detailed rationale for each STAR component assessment
+
+2. For Education section:
+   - Extract school name, degree, graduation date
+   - Identify relevant coursework (if any)
+   - List projects completed (if any)
+   - List co-curricular activities (if any)
+
+3. For Skills/Certifications:
+   - List all technical skills
+   - List all certifications with dates
+   - Group skills by category (e.g., Programming Languages, Frameworks, Tools)"""
+
+JOB_MATCH_SYSTEM_PROMPT = """You are an expert at matching resumes to job descriptions. Analyze the match and provide a detailed response following this structure:
+
+1. Overall Match Score (0-100):
+   - Consider skills alignment, experience relevance, and qualifications match
+   - Provide a numerical score where 100 means perfect match
+
+2. Technical Skills Match:
+   - List all skills mentioned in job description that match the resume
+   - List all required/preferred skills from job that are missing in resume
+   - Calculate a skill coverage score (0-100) based on matched vs required skills
+
+3. Experience Match:
+   - Extract required years of experience from job description
+   - Calculate actual relevant years from resume
+   - Provide experience match score (0-100) based on both quantity and relevance
+
+4. Key Requirements Analysis:
+   - List skill requirements that are fully met
+   - List skill requirements that are partially met
+   - List skill requirements that are not met at all
+
+5. Specific Recommendations:
+   - Provide actionable suggestions to better align with job requirements
+   - Focus on addressing gaps in skills and experience
+   - Suggest ways to better present existing qualifications (including skills, experience, and education)
+
+Your response MUST include all these components in the specified format."""
+
+# Appended to the full prompt, so both modes share its prefix
+COMPACT_ANALYSIS_INSTRUCTIONS = """
+
+Compact mode: apply the same strict STAR criteria, but return only the fields in the function schema. Do not write rationales or improvement suggestions."""
+
+SECTION_SYSTEM_PROMPT = """You are an expert resume analyzer. Analyze the following section of the resume."""
+
+EDUCATION_SECTION_INSTRUCTIONS = """
+For each education entry:
+1. Extract school name, degree, and graduation date
+2. Identify subject/field of study
+3. List relevant coursework and achievements
+4. Provide reputation scores (0-10) for both domestic and international recognition
+5. Include detailed rationales for the reputation scores"""
+
+IMPROVEMENT_SYSTEM_PROMPT = """You are an expert resume writer. Rewrite the resume point so it follows the STAR format (Situation, Action, Result) and includes quantifiable metrics.
+
+- Keep every fact from the original point. Do not invent employers, technologies or numbers; where a metric is missing, use a placeholder such as [X%].
+- Focus on the STAR components the assessment marks as missing.
+- Reply with the rewritten point only, as a single line without a bullet."""
+
+# Introduces the stored STAR flags that a rationale request must explain, not revise
+STAR_RATIONALE_HEADER = (
+    "STAR assessment (final; explain why each component is present or missing "
+    "as given, without changing it):"
+)
+
+# Analysis modes selectable per request
+ANALYSIS_MODE_FULL = "full"
+ANALYSIS_MODE_COMPACT = "compact"
+
+# Introduces locally pre-extracted signals appended to the resume text
+PRE_ANALYSIS_HINTS_HEADER = (
+    "Pre-extracted signals (candidate STAR components and metrics found by rules; "
+    "verify each against the resume text rather than assuming it is correct):"
+)
+
+# Introduces the skills matched deterministically by the local skill taxonomy
+KNOWN_SKILLS_HEADER = (
+    "Skills checked against the resume by exact matching (evidence only: a missing "
+    "skill may still be shown in other words, so judge every skill of the job):"
+)
+
+
+def section_system_prompt(section_type: str) -> str:
+    """Get the system prompt for a section, which is fixed per section type."""
+    if section_type == "Education":
+        return SECTION_SYSTEM_PROMPT + EDUCATION_SECTION_INSTRUCTIONS
+    return SECTION_SYSTEM_PROMPT
+
+
+def resume_analysis_system_prompt(analysis_mode: str = ANALYSIS_MODE_FULL) -> str:
+    """Get the system prompt for a resume analysis in the given mode."""
+    if analysis_mode == ANALYSIS_MODE_COMPACT:
+        return RESUME_ANALYSIS_SYSTEM_PROMPT + COMPACT_ANALYSIS_INSTRUCTIONS
+    return RESUME_ANALYSIS_SYSTEM_PROMPT
+
+
+def resume_analysis_user_messages(resume_text: str, hints: Optional[str] = None) -> List[str]:
+    """Build the variable user content for a resume analysis call."""
+    if hints:
+        return [f"{resume_text}\n\n{PRE_ANALYSIS_HINTS_HEADER}\n{hints}"]
+    return [resume_text]
+
+
+def _star_lines(star: Dict[str, Any]) -> List[str]:
+    """One line per STAR component with its flag and, if known, its rationale."""
+    lines = []
+    for component in ("situation", "action", "result"):
+        status = "present" if star.get(component) else "missing"
+        rationale = star.get(f"{component}_rationale")
+        lines.append(f"- {component.title()}: {status}" + (f" ({rationale})" if rationale else ""))
+    return lines
+
+
+def point_rationale_user_messages(section_type: str, point_text: str, star: Dict[str, Any]) -> List[str]:
+    """Build the variable user content for explaining a single point's stored STAR flags."""
+    lines = [f"Section: {section_type}", f"Point: {point_text}", STAR_RATIONALE_HEADER]
+    lines.extend(_star_lines({component: star.get(component) for component in ("situation", "action", "result")}))
+    return ["\n".join(lines)]
+
+
+def point_improvement_user_messages(
+    section_type: str,
+    point_text: str,
+    star: Dict[str, Any]
+) -> List[str]:
+    """Build the variable user content for rewriting a point, from its STAR assessment."""
+    lines = [f"Section: {section_type}", f"Point: {point_text}", "STAR assessment:"]
+    lines.extend(_star_lines(star))
+    return ["\n".join(lines)]
+
+
+def job_match_user_messages(
+    resume_text: str,
+    job_description: str,
+    known_skills: Optional[Dict[str, Any]] = None
+) -> List[str]:
+    """
+    Build the variable user content for a job match call.
+
+    The full job description always comes first, whether or not its
+    requirements have been extracted, so every match against a job gets the
+    same input and calls for many resumes share it as part of the cached
+    prefix. Skills matched by the local taxonomy are listed last as evidence
+    for the model's own verdicts.
+    """
+    messages = [f"Job Description:\n{job_description}", f"Resume:\n{resume_text}"]
+    if known_skills and (known_skills["matched_skills"] or known_skills["missing_skills"]):
+        messages.append(
+            f"{KNOWN_SKILLS_HEADER}\n"
+            f"Matched: {', '.join(known_skills['matched_skills']) or 'none'}\n"
+            f"Missing: {', '.join(known_skills['missing_skills']) or 'none'}"
+        )
+    return messages
+
+
+def build_chat_request(
+    model: str,
+    system_prompt: str,
+    functions: List[Dict[str, Any]],
+    function_name: str,
+    user_messages: List[str]
+) -> Dict[str, Any]:
+    """
+    Assemble chat completion arguments with the static prefix first.
+
+    Args:
+        model: Model to call
+        system_prompt: Static system prompt
+        functions: Static function schemas, sent as strict tools
+        function_name: Function the model must call
+        user_messages: Per-request content, sent after everything static
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for chat.completions.create
+    """
+    messages = [{"role": "system", "content": system_prompt}]
+    messages.extend({"role": "user", "content": content} for content in user_messages)
+    return {
+        "model": model,
+        "messages": messages,
+        "tools": [{"type": "function", "function": {**function, "strict": True}} for function in functions],
+        "tool_choice": {"type": "function", "function": {"name": function_name}},
+        "temperature": 0
+    }
+
+
+def build_text_request(model: str, system_prompt: str, user_messages: List[str]) -> Dict[str, Any]:
+    """Assemble streamed chat completion arguments for a plain text reply, with usage in the last chunk."""
+    messages = [{"role": "system", "content": system_prompt}]
+    messages.extend({"role": "user", "content": content} for content in user_messages)
+    return {
+        "model": model,
+        "messages": messages,
+        "stream": True,
+        # Sent as a raw body field, the pinned client predates the stream_options argument
+        "extra_body": {"stream_options": {"include_usage": True}},
+        "temperature": 0
+    }
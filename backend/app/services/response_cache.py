@@ -0,0 +1,57 @@
+"""Cache of serialized HTTP response bodies.
+
+Repeated requests for the same analysis are answered with the exact bytes
+sent the first time, skipping JSON parsing, validation and encoding. Every
+body has an ETag, so clients that already hold it can get a 304.
+"""
+import hashlib
+import logging
+from typing import NamedTuple, Optional
+from app.services.cache import CacheBase, make_namespaced_key
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the JSON shape of a cached response changes
+RESPONSE_SCHEMA_VERSION = "1"
+
+# Separates the ETag from the body in a cache entry. Entries are strings,
+# since Redis is read with decoded responses.
+_ENTRY_SEPARATOR = "\n"
+
+class CachedResponse(NamedTuple):
+    """A response body and its entity tag."""
+    body: bytes
+    etag: str
+
+def make_etag(body: bytes) -> str:
+    """Strong entity tag of a response body."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+def response_cache_key(kind: str, key: str) -> str:
+    """Cache key of the response of one kind, e.g. an analysis, for a key such as an analysis id."""
+    return make_namespaced_key("response", kind, RESPONSE_SCHEMA_VERSION, key)
+
+def get_cached_response(cache: CacheBase, kind: str, key: str) -> Optional[CachedResponse]:
+    """Get a cached response body, None when missing or unreadable."""
+    entry = cache.get(response_cache_key(kind, key))
+    if not isinstance(entry, str) or _ENTRY_SEPARATOR not in entry:
+        return None
+    etag, body = entry.split(_ENTRY_SEPARATOR, 1)
+    return CachedResponse(body.encode("utf-8"), etag)
+
+def cache_response(cache: CacheBase, kind: str, key: str, body: bytes, ttl: int) -> CachedResponse:
+    """Cache a response body and return it with its ETag. Cache errors are only logged."""
+    response = CachedResponse(body, make_etag(body))
+    try:
+        cache.set(response_cache_key(kind, key), f"{response.etag}{_ENTRY_SEPARATOR}{body.decode('utf-8')}", ttl=ttl)
+    except Exception as e:
+        logger.warning("Failed to cache response for %s: %s", key, e)
+    return response
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers an ETag."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
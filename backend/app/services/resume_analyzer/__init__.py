@@ -1,94 +1,554 @@
 """Resume analyzer service."""
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Any, Optional, List
+import asyncio
 import logging
 from openai import AsyncOpenAI
 from app.services.openai_service import OpenAIService
+from app.services.analysis_store import AnalysisStoreBase, get_analysis_store
+from app.core import metrics
+from app.services import response_cache
+from app.services.cache import make_cache_key
+from app.services.prompts import ANALYSIS_MODE_COMPACT, ANALYSIS_MODE_FULL, PROMPT_VERSION
 from app.core.config import settings
+from app.core.tracing import span
+from app.services.resume_analyzer.pipeline import (
+    AnalysisContext,
+    AnalysisPipeline,
+    default_pipeline,
+    empty_token_usage,
+    make_analysis_id,
+    stored_result
+)
+from app.services.resume_analyzer.processors.normalize import normalize_text
+from app.services.resume_analyzer.processors.skills import match_skills, merge_technical_match
+from app.services.resume_analyzer.utils.model_router import ModelRouter
+from app.services.resume_analyzer.utils.point_table import RATIONALE_FIELDS, PointTable
+from app.services.resume_analyzer.utils.prescoring import prescore_resumes, select_top_k
+from app.utils.validation import (
+    CompactResumeSection,
+    ResumeSection,
+    ResumeSectionWithoutImprovements
+)
 
 logger = logging.getLogger(__name__)
 
+# Analyses are kept this long for follow-up requests about their points
+ANALYSIS_TTL_SECONDS = 86400
+
+# Point tables of this many recent analyses are kept built, so point lookups skip rebuilding them
+POINT_TABLE_CACHE_SIZE = 256
+
+class AnalysisNotFoundError(LookupError):
+    """Raised when a stored analysis, or a point within it, does not exist."""
+
+def _analysis_cache_key(analysis_id: str) -> str:
+    """Cache key under which an analysis is stored for follow-up requests."""
+    return f"analysis:{analysis_id}"
+
+def _resume_text_cache_key(analysis_id: str) -> str:
+    """Cache key under which the resume text of an analysis is stored for rankings."""
+    return f"analysis:{analysis_id}:resume"
+
+def _ranking_update(scores: Any, matches: Dict[int, Dict[str, Any]], total: int) -> Dict[str, Any]:
+    """
+    Build the ranking of all resumes from their pre-scores and finished matches.
+    
+    LLM-matched resumes come first by match score, then the rest by pre-score.
+    """
+    token_usage = empty_token_usage()
+    rankings = []
+    for index, prescore in enumerate(scores):
+        ranking = {"index": index, "prescore": round(float(prescore), 4), "jobMatchAnalysis": None}
+        match = matches.get(index)
+        if match is not None:
+            if match["status"] == "error":
+                ranking["error"] = match.get("message")
+            else:
+                ranking["jobMatchAnalysis"] = match["content"]
+            for key in token_usage:
+                token_usage[key] += match["token_usage"].get(key, 0)
+        rankings.append(ranking)
+    
+    def sort_key(ranking: Dict[str, Any]):
+        analysis = ranking["jobMatchAnalysis"]
+        return (analysis is None, -(analysis or {}).get("match_score", 0), -ranking["prescore"])
+    rankings.sort(key=sort_key)
+    for rank, ranking in enumerate(rankings, start=1):
+        ranking["rank"] = rank
+    
+    return {
+        "completed": len(matches),
+        "total": total,
+        "done": len(matches) == total,
+        "rankings": rankings,
+        "tokenUsage": token_usage
+    }
+
+async def _single_chunk(text: str) -> AsyncIterator[str]:
+    """Stream an already available text as one chunk."""
+    yield text
+
 class ResumeAnalyzer:
     """Service for analyzing resumes and matching against job descriptions."""
     
-    def __init__(self, openai_client: Optional[AsyncOpenAI] = None):
-        """Initialize the ResumeAnalyzer with OpenAI client."""
+    def __init__(
+        self,
+        openai_client: Optional[AsyncOpenAI] = None,
+        model_router: Optional[ModelRouter] = None,
+        analysis_store: Optional[AnalysisStoreBase] = None,
+        pipeline: Optional[AnalysisPipeline] = None
+    ):
+        """Initialize the ResumeAnalyzer with OpenAI client, model router, analysis store and pipeline."""
         if openai_client:
             self.openai_service = OpenAIService(openai_client)
         else:
             self.openai_service = OpenAIService(AsyncOpenAI(api_key=settings.OPENAI_API_KEY))
-        self.token_usage = {
-            "total_tokens": 0,
-            "prompt_tokens": 0,
-            "completion_tokens": 0,
-            "total_cost": 0.0
+        self.model_router = model_router or ModelRouter()
+        self.analysis_store = analysis_store or get_analysis_store()
+        self.pipeline = pipeline or default_pipeline()
+        self._point_tables: "OrderedDict[str, PointTable]" = OrderedDict()
+    
+    async def _analyze_content(
+        self,
+        text: str,
+        hints: Optional[str],
+        model: str,
+        analysis_mode: str = ANALYSIS_MODE_FULL,
+        include_improvements: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Analyze resume text with a model, escalating if its output fails validation.
+        The token usage returned includes that of calls before an escalation.
+        """
+        analysis = await self.openai_service.analyze_resume_content(
+            text,
+            hints=hints,
+            model=model,
+            analysis_mode=analysis_mode,
+            include_improvements=include_improvements
+        )
+        if analysis["status"] == "error":
+            return analysis
+        
+        larger_model = self.model_router.escalate(model)
+        if larger_model and settings.MODEL_ESCALATION_ENABLED:
+            if analysis_mode == ANALYSIS_MODE_COMPACT:
+                section_model = CompactResumeSection
+            elif not include_improvements:
+                section_model = ResumeSectionWithoutImprovements
+            else:
+                section_model = ResumeSection
+            try:
+                for section in analysis["content"].get("sections", []):
+                    section_model.model_validate(section)
+            except ValueError as e:
+                logger.warning("Escalating analysis from %s to %s: %s", model, larger_model, e)
+                escalated = await self._analyze_content(
+                    text, hints, larger_model, analysis_mode, include_improvements
+                )
+                if escalated["status"] == "error":
+                    return escalated
+                # Copy rather than mutate, the usage may be part of a shared cache entry
+                token_usage = {
+                    key: analysis["token_usage"].get(key, 0) + escalated["token_usage"].get(key, 0)
+                    for key in empty_token_usage()
+                }
+                return {**escalated, "token_usage": token_usage}
+        return analysis
+    
+    async def _match_job(self, resume_text: str, job_description: str) -> Dict[str, Any]:
+        """Match a resume against a job, with taxonomy skills decided locally."""
+        known_skills = match_skills(resume_text, job_description)
+        job_match = await self.openai_service.analyze_job_match(
+            resume_text, job_description, model=self.model_router.default_model, known_skills=known_skills
+        )
+        if job_match["status"] == "error":
+            return job_match
+        # Copy rather than mutate, the content may be a shared cache entry
+        content = {
+            **job_match["content"],
+            "technical_match": merge_technical_match(known_skills, job_match["content"].get("technical_match"))
         }
+        return {**job_match, "content": content}
     
-    def _update_token_usage(self, usage: Dict[str, Any]) -> None:
-        """Update token usage statistics."""
-        self.token_usage["total_tokens"] += usage.get("total_tokens", 0)
-        self.token_usage["prompt_tokens"] += usage.get("prompt_tokens", 0)
-        self.token_usage["completion_tokens"] += usage.get("completion_tokens", 0)
-        self.token_usage["total_cost"] += usage.get("total_cost", 0.0)
+    def analysis_id(
+        self,
+        resume_text: str,
+        job_description: Optional[str] = None,
+        analysis_mode: str = ANALYSIS_MODE_FULL,
+        include_improvements: bool = True
+    ) -> Optional[str]:
+        """ID that analyze_resume gives the analysis of these inputs, None if the resume is empty."""
+        resume_text = normalize_text(resume_text)
+        if not resume_text:
+            return None
+        job_description = normalize_text(job_description) if job_description else None
+        return make_analysis_id(
+            resume_text, job_description, analysis_mode, include_improvements, self.model_router.default_model
+        )
     
-    async def analyze_resume(self, resume_text: str, job_description: Optional[str] = None) -> Dict[str, Any]:
+    def get_cached_response(self, analysis_id: str) -> Optional[response_cache.CachedResponse]:
+        """The serialized API response of an analysis, if response caching is on and it was cached."""
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return None
+        with metrics.time_stage("response_cache"):
+            return response_cache.get_cached_response(self.openai_service.cache, "analysis", analysis_id)
+    
+    def cache_response(self, analysis_id: str, body: bytes) -> response_cache.CachedResponse:
+        """Keep the serialized API response of an analysis, if response caching is on."""
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return response_cache.CachedResponse(body, response_cache.make_etag(body))
+        return response_cache.cache_response(
+            self.openai_service.cache, "analysis", analysis_id, body, ttl=ANALYSIS_TTL_SECONDS
+        )
+    
+    async def analyze_resume(
+        self,
+        resume_text: str,
+        job_description: Optional[str] = None,
+        analysis_mode: str = ANALYSIS_MODE_FULL,
+        include_improvements: bool = True
+    ) -> Dict[str, Any]:
         """
         Analyze a resume and optionally match against a job description.
         
         Args:
             resume_text: The text content of the resume
             job_description: Optional job description to match against
+            analysis_mode: "compact" returns only booleans, metrics and scores per point
+            include_improvements: Whether to generate an improvement for every point up front
             
         Returns:
             Dict containing analysis results and token usage
         """
         logger.debug("Starting resume analysis")
+        ctx = AnalysisContext(
+            resume_text=resume_text,
+            job_description=job_description,
+            analysis_mode=analysis_mode,
+            include_improvements=include_improvements
+        )
+        with span(
+            "analyze_resume",
+            analysis__mode=analysis_mode,
+            analysis__job_match=job_description is not None
+        ) as current:
+            try:
+                result = await self.pipeline.run(self, ctx)
+            except Exception as e:
+                logger.error("Error in analyze_resume: %s", e, exc_info=True)
+                result = {
+                    "status": "error",
+                    "message": str(e),
+                    "tokenUsage": ctx.token_usage
+                }
+            current.set_attribute("analysis.status", str(result.get("status")))
+            if ctx.analysis_id:
+                current.set_attribute("analysis.id", ctx.analysis_id)
+            for name in ("total_tokens", "prompt_tokens", "completion_tokens"):
+                if isinstance(ctx.token_usage.get(name), int):
+                    current.set_attribute(f"llm.{name}", ctx.token_usage[name])
+            return result
+    
+    def _keep_point_table(self, analysis_id: str, table: PointTable) -> None:
+        """Keep the built point table of a recent analysis, dropping the least recently used."""
+        self._point_tables[analysis_id] = table
+        self._point_tables.move_to_end(analysis_id)
+        while len(self._point_tables) > POINT_TABLE_CACHE_SIZE:
+            self._point_tables.popitem(last=False)
+    
+    def _cache_analysis(self, analysis_id: str, table: PointTable, resume_text: str) -> None:
+        """Keep the points of an analysis and its resume text for follow-up requests."""
+        self._keep_point_table(analysis_id, table)
+        self.openai_service.cache.set(_analysis_cache_key(analysis_id), table.to_columns(), ttl=ANALYSIS_TTL_SECONDS)
+        self.openai_service.cache.set(_resume_text_cache_key(analysis_id), resume_text, ttl=ANALYSIS_TTL_SECONDS)
+    
+    async def _call_store(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Call an analysis store method, in a worker thread if the store blocks on I/O."""
+        function = getattr(self.analysis_store, method)
+        if self.analysis_store.blocking:
+            return await asyncio.to_thread(function, *args, **kwargs)
+        return function(*args, **kwargs)
+    
+    async def _load_record(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a stored analysis and put it back in the cache for follow-up requests.
+        Storage errors are logged and treated as a miss.
+        """
         try:
-            # Reset token usage for new analysis
-            self.token_usage = {
-                "total_tokens": 0,
-                "prompt_tokens": 0,
-                "completion_tokens": 0,
-                "total_cost": 0.0
-            }
-            
-            # Analyze resume content
-            logger.debug("Calling OpenAI service to analyze resume content")
-            resume_analysis = await self.openai_service.analyze_resume_content(resume_text)
+            record = await self._call_store("get", analysis_id)
+        except Exception as e:
+            logger.warning("Failed to load analysis %s: %s", analysis_id, e)
+            return None
+        if record is not None:
+            self._cache_analysis(
+                analysis_id,
+                PointTable.from_sections(record["result"]["resumeAnalysis"].get("sections", [])),
+                record["resume_text"]
+            )
+        return record
+    
+    async def _save_record(self, record: Dict[str, Any]) -> None:
+        """Store an analysis, a failure to do so does not fail the analysis."""
+        try:
+            await self._call_store("save", record)
+        except Exception as e:
+            logger.warning("Failed to store analysis %s: %s", record["analysis_id"], e)
+    
+    async def get_analysis(self, analysis_id: str) -> Dict[str, Any]:
+        """
+        Get an earlier analysis from storage.
+        
+        Raises:
+            AnalysisNotFoundError: If no analysis with this ID was stored
+        """
+        record = await self._load_record(analysis_id)
+        if record is None:
+            raise AnalysisNotFoundError(f"Analysis {analysis_id} not found")
+        return stored_result(record)
+    
+    async def get_resume_text(self, analysis_id: str) -> str:
+        """
+        Get the normalized resume text of an earlier analysis.
+        
+        Raises:
+            AnalysisNotFoundError: If the analysis does not exist or has expired
+        """
+        resume_text = self.openai_service.cache.get(_resume_text_cache_key(analysis_id))
+        if resume_text is None:
+            record = await self._load_record(analysis_id)
+            if record is None:
+                raise AnalysisNotFoundError(f"Analysis {analysis_id} not found or expired")
+            resume_text = record["resume_text"]
+        return resume_text
+    
+    async def stream_rankings(
+        self,
+        resumes: List[str],
+        job_description: str,
+        top_k: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Rank resumes against a job description as match scores arrive.
+        
+        Every resume is pre-scored locally, and only the top_k best are sent
+        to the LLM for a detailed job match, at most RANKING_CONCURRENCY at a
+        time. The first update holds the pre-scored ranking, and one more
+        follows per finished match.
+        
+        Args:
+            resumes: The text content of each resume
+            job_description: The job description to rank against
+            top_k: Number of resumes to match with the LLM, defaults to RANKING_TOP_K
             
-            if resume_analysis["status"] == "error":
-                logger.error(f"Resume analysis failed: {resume_analysis.get('message')}")
-                return resume_analysis
+        Returns:
+            AsyncIterator of updates with the full ranking, best first
             
-            # Update token usage
-            self._update_token_usage(resume_analysis["token_usage"])
+        Raises:
+            ValueError: If the job description is empty
+        """
+        top_k = settings.RANKING_TOP_K if top_k is None else top_k
+        resumes = [normalize_text(resume) for resume in resumes]
+        job_description = normalize_text(job_description)
+        if not job_description:
+            raise ValueError("Job description is empty after normalization")
+        
+        # Requirements extracted by an earlier match make the pre-score skill overlap more precise
+        requirements = self.openai_service.get_job_requirements(job_description)
+        scores = prescore_resumes(resumes, job_description, requirements)
+        selected = [index for index in select_top_k(scores, top_k) if resumes[index]]
+        return self._ranking_updates(resumes, job_description, scores, selected)
+    
+    async def _stored_job_match(self, resume_text: str, job_description: str) -> Optional[Dict[str, Any]]:
+        """
+        The job match of a stored analysis of this resume against this job, with
+        the same model and prompt version, if there is one.
+        Storage errors are logged and treated as a miss.
+        """
+        try:
+            found = await self._call_store(
+                "find",
+                resume_hash=make_cache_key(resume_text),
+                job_hash=make_cache_key(job_description),
+                model=self.model_router.default_model,
+                prompt_version=PROMPT_VERSION,
+                limit=1
+            )
+            record = await self._call_store("get", found[0]["analysis_id"]) if found else None
+        except Exception as e:
+            logger.warning("Failed to look up stored job match: %s", e)
+            return None
+        job_match = record["result"].get("jobMatchAnalysis") if record else None
+        if job_match is None:
+            return None
+        return {"status": "success", "content": job_match, "token_usage": empty_token_usage()}
+    
+    async def _ranking_updates(
+        self,
+        resumes: List[str],
+        job_description: str,
+        scores: Any,
+        selected: List[int]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Match the selected resumes and yield the ranking after each match.
+        
+        Every resume is matched against the full job description, all of them
+        concurrently under the same limit, so their scores are comparable.
+        Resumes already analyzed against this job reuse that stored match.
+        """
+        matches: Dict[int, Dict[str, Any]] = {}
+        semaphore = asyncio.Semaphore(settings.RANKING_CONCURRENCY)
+        
+        async def match(index: int):
+            stored = await self._stored_job_match(resumes[index], job_description)
+            if stored is not None:
+                return index, stored
+            async with semaphore:
+                return index, await self._match_job(resumes[index], job_description)
+        
+        yield _ranking_update(scores, matches, len(selected))
+        tasks = [asyncio.ensure_future(match(index)) for index in selected]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                index, result = await finished
+                if result["status"] == "error":
+                    logger.error("Job match for resume %s failed: %s", index, result.get("message"))
+                matches[index] = result
+                yield _ranking_update(scores, matches, len(selected))
+        finally:
+            # Stop outstanding matches when the consumer goes away, e.g. a closed stream
+            for task in tasks:
+                task.cancel()
+    
+    async def rank_resumes(
+        self,
+        resumes: List[str],
+        job_description: str,
+        top_k: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Rank resumes against a job description.
+        
+        Args:
+            resumes: The text content of each resume
+            job_description: The job description to rank against
+            top_k: Number of resumes to match with the LLM, defaults to RANKING_TOP_K
             
-            # Pass through OpenAI service response with camelCase keys
-            result = {
-                "status": resume_analysis["status"],
-                "resumeAnalysis": resume_analysis["content"],  # This contains the sections from analyze_resume_section
-                "tokenUsage": self.token_usage
+        Returns:
+            Dict containing one ranking per resume, best first, and token usage
+        """
+        try:
+            update = None
+            async for update in await self.stream_rankings(resumes, job_description, top_k):
+                pass
+            return {
+                "status": "success",
+                "rankings": update["rankings"],
+                "tokenUsage": update["tokenUsage"]
             }
             
-            # If job description provided, analyze match
-            if job_description:
-                logger.debug("Job description provided, analyzing match")
-                job_match = await self.openai_service.analyze_job_match(resume_text, job_description)
-                
-                if job_match["status"] == "error":
-                    logger.error(f"Job match analysis failed: {job_match.get('message')}")
-                    return job_match
-                
-                # Update token usage
-                self._update_token_usage(job_match["token_usage"])
-                # Add job match analysis with camelCase
-                result["jobMatchAnalysis"] = job_match["content"]
-            
-            return result
-            
         except Exception as e:
-            logger.error(f"Error in analyze_resume: {str(e)}", exc_info=True)
+            logger.error("Error in rank_resumes: %s", e, exc_info=True)
             return {
                 "status": "error",
                 "message": str(e),
-                "tokenUsage": self.token_usage
+                "tokenUsage": empty_token_usage()
             }
+    
+    async def _get_point(self, analysis_id: str, section_index: int, point_index: int) -> Dict[str, Any]:
+        """Look up a section and point of a stored analysis."""
+        table = self._point_tables.get(analysis_id)
+        if table is not None:
+            self._point_tables.move_to_end(analysis_id)
+        else:
+            stored = self.openai_service.cache.get(_analysis_cache_key(analysis_id))
+            if stored is not None:
+                table = PointTable.from_stored(stored)
+                self._keep_point_table(analysis_id, table)
+            elif await self._load_record(analysis_id) is None:
+                raise AnalysisNotFoundError(f"Analysis {analysis_id} not found or expired")
+            else:
+                # Loading the record kept its table
+                table = self._point_tables[analysis_id]
+        if not 0 <= section_index < table.section_count:
+            raise AnalysisNotFoundError(f"Section {section_index} not found in analysis {analysis_id}")
+        try:
+            point = table.point(section_index, point_index)
+        except IndexError:
+            raise AnalysisNotFoundError(f"Point {point_index} not found in section {section_index}")
+        return {"section_type": table.section_types[section_index], "point": point}
+    
+    async def explain_point(self, analysis_id: str, section_index: int, point_index: int) -> Dict[str, Any]:
+        """
+        Get the STAR assessment with rationales for one point of a stored analysis.
+        
+        Points from full analyses already carry rationales and are returned
+        as-is; points from compact analyses are explained by the LLM.
+        
+        Args:
+            analysis_id: ID returned with the analysis
+            section_index: Index of the section in resumeAnalysis.sections
+            point_index: Index of the point within the section
+            
+        Returns:
+            Dict containing the point text, STAR assessment and token usage
+            
+        Raises:
+            AnalysisNotFoundError: If the analysis or point does not exist
+            ValueError: If the point is an education entry rather than a STAR point
+        """
+        found = await self._get_point(analysis_id, section_index, point_index)
+        point = found["point"]
+        if "star" not in point:
+            raise ValueError("STAR rationales are only available for achievement points")
+        
+        token_usage = empty_token_usage()
+        star = point["star"]
+        if "situation_rationale" not in star:
+            explanation = await self.openai_service.explain_point(found["section_type"], point["text"], star)
+            if explanation["status"] == "error":
+                logger.error("Point rationale failed: %s", explanation.get("message"))
+                return explanation
+            # Only the rationales are taken, the flags the client already has stay as stored
+            star = {**star, **{field: explanation["content"][field] for field in RATIONALE_FIELDS}}
+            token_usage = explanation["token_usage"]
+        
+        return {
+            "status": "success",
+            "analysisId": analysis_id,
+            "sectionIndex": section_index,
+            "pointIndex": point_index,
+            "text": point["text"],
+            "star": star,
+            "tokenUsage": token_usage
+        }
+    
+    async def improve_point(self, analysis_id: str, section_index: int, point_index: int) -> AsyncIterator[str]:
+        """
+        Get an improved version of one point of a stored analysis.
+        
+        Improvements already in the analysis are returned as-is; otherwise one
+        is generated from the point's cached STAR assessment. Lookup errors are
+        raised here, before anything is streamed.
+        
+        Args:
+            analysis_id: ID returned with the analysis
+            section_index: Index of the section in resumeAnalysis.sections
+            point_index: Index of the point within the section
+            
+        Returns:
+            AsyncIterator[str]: Chunks of the improved point
+            
+        Raises:
+            AnalysisNotFoundError: If the analysis or point does not exist
+            ValueError: If the point is an education entry rather than a STAR point
+        """
+        found = await self._get_point(analysis_id, section_index, point_index)
+        point = found["point"]
+        if "star" not in point:
+            raise ValueError("Improvements are only available for achievement points")
+        if point.get("improvement"):
+            return _single_chunk(point["improvement"])
+        return self.openai_service.stream_improvement(found["section_type"], point["text"], point["star"])
@@ -0,0 +1,376 @@
+"""Staged resume analysis.
+
+An analysis runs through named stages that share one AnalysisContext:
+
+    normalize → load → split → analyze → match → score → recommend → validate → store
+
+Each stage is timed, can be swapped for another implementation by name,
+and can opt into caching its outputs, so stages can be optimized on their
+own and their work reused across requests. A stage ends the analysis early
+by setting the context's result, e.g. for errors or stored analyses.
+"""
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import logging
+import time
+from app.core import metrics
+from app.core.config import settings
+from app.core.tracing import span
+from app.services.cache import KEY_PART_SEPARATOR, CacheBase, make_cache_key, make_namespaced_key
+from app.services.pricing import estimate_cost
+from app.services.prompts import (
+    ANALYSIS_MODE_COMPACT,
+    ANALYSIS_MODE_FULL,
+    PROMPT_VERSION,
+    resume_analysis_system_prompt,
+    resume_analysis_user_messages
+)
+from app.services.resume_analyzer.processors.normalize import normalize_text
+from app.services.resume_analyzer.processors.pre_analysis import (
+    LOCAL_ONLY_SECTION_TYPES,
+    build_llm_input,
+    build_local_sections,
+    pre_analyze_resume
+)
+from app.services.resume_analyzer.utils.batch_scoring import build_score_table, resume_scores
+from app.services.resume_analyzer.utils.point_table import PointTable
+from app.services.resume_analyzer.utils.token import count_message_tokens
+from app.services.resume_analyzer.utils.recommendations import generate_section_recommendations
+from app.utils.validation import ValidatedResponse, validate_analysis_response
+
+if TYPE_CHECKING:
+    from app.services.resume_analyzer import ResumeAnalyzer
+
+logger = logging.getLogger(__name__)
+
+# Stage outputs kept in the cache are reused for this long
+STAGE_CACHE_TTL_SECONDS = 86400
+
+def stored_result(record: Dict[str, Any]) -> ValidatedResponse:
+    """
+    The response of a stored analysis, without token usage: serving it spends
+    nothing, the stored usage belongs to the request that generated it.
+    """
+    return ValidatedResponse({**record["result"], "tokenUsage": empty_token_usage()})
+
+def empty_token_usage() -> Dict[str, Any]:
+    """Token usage before any call was made."""
+    return {
+        "total_tokens": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cached_tokens": 0,
+        "total_cost": 0.0
+    }
+
+def make_analysis_id(
+    resume_text: str, job_description: Optional[str], analysis_mode: str, include_improvements: bool, model: str
+) -> str:
+    """ID of an analysis, from everything that affects its result."""
+    return make_cache_key(KEY_PART_SEPARATOR.join([
+        analysis_mode, str(include_improvements), model, PROMPT_VERSION, resume_text, job_description or ""
+    ]))
+
+@dataclass
+class AnalysisContext:
+    """State of one analysis, filled in stage by stage."""
+    resume_text: str
+    job_description: Optional[str] = None
+    analysis_mode: str = ANALYSIS_MODE_FULL
+    include_improvements: bool = True
+    model: str = ""
+    analysis_id: Optional[str] = None
+    # LLM calls as (text, hints, model), and sections analyzed without the LLM
+    calls: List[Tuple[str, Optional[str], str]] = field(default_factory=list)
+    local_sections: List[Dict[str, Any]] = field(default_factory=list)
+    content: Dict[str, Any] = field(default_factory=lambda: {"sections": []})
+    point_table: Optional[PointTable] = None
+    job_match: Optional[Dict[str, Any]] = None
+    scores: Optional[Dict[str, float]] = None
+    recommendations: Optional[List[Dict[str, Any]]] = None
+    response: Optional[Dict[str, Any]] = None
+    token_usage: Dict[str, Any] = field(default_factory=empty_token_usage)
+    timings: Dict[str, float] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+
+    def add_token_usage(self, usage: Dict[str, Any]) -> None:
+        """Add the usage of one LLM call."""
+        for key in self.token_usage:
+            self.token_usage[key] += usage.get(key, 0)
+
+    def fail(self, message: str) -> None:
+        """End the analysis with an error."""
+        self.result = {"status": "error", "message": message, "tokenUsage": self.token_usage}
+
+class Stage:
+    """
+    One step of an analysis.
+
+    Stages that return a cache key from cache_key have the context fields
+    named in outputs cached under it, and are skipped when they are found.
+    Cached outputs must be JSON-serializable.
+    """
+    name = ""
+    outputs: Tuple[str, ...] = ()
+
+    def cache_key(self, ctx: AnalysisContext) -> Optional[str]:
+        return None
+
+    async def run(self, analyzer: "ResumeAnalyzer", ctx: AnalysisContext) -> None:
+        raise NotImplementedError
+
+class NormalizeStage(Stage):
+    """Canonicalize texts so cosmetic variants share cache entries and cost fewer tokens."""
+    name = "normalize"
+
+    async def run(self, analyzer: "ResumeAnalyzer", ctx: AnalysisContext) -> None:
+        ctx.resume_text = normalize_text(ctx.resume_text)
+        if not ctx.resume_text:
+            ctx.fail("Resume text is empty after normalization")
+            return
+        if ctx.job_description:
+            ctx.job_description = normalize_text(ctx.job_description)
+        ctx.model = analyzer.model_router.default_model
+        ctx.analysis_id = make_analysis_id(
+            ctx.resume_text, ctx.job_description, ctx.analysis_mode, ctx.include_improvements, ctx.model
+        )
+
+class LoadStage(Stage):
+    """Serve analyses already on record from storage rather than regenerating them."""
+    name = "load"
+
+    async def run(self, analyzer: "ResumeAnalyzer", ctx: AnalysisContext) -> None:
+        record = await analyzer._load_record(ctx.analysis_id)
+        if record is not None:
+            logger.debug("Returning stored analysis %s", ctx.analysis_id)
+            ctx.result = stored_result(record)
+
+class SplitStage(Stage):
+    """Pre-analyze locally so the LLM only verifies signals and skips list-only sections."""
+    name = "split"
+    outputs = ("calls", "local_sections")
+
+    def cache_key(self, ctx: AnalysisContext) -> Optional[str]:
+        return make_namespaced_key(
+            "stage:split", PROMPT_VERSION, ctx.model, ctx.analysis_mode, str(ctx.include_improvements),
+            str(settings.PRE_ANALYSIS_ENABLED), str(settings.MODEL_ROUTING_ENABLED), ctx.resume_text
+        )
+
+    async def run(self, analyzer: "ResumeAnalyzer", ctx: AnalysisContext) -> None:
+        ctx.calls = [(ctx.resume_text, None, ctx.model)]
+        ctx.local_sections = []
+        if not settings.PRE_ANALYSIS_ENABLED:
+            return
+        pre_analysis = pre_analyze_resume(ctx.resume_text)
+        ctx.local_sections = build_local_sections(
+            pre_analysis,
+            compact=ctx.analysis_mode == ANALYSIS_MODE_COMPACT,
+            include_improvements=ctx.include_improvements
+        )
+        llm_sections = [section for section in pre_analysis if section.requires_llm]
+        if settings.MODEL_ROUTING_ENABLED:
+            groups = analyzer.model_router.group_by_model(llm_sections)
+        else:
+            groups = {ctx.model: llm_sections}
+        ctx.calls = [(*build_llm_input(group), model) for model, group in groups.items() if group]
+
+class AnalyzeStage(Stage):
+    """Analyze the sections with the LLM, concurrently when they were routed to different models."""
+    name = "analyze"
+
+    async def run(self, analyzer: "ResumeAnalyzer", ctx: AnalysisContext) -> None:
+        calls = [(text, hints or None, model) for text, hints, model in ctx.calls if text]
+        # Sized before any call, so oversized resumes cost nothing
+        prompt_tokens = [
+            count_message_tokens([
+                {"role": "system", "content": resume_analysis_system_prompt(ctx.analysis_mode)},
+                *({"role": "user", "content": content} for content in resume_analysis_user_messages(text, hints))
+            ], model)
+            for text, hints, model in calls
+        ]
+        if settings.MAX_PROMPT_TOKENS and sum(prompt_tokens) > settings.MAX_PROMPT_TOKENS:
+            ctx.fail(
+                f"Resume is too long to analyze: about {sum(prompt_tokens)} prompt tokens, "
+                f"the limit is {settings.MAX_PROMPT_TOKENS}"
+            )
+            return
+        logger.debug(
+            "Calling OpenAI service to analyze resume content with %s model(s), about %s prompt tokens ($%.4f)",
+            len(calls), sum(prompt_tokens),
+            sum(estimate_cost(tokens, 0, model) for tokens, (_, _, model) in zip(prompt_tokens, calls))
+        )
+        analyses = await asyncio.gather(*(
+            analyzer._analyze_content(text, hints, model, ctx.analysis_mode, ctx.include_improvements)
+            for text, hints, model in calls
+        ))
+
+        # Copy rather than mutate, the content may be a shared cache entry
+        content: Dict[str, Any] = {"sections": []}
+        for analysis in analyses:
+            if analysis["status"] == "error":
+                logger.error("Resume analysis failed: %s", analysis.get("message"))
+                ctx.result = analysis
+                return
+            ctx.add_token_usage(analysis["token_usage"])
+            content = {
+                **content,
+                **analysis["content"],
+                "sections": content["sections"] + list(analysis["content"].get("sections", []))
+            }
+        content["sections"] += ctx.local_sections
+        ctx.content = content
+        ctx.point_table = PointTable.from_sections(content["sections"])
+
+        # Keep the analysis so details for single points can be requested later
+        analyzer._cache_analysis(ctx.analysis_id, ctx.point_table, ctx.resume_text)
+
+class MatchStage(Stage):
+    """Match the resume against the job description, if one was given."""
+    name = "match"
+
+    async def run(self, analyzer: "ResumeAnalyzer", ctx: AnalysisContext) -> None:
+        if not ctx.job_description:
+            return
+        logger.debug("Job description provided, analyzing match")
+        job_match = await analyzer._match_job(ctx.resume_text, ctx.job_description)
+        if job_match["status"] == "error":
+            logger.error("Job match analysis failed: %s", job_match.get("message"))
+            ctx.result = job_match
+            return
+        ctx.add_token_usage(job_match["token_usage"])
+        ctx.job_match = job_match["content"]
+
+def _scored_sections(content: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Sections that recommendations are based on, without list-only ones such as Skills."""
+    return [
+        section for section in content.get("sections", [])
+        if not (isinstance(section, dict) and str(section.get("type", "")).upper() in LOCAL_ONLY_SECTION_TYPES)
+    ]
+
+class ScoreStage(Stage):
+    """Score the analyzed points from their table, with the batch scorer since it tolerates malformed points."""
+    name = "score"
+
+    async def run(self, analyzer: "ResumeAnalyzer", ctx: AnalysisContext) -> None:
+        table = ctx.point_table or PointTable.from_sections(ctx.content.get("sections", []))
+        ctx.scores = resume_scores(build_score_table([table], exclude_types=LOCAL_ONLY_SECTION_TYPES))[0]
+
+class RecommendStage(Stage):
+    """Turn weak points of the analysis into prioritized recommendations."""
+    name = "recommend"
+
+    async def run(self, analyzer: "ResumeAnalyzer", ctx: AnalysisContext) -> None:
+        ctx.recommendations = generate_section_recommendations(_scored_sections(ctx.content))
+
+class ValidateStage(Stage):
+    """Validate the whole response once, so stored copies are trusted when served again."""
+    name = "validate"
+
+    async def run(self, analyzer: "ResumeAnalyzer", ctx: AnalysisContext) -> None:
+        response = {
+            "status": "success",
+            "resumeAnalysis": ctx.content,
+            "tokenUsage": ctx.token_usage,
+            "analysisId": ctx.analysis_id
+        }
+        if ctx.job_match is not None:
+            response["jobMatchAnalysis"] = ctx.job_match
+        if ctx.scores is not None:
+            response["scores"] = ctx.scores
+        if ctx.recommendations is not None:
+            response["recommendations"] = ctx.recommendations
+        validated = validate_analysis_response(response)
+        if validated.get("status") == "error":
+            # Returned unstored, the endpoints report the validation error
+            logger.warning("Not storing analysis %s: %s", ctx.analysis_id, validated.get("message"))
+            ctx.result = response
+            return
+        ctx.response = validated
+
+class StoreStage(Stage):
+    """Keep the finished analysis for later requests."""
+    name = "store"
+
+    async def run(self, analyzer: "ResumeAnalyzer", ctx: AnalysisContext) -> None:
+        await analyzer._save_record({
+            "analysis_id": ctx.analysis_id,
+            "resume_hash": make_cache_key(ctx.resume_text),
+            "job_hash": make_cache_key(ctx.job_description) if ctx.job_description else None,
+            "model": ctx.model,
+            "prompt_version": PROMPT_VERSION,
+            "analysis_mode": ctx.analysis_mode,
+            "resume_text": ctx.resume_text,
+            "result": ctx.response
+        })
+        ctx.result = ctx.response
+
+class AnalysisPipeline:
+    """Stages of an analysis, run in order until one of them sets the result."""
+
+    def __init__(self, stages: Sequence[Stage]):
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Stage names must be unique: {names}")
+        self.stages = list(stages)
+
+    @property
+    def stage_names(self) -> List[str]:
+        return [stage.name for stage in self.stages]
+
+    def replace(self, name: str, stage: Stage) -> "AnalysisPipeline":
+        """
+        A copy of the pipeline with one stage swapped for another.
+
+        Raises:
+            KeyError: If the pipeline has no stage of that name
+        """
+        if name not in self.stage_names:
+            raise KeyError(f"Unknown stage: {name}")
+        return AnalysisPipeline([stage if s.name == name else s for s in self.stages])
+
+    async def run(self, analyzer: "ResumeAnalyzer", ctx: AnalysisContext) -> Dict[str, Any]:
+        """Run the stages and return the result, timing each stage into ctx.timings."""
+        cache: CacheBase = analyzer.openai_service.cache
+        for stage in self.stages:
+            started = time.perf_counter()
+            with span(f"analysis.{stage.name}") as current:
+                key = stage.cache_key(ctx)
+                cached = cache.get(key) if key else None
+                if isinstance(cached, dict) and set(stage.outputs) <= cached.keys():
+                    current.set_attribute("stage.cached", True)
+                    for output in stage.outputs:
+                        setattr(ctx, output, cached[output])
+                else:
+                    await stage.run(analyzer, ctx)
+                    if key and ctx.result is None:
+                        cache.set(
+                            key, {output: getattr(ctx, output) for output in stage.outputs}, ttl=STAGE_CACHE_TTL_SECONDS
+                        )
+            ctx.timings[stage.name] = time.perf_counter() - started
+            if ctx.result is not None:
+                break
+        metrics.record_stage_timings(ctx.timings)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Analysis %s stage timings: %s",
+                ctx.analysis_id,
+                ", ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in ctx.timings.items())
+            )
+        if ctx.result is None:
+            raise RuntimeError(f"Analysis pipeline ended without a result after {self.stage_names[-1]}")
+        return ctx.result
+
+def default_pipeline() -> AnalysisPipeline:
+    """The full analysis pipeline."""
+    return AnalysisPipeline([
+        NormalizeStage(),
+        LoadStage(),
+        SplitStage(),
+        AnalyzeStage(),
+        MatchStage(),
+        ScoreStage(),
+        RecommendStage(),
+        ValidateStage(),
+        StoreStage()
+    ])
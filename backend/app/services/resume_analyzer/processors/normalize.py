@@ -0,0 +1,163 @@
+"""Deterministic text normalization applied before caching and prompting.
+
+Resumes that differ only in whitespace, bullet glyphs, typographic quotes or
+PDF extraction artifacts are normalized to the same text, so they share a
+cache key and cost fewer prompt tokens.
+"""
+from typing import Callable, List
+import re
+import unicodedata
+from app.utils.file_utils import PAGE_BREAK
+
+# Canonical bullet prefix
+BULLET = "- "
+
+# Single characters mapped to a canonical replacement (None deletes the character)
+_CHARACTER_MAP = str.maketrans({
+    # Typographic quotes and primes
+    "\u2018": "'", "\u2019": "'", "\u201a": "'", "\u201b": "'", "\u2032": "'",
+    "\u201c": '"', "\u201d": '"', "\u201e": '"', "\u201f": '"', "\u2033": '"',
+    # Dashes and minus signs
+    "\u2010": "-", "\u2011": "-", "\u2012": "-", "\u2013": "-", "\u2014": "-",
+    "\u2015": "-", "\u2212": "-",
+    # Tabs and unusual spaces
+    "\t": " ", "\u00a0": " ", "\u2000": " ", "\u2001": " ", "\u2002": " ",
+    "\u2003": " ", "\u2004": " ", "\u2005": " ", "\u2006": " ", "\u2007": " ",
+    "\u2008": " ", "\u2009": " ", "\u200a": " ", "\u202f": " ", "\u205f": " ",
+    "\u3000": " ",
+    # Zero-width characters, byte order marks and soft hyphens
+    "\u200b": None, "\u200c": None, "\u200d": None, "\u2060": None,
+    "\ufeff": None, "\u00ad": None,
+    # Ligatures produced by PDF text extraction
+    "\ufb00": "ff", "\ufb01": "fi", "\ufb02": "fl", "\ufb03": "ffi",
+    "\ufb04": "ffl", "\ufb05": "st", "\ufb06": "st",
+    # Ellipsis
+    "\u2026": "...",
+    # Line separators
+    "\r": "\n", "\u2028": "\n", "\u2029": "\n", "\x0b": "\n",
+})
+
+# Control characters other than newline and page break
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0e-\x1f\x7f]")
+
+# Bullet glyphs at the start of a line, including Symbol font private-use bullets
+_BULLET_PREFIX = re.compile(
+    "^ *(?:["
+    "\u2022\u25cf\u25cb\u25e6\u25aa\u25ab\u25a0\u25a1\u25c6\u25c7"
+    "\u25ba\u25b6\u27a2\u27a4\u2192\u2713\u2714\u2756\u2219\u00b7\u2023\u2043"
+    "\uf0b7\uf0a7\uf076\uf0d8\uf0fc*"
+    "]|-(?= )) *",
+    re.MULTILINE
+)
+
+# A word broken across lines with a hyphen, e.g. "develop-\nment"
+_HYPHENATED_BREAK = re.compile("([A-Za-z\u00c0-\u024f])-\n *([a-z\u00df-\u024f])")
+
+# Page number lines such as "3", "Page 2", "Page 2 of 3", "2/3" or "- 2 -"
+_PAGE_NUMBER_LINE = re.compile(
+    r"^(?:page\s*)?-?\s*\d{1,3}\s*(?:(?:of|/)\s*\d{1,3})?\s*-?$",
+    re.IGNORECASE
+)
+
+_MULTIPLE_SPACES = re.compile(r" {2,}")
+_MULTIPLE_BLANK_LINES = re.compile(r"\n{3,}")
+
+# Number of lines at the top and bottom of a page checked for running headers/footers
+_PAGE_EDGE_LINES = 2
+
+
+def _normalize_characters(text: str) -> str:
+    """Compose unicode and map typographic variants to plain ASCII equivalents."""
+    text = unicodedata.normalize("NFC", text.replace("\r\n", "\n"))
+    text = text.translate(_CHARACTER_MAP)
+    return _CONTROL_CHARS.sub("", text)
+
+
+def _edge_signature(line: str) -> str:
+    """
+    Signature used to recognise the same header/footer on different pages.
+    Digits are kept, so lines that differ only in a date or number are not merged.
+    """
+    return line.strip().lower()
+
+
+def _strip_headers_and_footers(text: str) -> str:
+    """Remove page numbers and running headers/footers repeated across pages."""
+    pages = [page.split("\n") for page in text.split(PAGE_BREAK)]
+    # Without page breaks a short number line is content, not a page number
+    if len(pages) < 2:
+        return text
+
+    # Lines at the edges of more than one page are running headers/footers
+    seen_on_pages = {}
+    for page_index, lines in enumerate(pages):
+        content = [line for line in lines if line.strip()]
+        edges = content[:_PAGE_EDGE_LINES] + content[-_PAGE_EDGE_LINES:]
+        for line in edges:
+            seen_on_pages.setdefault(_edge_signature(line), set()).add(page_index)
+    repeated = {sig for sig, page_set in seen_on_pages.items() if len(page_set) > 1}
+
+    kept_pages = []
+    kept_repeated = set()
+    for lines in pages:
+        kept = []
+        for line in lines:
+            stripped = line.strip()
+            if _PAGE_NUMBER_LINE.match(stripped):
+                continue
+            signature = _edge_signature(line)
+            if stripped and signature in repeated:
+                # Keep the first occurrence, drop the repeats on later pages
+                if signature in kept_repeated:
+                    continue
+                kept_repeated.add(signature)
+            kept.append(line)
+        kept_pages.append("\n".join(kept))
+    return "\n".join(kept_pages)
+
+
+def _dehyphenate(text: str) -> str:
+    """Join words that were hyphenated across a line break."""
+    return _HYPHENATED_BREAK.sub(r"\1\2", text)
+
+
+def _unify_bullets(text: str) -> str:
+    """Replace the various bullet glyphs at the start of a line with a single style."""
+    return _BULLET_PREFIX.sub(BULLET, text)
+
+
+def _collapse_whitespace(text: str) -> str:
+    """Collapse runs of spaces, trim lines and keep at most one blank line in a row."""
+    lines = [_MULTIPLE_SPACES.sub(" ", line).strip() for line in text.split("\n")]
+    text = "\n".join(lines)
+    return _MULTIPLE_BLANK_LINES.sub("\n\n", text).strip()
+
+
+# Ordered normalization steps; each step is a pure str -> str function
+NORMALIZATION_STEPS: List[Callable[[str], str]] = [
+    _normalize_characters,
+    _strip_headers_and_footers,
+    _dehyphenate,
+    _unify_bullets,
+    _collapse_whitespace,
+]
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonicalize resume or job description text.
+
+    The output is deterministic: the same input always produces the same text,
+    and cosmetic variants of a document produce identical text.
+
+    Args:
+        text: Raw text, e.g. as extracted from a PDF or DOCX file
+
+    Returns:
+        str: Normalized text
+    """
+    if not text:
+        return ""
+    for step in NORMALIZATION_STEPS:
+        text = step(text)
+    return text
@@ -0,0 +1,240 @@
+"""Rule-based pre-analysis of resume sections.
+
+Finds the STAR and metrics signals that do not need an LLM (numbers,
+percentages, currency amounts, durations and leading action verbs) so the
+prompt can ask the model to verify them, and so sections that are never
+STAR-analysed (Skills, Languages) can skip the LLM entirely.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import re
+from app.services.resume_analyzer.processors.section import (
+    SectionHeaderMatcher,
+    split_into_typed_sections
+)
+
+# Section types that are listed as-is and never need LLM analysis
+LOCAL_ONLY_SECTION_TYPES = {"SKILLS", "LANGUAGES"}
+
+# Verbs that open a bullet describing an action the candidate took
+ACTION_VERBS = frozenset("""
+accelerated achieved acquired adapted administered advised analyzed architected
+assembled assessed automated boosted built championed coached collaborated
+compiled completed conceived conducted consolidated constructed consulted
+contributed converted coordinated created cut debugged decreased defined
+delivered deployed designed developed devised diagnosed directed doubled drafted
+drove eliminated enabled engineered enhanced established evaluated executed
+expanded facilitated formulated founded generated grew guided halved headed
+identified implemented improved increased influenced initiated innovated
+instituted integrated introduced investigated launched led maintained managed
+mentored migrated modeled modernized monitored negotiated optimized orchestrated
+organized oversaw partnered piloted pioneered planned presented prioritized
+produced programmed proposed prototyped published raised rebuilt redesigned
+reduced refactored reengineered resolved restructured revamped saved scaled
+secured shipped simplified solved spearheaded standardized steered streamlined
+strengthened supervised supported taught tested trained transformed tripled
+troubleshot unified upgraded validated wrote
+""".split())
+
+# Phrases that describe the context or motivation for an action
+_SITUATION_CUES = re.compile(
+    r"\b(?:to address|in order to|due to|because|facing|faced|amid|in response to|"
+    r"challenge|problem|bottleneck|legacy|manual|previously|which was|that was|"
+    r"to (?:improve|reduce|increase|enable|support|replace|eliminate|prevent|speed up))\b",
+    re.IGNORECASE
+)
+
+# Phrases that connect an action to a measurable outcome
+_RESULT_CUES = re.compile(
+    r"\b(?:resulting in|result(?:ed)? in|leading to|led to|which (?:cut|reduced|increased|improved|saved)|"
+    r"reduc\w*|increas\w*|improv\w*|sav(?:e|ed|ing)|grew|growth|boost\w*|cut|"
+    r"achiev\w*|decreas\w*|accelerat\w*|doubl\w*|tripl\w*|halv\w*|by)\b",
+    re.IGNORECASE
+)
+
+# Quantities that count as metrics, most specific first
+_METRIC_PATTERN = re.compile(
+    r"""
+    (?:[$€£¥₹]\s?\d[\d,]*(?:\.\d+)?\s?(?:[kmb]n?\b|million\b|billion\b|thousand\b)?)  # currency
+    | (?:\d[\d,]*(?:\.\d+)?\s?%)                                                     # percentage
+    | (?:\d+(?:\.\d+)?\s?x\b)                                                        # multiplier
+    | (?:\d[\d,]*(?:\.\d+)?\+?\s?
+         (?:ms|milliseconds?|seconds?|secs?|minutes?|mins?|hours?|hrs?|days?|weeks?|months?|years?)\b)  # duration
+    | (?:\d[\d,]*(?:\.\d+)?\+?\s?(?:[kmgtp]b|[kmb])\+?(?![a-z]))                       # data sizes, abbreviated amounts
+    | (?:\b\d[\d,]*(?:\.\d+)?\+?)                                                    # other numbers
+    """,
+    re.IGNORECASE | re.VERBOSE
+)
+
+# Bare years and year ranges are dates, not metrics
+_YEAR = re.compile(r"^(?:19|20)\d{2}$")
+
+_BULLET_PREFIX = re.compile(r"^[-*]\s+")
+
+
+@dataclass
+class PointSignals:
+    """Signals found locally in a single resume line."""
+    text: str
+    metrics: List[str] = field(default_factory=list)
+    situation: bool = False
+    action: bool = False
+    result: bool = False
+
+    @property
+    def complete(self) -> bool:
+        """Whether every STAR component has a candidate signal."""
+        return self.situation and self.action and self.result
+
+
+@dataclass
+class SectionPreAnalysis:
+    """Local pre-analysis of a resume section."""
+    section_type: str
+    header: str
+    content: str
+    points: List[PointSignals]
+    requires_llm: bool
+
+
+def extract_metrics(text: str) -> List[str]:
+    """Extract quantities such as percentages, currency amounts and durations."""
+    metrics = []
+    for found in _METRIC_PATTERN.finditer(text):
+        metric = found.group(0).strip()
+        if _YEAR.match(metric):
+            continue
+        metrics.append(metric)
+    return metrics
+
+
+def analyze_point(line: str) -> PointSignals:
+    """Find candidate STAR components and metrics in a resume line."""
+    text = _BULLET_PREFIX.sub("", line.strip())
+    metrics = extract_metrics(text)
+    first_word = re.sub(r"[^a-z]", "", text.split(" ", 1)[0].lower()) if text else ""
+    return PointSignals(
+        text=text,
+        metrics=metrics,
+        situation=bool(_SITUATION_CUES.search(text)),
+        action=first_word in ACTION_VERBS,
+        result=bool(metrics) and bool(_RESULT_CUES.search(text))
+    )
+
+
+def pre_analyze_sections(
+    sections: List[Tuple[str, str, str]]
+) -> List[SectionPreAnalysis]:
+    """
+    Pre-analyze sections as returned by split_into_typed_sections.
+
+    Args:
+        sections: (section type, header name, content) tuples
+
+    Returns:
+        List[SectionPreAnalysis]: One entry per section, in the same order
+    """
+    results = []
+    for section_type, header, content in sections:
+        points = [analyze_point(line) for line in content.split("\n") if line.strip()]
+        results.append(SectionPreAnalysis(
+            section_type=section_type,
+            header=header,
+            content=content,
+            points=points,
+            requires_llm=section_type not in LOCAL_ONLY_SECTION_TYPES
+        ))
+    return results
+
+
+def pre_analyze_resume(
+    resume_text: str,
+    matcher: Optional[SectionHeaderMatcher] = None
+) -> List[SectionPreAnalysis]:
+    """Split resume text into sections and pre-analyze each of them."""
+    return pre_analyze_sections(split_into_typed_sections(resume_text, matcher))
+
+
+def build_llm_input(pre_analysis: List[SectionPreAnalysis]) -> Tuple[str, str]:
+    """
+    Build the resume text and verification hints sent to the LLM.
+
+    Sections that do not require the LLM are left out of the text.
+
+    Returns:
+        Tuple of (resume text, hints). Hints are empty if nothing was found.
+    """
+    llm_sections = [section for section in pre_analysis if section.requires_llm]
+    text = "\n\n".join(
+        section.content if section.section_type == "GENERAL"
+        else f"{section.header}\n{section.content}"
+        for section in llm_sections
+    )
+
+    hint_lines = []
+    for section in llm_sections:
+        # Contact details and summaries hold phone numbers and dates, not achievements
+        if section.section_type == "GENERAL":
+            continue
+        for point in section.points:
+            flags = [
+                name for name, present in (
+                    ("situation", point.situation),
+                    ("action", point.action),
+                    ("result", point.result)
+                ) if present
+            ]
+            if not flags and not point.metrics:
+                continue
+            hint = f"- {point.text[:60]}"
+            if flags:
+                hint += f" | candidate STAR: {', '.join(flags)}"
+            if point.metrics:
+                hint += f" | metrics: {', '.join(point.metrics)}"
+            hint_lines.append(hint)
+    return text, "\n".join(hint_lines)
+
+
+def build_local_sections(
+    pre_analysis: List[SectionPreAnalysis],
+    compact: bool = False,
+    include_improvements: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Build analysis output for sections that skip the LLM.
+
+    Args:
+        pre_analysis: Pre-analyzed sections
+        compact: Leave out rationales and improvements, as compact analyses do
+        include_improvements: Whether full analyses include an improvement per point
+    """
+    sections = []
+    for section in pre_analysis:
+        if section.requires_llm:
+            continue
+        rationale = f"Not evaluated: {section.section_type.title()} entries are not STAR statements"
+        points = []
+        for point in section.points:
+            if compact:
+                star = {"situation": False, "action": False, "result": False, "complete": False}
+            else:
+                star = {
+                    "situation": False,
+                    "situation_rationale": rationale,
+                    "action": False,
+                    "action_rationale": rationale,
+                    "result": False,
+                    "result_rationale": rationale,
+                    "complete": False
+                }
+            entry = {
+                "text": point.text,
+                "star": star,
+                "metrics": point.metrics,
+                "technical_score": 0
+            }
+            if include_improvements and not compact:
+                entry["improvement"] = ""
+            points.append(entry)
+        sections.append({"type": section.section_type.title(), "points": points})
+    return sections
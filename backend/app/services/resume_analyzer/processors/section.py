@@ -1,6 +1,7 @@
 """Resume section processing utilities."""
-from typing import List, Tuple, Dict
+from typing import List, NamedTuple, Optional, Tuple, Dict
 import re
+from app.services.resume_analyzer.utils.token import count_tokens
 
 # Section patterns for identifying resume sections
 SECTION_PATTERNS = {
@@ -40,190 +41,146 @@ SECTION_PATTERNS = {
 }
 
 def estimate_tokens(text: str) -> int:
-    """Rough estimation of tokens in text (1 token ≈ 4 characters)."""
-    return len(text) // 4
+    """Count tokens in text with the configured model's tokenizer."""
+    return count_tokens(text)
 
-def split_into_sections(text: str) -> List[Tuple[str, str]]:
-    """Split resume text into sections while preserving unicode characters."""
+class HeaderMatch(NamedTuple):
+    """A line recognised as a section header."""
+    section_type: str  # Canonical section type, e.g. "EXPERIENCE"
+    header: str  # Header name as used for the section
+    remainder: str  # Text following the header on the same line
+
+
+class SectionHeaderMatcher:
+    """
+    Classifies resume lines as section headers with one precompiled regex.
+
+    All header names are compiled into a single case-insensitive alternation,
+    longest names first, so each line is classified in one regex pass instead
+    of looping over every pattern. Extra (e.g. multilingual) header names can
+    be supplied per section type.
+    """
+
+    def __init__(self, patterns: Optional[Dict[str, List[str]]] = None):
+        self.patterns = {
+            section_type.upper(): list(names)
+            for section_type, names in (patterns or SECTION_PATTERNS).items()
+        }
+        # Upper-cased header name -> (section type, header name as configured)
+        self._lookup: Dict[str, Tuple[str, str]] = {}
+        for section_type, names in self.patterns.items():
+            for name in names:
+                self._lookup.setdefault(name.upper(), (section_type, name))
+
+        alternation = "|".join(
+            re.escape(name) for name in sorted(self._lookup, key=len, reverse=True)
+        )
+        self._regex = re.compile(f"(?:{alternation})", re.IGNORECASE)
+
+    def extended(self, extra_patterns: Dict[str, List[str]]) -> "SectionHeaderMatcher":
+        """Return a new matcher with additional header names per section type."""
+        merged = {section_type: list(names) for section_type, names in self.patterns.items()}
+        for section_type, names in extra_patterns.items():
+            merged.setdefault(section_type.upper(), []).extend(names)
+        return SectionHeaderMatcher(merged)
+
+    def _resolve(self, matched: str) -> Tuple[str, str]:
+        """Map matched text back to its section type and configured header name."""
+        return self._lookup.get(matched.upper(), (None, matched))
+
+    def section_type(self, header: str) -> Optional[str]:
+        """Get the canonical section type for a header name, if it contains one."""
+        found = self._regex.search(header)
+        return self._resolve(found.group(0))[0] if found else None
+
+    def match(self, line: str) -> Optional[HeaderMatch]:
+        """
+        Classify a stripped line as a section header.
+
+        Recognises "Header: content" lines, standalone headers and headers
+        run together with their content (no space after the section name).
+        """
+        # First check for colon-separated headers
+        if ':' in line:
+            potential_header, remainder = line.split(':', 1)
+            potential_header = potential_header.strip()
+            found = self._regex.search(potential_header)
+            if found:
+                section_type = self._resolve(found.group(0))[0]
+                return HeaderMatch(section_type, potential_header, remainder.strip())
+
+        # Then check for exact matches
+        found = self._regex.fullmatch(line)
+        if found:
+            return HeaderMatch(self._resolve(found.group(0))[0], line, "")
+
+        # Then check for malformed headers (no space after section name)
+        found = self._regex.match(line)
+        if found:
+            section_type, name = self._resolve(found.group(0))
+            return HeaderMatch(section_type, name, line[found.end():].strip())
+
+        return None
+
+
+# Matcher for the built-in header names, compiled once at import
+DEFAULT_SECTION_MATCHER = SectionHeaderMatcher(SECTION_PATTERNS)
+
+def split_into_typed_sections(
+    text: str,
+    matcher: Optional[SectionHeaderMatcher] = None
+) -> List[Tuple[str, str, str]]:
+    """
+    Split resume text into sections in a single pass over its lines.
+
+    Returns:
+        List of (section type, header name, content) tuples. Text before the
+        first header is returned as a "GENERAL" section.
+    """
     if not text.strip():
         return []
     
+    matcher = matcher or DEFAULT_SECTION_MATCHER
     sections = []
+    current_type = None
     current_section = None
     current_text = []
     
     # Split text into lines while preserving unicode
-    lines = text.split('\n')
-    
-    for line in lines:
+    for line in text.split('\n'):
         line = line.strip()
         if not line:
             continue
         
-        # Check if line is a section header
-        is_header = False
-        header_name = None
-        
-        # First check for colon-separated headers
-        if ':' in line:
-            potential_header = line.split(':', 1)[0].strip()
-            for section_type, patterns in SECTION_PATTERNS.items():
-                if any(p.upper() in potential_header.upper() for p in patterns):
-                    is_header = True
-                    header_name = potential_header
-                    line = line.split(':', 1)[1].strip()
-                    break
-        
-        # Then check for standalone headers and malformed headers
-        if not is_header:
-            # Check for exact matches first
-            for section_type, patterns in SECTION_PATTERNS.items():
-                if any(p.upper() == line.upper() for p in patterns):
-                    is_header = True
-                    header_name = line
-                    line = ""
-                    break
-                # Then check for malformed headers (no space after section name)
-                if not is_header:
-                    for pattern in patterns:
-                        if line.upper().startswith(pattern.upper()):
-                            is_header = True
-                            header_name = pattern
-                            line = line[len(pattern):].strip()
-                            break
-                if is_header:
-                    break
-        
-        if is_header:
+        header = matcher.match(line)
+        if header:
             # Save previous section if exists
             if current_section and current_text:
-                sections.append((current_section, '\n'.join(current_text).strip()))
-            current_section = header_name
+                sections.append((current_type, current_section, '\n'.join(current_text).strip()))
+            current_type = header.section_type
+            current_section = header.header
             current_text = []
-            if line:
-                current_text.append(line)
+            if header.remainder:
+                current_text.append(header.remainder)
         else:
             if current_section is None:
                 # If no section has been identified yet, create a default section
+                current_type = "GENERAL"
                 current_section = "GENERAL"
             current_text.append(line)
     
     # Add the last section
     if current_section and current_text:
-        sections.append((current_section, '\n'.join(current_text).strip()))
+        sections.append((current_type, current_section, '\n'.join(current_text).strip()))
     
     return sections
 
-def optimize_sections(sections: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
-    """
-    Optimize sections by intelligently combining small sections and splitting large ones.
-    
-    The optimization process:
-    1. Splits large sections into smaller, manageable chunks
-    2. Groups related small sections together while maintaining context
-    3. Ensures optimal token usage for API calls
-    """
-    MIN_TOKENS = 100  # Minimum tokens for efficient API usage
-    MAX_TOKENS = 500  # Maximum tokens per section for API limits
-    OPTIMAL_TOKENS = 300  # Target token count for best analysis results
-    
-    def should_combine_sections(name1: str, name2: str, tokens1: int, tokens2: int) -> bool:
-        """Determine if two sections should be combined based on name and size."""
-        # Check if sections are related
-        if any(word in name1.upper() for word in ["PART", "CONTINUED"]):
-            return False
-            
-        # Check if sections belong to same category
-        for patterns in section_groups.values():
-            if any(p.upper() in name1.upper() for p in patterns) and any(p.upper() in name2.upper() for p in patterns):
-                # Only combine if resulting size is optimal
-                combined_tokens = tokens1 + tokens2
-                return combined_tokens <= OPTIMAL_TOKENS
-        return False
-    
-    # Section grouping patterns
-    section_groups = {
-        "PROFESSIONAL": ["EXPERIENCE", "WORK EXPERIENCE", "EMPLOYMENT", "WORK HISTORY", "PROFESSIONAL BACKGROUND"],
-        "TECHNICAL": ["SKILLS", "TECHNICAL SKILLS", "COMPETENCIES", "TECHNOLOGIES", "TOOLS"],
-        "PROJECTS": ["PROJECTS", "PROJECT EXPERIENCE", "SIDE PROJECTS", "KEY PROJECTS", "PORTFOLIO"],
-        "ACADEMIC": ["EDUCATION", "CERTIFICATIONS", "PUBLICATIONS", "ACADEMIC", "TRAINING"],
-        "ACHIEVEMENTS": ["ACHIEVEMENTS", "AWARDS", "ACCOMPLISHMENTS", "HONORS", "RECOGNITION"],
-        "SUMMARY": ["SUMMARY", "PROFILE", "OBJECTIVE", "ABOUT", "INTRODUCTION"]
-    }
-    
-    # First pass: Split large sections
-    split_sections = []
-    for section_name, content in sections:
-        tokens = estimate_tokens(content)
-        
-        if tokens > MAX_TOKENS:
-            # Split into chunks while preserving logical breaks (bullet points, paragraphs)
-            chunks = []
-            current_chunk = []
-            current_tokens = 0
-            
-            # Split by natural breaks (bullet points, paragraphs)
-            for paragraph in content.split('\n\n'):
-                paragraph_tokens = estimate_tokens(paragraph)
-                
-                # If paragraph itself is too large, split by lines
-                if paragraph_tokens > MAX_TOKENS:
-                    for line in paragraph.split('\n'):
-                        line_tokens = estimate_tokens(line)
-                        if current_tokens + line_tokens > OPTIMAL_TOKENS and current_chunk:
-                            chunks.append('\n'.join(current_chunk))
-                            current_chunk = [line]
-                            current_tokens = line_tokens
-                        else:
-                            current_chunk.append(line)
-                            current_tokens += line_tokens
-                else:
-                    if current_tokens + paragraph_tokens > OPTIMAL_TOKENS and current_chunk:
-                        chunks.append('\n'.join(current_chunk))
-                        current_chunk = [paragraph]
-                        current_tokens = paragraph_tokens
-                    else:
-                        current_chunk.append(paragraph)
-                        current_tokens += paragraph_tokens
-            
-            # Add remaining content
-            if current_chunk:
-                chunks.append('\n'.join(current_chunk))
-            
-            # Create sections from chunks
-            for i, chunk in enumerate(chunks, 1):
-                suffix = f" (Part {i})" if len(chunks) > 1 else ""
-                split_sections.append((f"{section_name}{suffix}", chunk.strip()))
-        else:
-            split_sections.append((section_name, content))
-    
-    # Second pass: Group related small sections
-    grouped_sections = []
-    i = 0
-    while i < len(split_sections):
-        current_name, current_content = split_sections[i]
-        current_tokens = estimate_tokens(current_content)
-        combined_content = [current_content]
-        
-        # Look ahead for sections to combine
-        j = i + 1
-        while j < len(split_sections):
-            next_name, next_content = split_sections[j]
-            next_tokens = estimate_tokens(next_content)
-            
-            if should_combine_sections(current_name, next_name, current_tokens, next_tokens):
-                combined_content.append(next_content)
-                current_tokens += next_tokens
-                j += 1
-            else:
-                break
-        
-        # Add combined or single section
-        if len(combined_content) > 1:
-            grouped_sections.append((current_name, '\n\n'.join(combined_content)))
-            i = j
-        else:
-            grouped_sections.append((current_name, current_content))
-            i += 1
-    
-    return grouped_sections
+def split_into_sections(
+    text: str,
+    matcher: Optional[SectionHeaderMatcher] = None
+) -> List[Tuple[str, str]]:
+    """Split resume text into sections while preserving unicode characters."""
+    return [
+        (header, content)
+        for _, header, content in split_into_typed_sections(text, matcher)
+    ]
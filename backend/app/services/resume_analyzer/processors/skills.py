@@ -0,0 +1,249 @@
+"""Local skill taxonomy for deterministic technical matching.
+
+Skills are found by one compiled alternation of every alias, so a text is
+scanned once no matter how large the taxonomy grows, and every alias maps
+to one canonical name ("k8s" and "Kubernetes" are the same skill). Matches
+are evidence for the LLM's technical match, which they add to but never
+override.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import re
+
+# Canonical skill name and the aliases it is written as, matched case-insensitively.
+# Names are not matched themselves, so words that are also plain English ("Go",
+# "Excel", "Spring", "Spark", "Rails", "Agile") and short acronyms with other
+# meanings ("ML", "EKS") are only listed in unambiguous forms
+SKILL_TAXONOMY: Dict[str, Tuple[str, ...]] = {
+    # Languages
+    "Python": ("python", "python3"),
+    "Java": ("java",),
+    "JavaScript": ("javascript", "js", "ecmascript", "es6"),
+    "TypeScript": ("typescript",),
+    "Go": ("golang", "go lang"),
+    "Rust": ("rust",),
+    "C++": ("c++", "cpp"),
+    "C#": ("c#", "csharp", "c sharp"),
+    "Ruby": ("ruby",),
+    "PHP": ("php",),
+    "Kotlin": ("kotlin",),
+    "Swift": ("swiftui", "swift ui", "swift language"),
+    "Scala": ("scala",),
+    "SQL": ("sql",),
+    "Bash": ("bash", "shell scripting"),
+    # Web and backend frameworks
+    "React": ("react", "react.js", "reactjs"),
+    "Angular": ("angular", "angularjs", "angular.js"),
+    "Vue.js": ("vue", "vue.js", "vuejs"),
+    "Node.js": ("node.js", "nodejs"),
+    "Express": ("express.js", "expressjs"),
+    "Next.js": ("next.js", "nextjs"),
+    "Django": ("django",),
+    "Flask": ("flask",),
+    "FastAPI": ("fastapi",),
+    "Spring": ("spring boot", "springboot", "spring framework"),
+    "Ruby on Rails": ("ruby on rails",),
+    ".NET": (".net", "dotnet", "asp.net", ".net core"),
+    "GraphQL": ("graphql",),
+    "REST APIs": ("restful", "rest api", "rest apis", "restful api", "restful apis"),
+    "gRPC": ("grpc",),
+    # Data stores and messaging
+    "PostgreSQL": ("postgresql", "postgres", "psql"),
+    "MySQL": ("mysql",),
+    "SQL Server": ("sql server", "mssql", "ms sql"),
+    "Oracle Database": ("oracle db", "oracle database"),
+    "SQLite": ("sqlite",),
+    "MongoDB": ("mongodb", "mongo"),
+    "Redis": ("redis",),
+    "Cassandra": ("cassandra",),
+    "DynamoDB": ("dynamodb", "dynamo db"),
+    "Elasticsearch": ("elasticsearch", "elastic search", "opensearch"),
+    "Kafka": ("kafka", "apache kafka"),
+    "RabbitMQ": ("rabbitmq",),
+    "Snowflake": ("snowflake",),
+    "BigQuery": ("bigquery", "big query"),
+    # Data and machine learning
+    "Spark": ("apache spark", "pyspark", "spark sql", "spark streaming"),
+    "Hadoop": ("hadoop",),
+    "Airflow": ("airflow", "apache airflow"),
+    "dbt": ("dbt",),
+    "Pandas": ("pandas",),
+    "NumPy": ("numpy",),
+    "scikit-learn": ("scikit-learn", "sklearn", "scikit learn"),
+    "TensorFlow": ("tensorflow",),
+    "PyTorch": ("pytorch",),
+    "Machine Learning": ("machine learning",),
+    "Deep Learning": ("deep learning",),
+    "NLP": ("nlp", "natural language processing"),
+    "Computer Vision": ("computer vision",),
+    "LLMs": ("llm", "llms", "large language models", "large language model"),
+    "Tableau": ("tableau",),
+    "Power BI": ("power bi", "powerbi"),
+    "Excel": ("ms excel", "microsoft excel", "advanced excel"),
+    # Cloud and infrastructure
+    "AWS": ("aws", "amazon web services"),
+    "GCP": ("gcp", "google cloud", "google cloud platform"),
+    "Azure": ("azure", "microsoft azure"),
+    "Docker": ("docker",),
+    "Kubernetes": ("kubernetes", "k8s", "amazon eks", "google kubernetes engine", "azure kubernetes service"),
+    "Terraform": ("terraform",),
+    "Ansible": ("ansible",),
+    "Helm": ("helm chart", "helm charts"),
+    "Linux": ("linux", "unix"),
+    "Nginx": ("nginx",),
+    "Serverless": ("serverless", "aws lambda", "lambda functions"),
+    "Microservices": ("microservices", "microservice", "micro-services"),
+    "CI/CD": ("ci/cd", "cicd", "continuous integration", "continuous delivery", "continuous deployment"),
+    "Jenkins": ("jenkins",),
+    "GitHub Actions": ("github actions",),
+    "GitLab CI": ("gitlab ci", "gitlab-ci"),
+    "Git": ("git",),
+    "Prometheus": ("prometheus",),
+    "Grafana": ("grafana",),
+    "Datadog": ("datadog",),
+    "OpenTelemetry": ("opentelemetry", "otel"),
+    # Frontend and mobile
+    "HTML": ("html", "html5"),
+    "CSS": ("css", "css3"),
+    "Sass": ("sass", "scss"),
+    "Tailwind CSS": ("tailwind", "tailwindcss", "tailwind css"),
+    "Redux": ("redux",),
+    "React Native": ("react native",),
+    "Flutter": ("flutter",),
+    "Android": ("android",),
+    "iOS": ("ios",),
+    # Practices
+    "Agile": ("scrum", "kanban", "agile methodology", "agile methodologies", "agile development"),
+    "TDD": ("tdd", "test-driven development", "test driven development"),
+    "Unit Testing": ("unit testing", "unit tests", "pytest", "junit", "jest"),
+    "System Design": ("system design", "distributed systems"),
+    "Data Structures": ("data structures",),
+    "Security": ("appsec", "application security", "cybersecurity", "owasp"),
+}
+
+# Characters that may continue a skill name, so "java" does not match inside "javascript"
+_WORD_CHARS = r"a-z0-9+#"
+
+
+@dataclass(frozen=True)
+class SkillIndex:
+    """Compiled alias matcher for a skill taxonomy."""
+    pattern: re.Pattern
+    canonical: Mapping[str, str]
+    names: Mapping[str, str]
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical skills mentioned in a text, in order of first mention."""
+        found: Dict[str, None] = {}
+        for match in self.pattern.finditer(text.lower()):
+            found.setdefault(self.canonical[_normalize_alias(match.group(0))], None)
+        return list(found)
+
+    def canonicalize(self, skill: str) -> str:
+        """Canonical name of a skill, or the skill itself when the taxonomy does not know it."""
+        name = skill.strip()
+        key = _normalize_alias(name)
+        return self.canonical.get(key) or self.names.get(key) or name
+
+
+def _normalize_alias(alias: str) -> str:
+    """Lowercase an alias and collapse its inner whitespace and hyphens."""
+    return re.sub(r"[\s-]+", " ", alias.strip().lower())
+
+
+def build_skill_index(taxonomy: Mapping[str, Iterable[str]]) -> SkillIndex:
+    """
+    Compile a taxonomy into one matcher.
+
+    Aliases are tried longest first so multi-word skills win over their
+    parts ("react native" over "react"), and spaces or hyphens between the
+    words of an alias match each other.
+    """
+    canonical: Dict[str, str] = {}
+    for name, aliases in taxonomy.items():
+        for alias in aliases:
+            canonical.setdefault(_normalize_alias(alias), name)
+    alternatives = [
+        r"[\s-]+".join(re.escape(word) for word in alias.split(" "))
+        for alias in sorted(canonical, key=len, reverse=True)
+    ]
+    pattern = re.compile(
+        rf"(?<![{_WORD_CHARS}])(?:{'|'.join(alternatives)})(?![{_WORD_CHARS}]|\.[a-z])"
+    )
+    names = {_normalize_alias(name): name for name in taxonomy}
+    return SkillIndex(pattern=pattern, canonical=canonical, names=names)
+
+
+@lru_cache(maxsize=1)
+def default_skill_index() -> SkillIndex:
+    """Skill index for the built-in taxonomy, compiled on first use."""
+    return build_skill_index(SKILL_TAXONOMY)
+
+
+def match_skills(
+    resume_text: str,
+    job_description: str,
+    index: Optional[SkillIndex] = None
+) -> Dict[str, Any]:
+    """
+    Match the taxonomy skills of a job against a resume.
+
+    Returns:
+        Dict[str, Any]: matched_skills, missing_skills and skill_coverage_score
+        (0-100) over the job's taxonomy skills
+    """
+    index = index or default_skill_index()
+    job_skills = index.extract(job_description)
+    resume_skills = set(index.extract(resume_text))
+    matched = [skill for skill in job_skills if skill in resume_skills]
+    missing = [skill for skill in job_skills if skill not in resume_skills]
+    return {
+        "matched_skills": matched,
+        "missing_skills": missing,
+        "skill_coverage_score": _coverage(matched, missing)
+    }
+
+
+def _coverage(matched: Sequence[str], missing: Sequence[str]) -> float:
+    """Share of matched skills as a 0-100 score."""
+    total = len(matched) + len(missing)
+    return round(100 * len(matched) / total, 1) if total else 0.0
+
+
+def merge_technical_match(
+    local: Dict[str, Any],
+    llm: Optional[Dict[str, Any]],
+    index: Optional[SkillIndex] = None
+) -> Dict[str, Any]:
+    """
+    Combine the taxonomy match with the LLM's technical match.
+
+    The taxonomy only adds evidence: the LLM's verdicts and coverage score
+    stand, and taxonomy skills the LLM did not mention are appended. Names
+    are canonicalized so aliases do not show up twice. The coverage score
+    is computed over the merged lists only when the LLM gave none.
+    """
+    index = index or default_skill_index()
+    llm = llm if isinstance(llm, dict) else {}
+    known = set()
+    merged = {"matched_skills": [], "missing_skills": []}
+    for key in ("matched_skills", "missing_skills"):
+        for skill in llm.get(key) or []:
+            if not isinstance(skill, str) or not skill.strip():
+                continue
+            name = index.canonicalize(skill)
+            if name.lower() not in known:
+                known.add(name.lower())
+                merged[key].append(name)
+    for key in ("matched_skills", "missing_skills"):
+        for skill in local[key]:
+            if skill.lower() not in known:
+                known.add(skill.lower())
+                merged[key].append(skill)
+
+    if "skill_coverage_score" in llm:
+        merged["skill_coverage_score"] = llm["skill_coverage_score"]
+    else:
+        merged["skill_coverage_score"] = _coverage(merged["matched_skills"], merged["missing_skills"])
+    return merged
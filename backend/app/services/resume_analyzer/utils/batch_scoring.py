@@ -0,0 +1,297 @@
+"""Columnar scoring of many analyzed resumes at once.
+
+Points of all resumes are flattened into NumPy columns in one walk, then
+every per-resume and per-section aggregate is computed with bincount
+passes instead of nested loops. The formulas are those of
+calculate_resume_scores and calculate_overall_scores in scoring.py, and
+final values are rounded with Python's round() so results are identical.
+The one difference is education: the LLM rates each entry of an Education
+section, which the legacy formula ignores, so sections without a
+section-level reputation score the average of their entries.
+Analyses given as PointTables are read from their columns without walking
+the dicts of their points.
+"""
+from dataclasses import dataclass
+from typing import AbstractSet, Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from app.services.resume_analyzer.utils.point_table import PointTable
+
+EDUCATION_SECTION_TYPE = "Education"
+
+# Contribution scores outside this range are ignored, as in calculate_contribution_score
+CONTRIBUTION_RANGE = (0.0, 5.0)
+
+
+@dataclass(frozen=True)
+class ScoreTable:
+    """Flattened analysis points, one array element per point or per section."""
+    resume_count: int
+    # Per non-education point
+    point_resume: np.ndarray
+    point_section: np.ndarray
+    star_complete: np.ndarray
+    metric_count: np.ndarray
+    technical_score: np.ndarray
+    contribution: np.ndarray  # NaN when missing or out of range
+    # Per section
+    section_resume: np.ndarray
+    section_type: List[str]
+    # Per education section with a reputation score
+    education_resume: np.ndarray
+    education_section: np.ndarray
+    education_score: np.ndarray
+
+
+def _number(value: Any, default: float = 0.0) -> float:
+    """A numeric field as float, the default for anything else."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return default
+    return float(value)
+
+
+def _contribution(point: Dict[str, Any]) -> float:
+    """A point's contribution score, NaN when it does not count."""
+    try:
+        score = float(point.get("contribution"))
+    except (TypeError, ValueError):
+        return np.nan
+    low, high = CONTRIBUTION_RANGE
+    return score if low <= score <= high else np.nan
+
+
+def _reputation_score(item: Dict[str, Any]) -> Optional[float]:
+    """Average reputation of an education section or entry, if it has one."""
+    reputation = item.get("subject_course_school_reputation")
+    if not isinstance(reputation, dict):
+        return None
+    return (_number(reputation.get("domestic_score")) + _number(reputation.get("international_score"))) / 2
+
+
+def _education_score(section: Dict[str, Any], points: List[Dict[str, Any]]) -> Optional[float]:
+    """Reputation of an education section, else the average reputation of its entries."""
+    score = _reputation_score(section)
+    if score is not None:
+        return score
+    entries = [score for score in map(_reputation_score, points) if score is not None]
+    return sum(entries) / len(entries) if entries else None
+
+
+def _point_values(point: Dict[str, Any]) -> Tuple[bool, int, float, float]:
+    """STAR completeness, metric count, technical score and contribution of a point dict."""
+    star = point.get("star")
+    metrics = point.get("metrics")
+    return (
+        isinstance(star, dict) and bool(star.get("complete", False)),
+        len(metrics) if isinstance(metrics, list) else 0,
+        _number(point.get("technical_score")),
+        _contribution(point)
+    )
+
+
+def _table_columns(
+    resume: int, table: PointTable, section_ids: np.ndarray, scored_sections: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """Score columns of the points of a PointTable's scored sections, in point order."""
+    section_of_point = np.repeat(np.arange(table.section_count), np.diff(table.section_offsets))
+    columns = {
+        "star_complete": table.star_flag("complete"),
+        "metric_count": table.metric_counts().astype(np.int64),
+        "technical_score": table.technical_scores.copy(),
+        "contribution": np.full(table.point_count, np.nan)
+    }
+    scored = scored_sections[section_of_point]
+    # Points kept as raw dicts are scored like dict analyses, which skip anything but dicts
+    for index, point in table.raw_points.items():
+        if not isinstance(point, dict):
+            scored[index] = False
+            continue
+        for key, value in zip(("star_complete", "metric_count", "technical_score", "contribution"), _point_values(point)):
+            columns[key][index] = value
+
+    columns = {key: column[scored] for key, column in columns.items()}
+    columns["point_section"] = section_ids[section_of_point[scored]]
+    columns["point_resume"] = np.full(int(scored.sum()), resume, dtype=np.intp)
+    return columns
+
+
+def build_score_table(
+    analyses: Sequence[Union[Dict[str, Any], PointTable]], exclude_types: AbstractSet[str] = frozenset()
+) -> ScoreTable:
+    """
+    Flatten resume analyses into columns.
+
+    Args:
+        analyses: resumeAnalysis objects, each with a list of sections, or PointTables
+        exclude_types: Upper-case types of sections to leave out, e.g. list-only ones such as SKILLS
+
+    Returns:
+        ScoreTable: Columns over all points and sections, tagged with their resume
+    """
+    point_resume: List[int] = []
+    point_section: List[int] = []
+    star_complete: List[bool] = []
+    metric_count: List[int] = []
+    technical_score: List[float] = []
+    contribution: List[float] = []
+    section_resume: List[int] = []
+    section_type: List[str] = []
+    education_resume: List[int] = []
+    education_section: List[int] = []
+    education_score: List[float] = []
+
+    chunks: List[Dict[str, np.ndarray]] = []
+
+    for resume, analysis in enumerate(analyses):
+        if isinstance(analysis, PointTable):
+            section_ids = np.full(analysis.section_count, -1, dtype=np.intp)
+            scored_sections = np.zeros(analysis.section_count, dtype=bool)
+            for index, section_type_name in enumerate(analysis.section_types):
+                if str(section_type_name).upper() in exclude_types:
+                    continue
+                section_ids[index] = len(section_type)
+                section_resume.append(resume)
+                section_type.append(section_type_name)
+                if section_type_name != EDUCATION_SECTION_TYPE:
+                    scored_sections[index] = True
+                    continue
+                points = [analysis.point_dict(j) for j in analysis.section_points(index)]
+                score = _education_score(
+                    analysis.section_extras[index] or {}, [point for point in points if isinstance(point, dict)]
+                )
+                if score is not None:
+                    education_resume.append(resume)
+                    education_section.append(int(section_ids[index]))
+                    education_score.append(score)
+            chunks.append(_table_columns(resume, analysis, section_ids, scored_sections))
+            continue
+
+        for section in (analysis or {}).get("sections", []):
+            if not isinstance(section, dict) or str(section.get("type", "")).upper() in exclude_types:
+                continue
+            section_id = len(section_type)
+            section_resume.append(resume)
+            section_type.append(section.get("type", ""))
+            points = [point for point in section.get("points", []) if isinstance(point, dict)]
+
+            if section_type[-1] == EDUCATION_SECTION_TYPE:
+                score = _education_score(section, points)
+                if score is not None:
+                    education_resume.append(resume)
+                    education_section.append(section_id)
+                    education_score.append(score)
+                continue
+
+            for point in points:
+                complete, metrics, technical, point_contribution = _point_values(point)
+                point_resume.append(resume)
+                point_section.append(section_id)
+                star_complete.append(complete)
+                metric_count.append(metrics)
+                technical_score.append(technical)
+                contribution.append(point_contribution)
+
+    # Each resume's points stay in order, so float sums match the scalar functions
+    def column(name: str, values: List[Any], dtype: Any) -> np.ndarray:
+        return np.concatenate([np.array(values, dtype=dtype), *(chunk[name].astype(dtype) for chunk in chunks)])
+
+    return ScoreTable(
+        resume_count=len(analyses),
+        point_resume=column("point_resume", point_resume, np.intp),
+        point_section=column("point_section", point_section, np.intp),
+        star_complete=column("star_complete", star_complete, bool),
+        metric_count=column("metric_count", metric_count, np.int64),
+        technical_score=column("technical_score", technical_score, np.float64),
+        contribution=column("contribution", contribution, np.float64),
+        section_resume=np.array(section_resume, dtype=np.intp),
+        section_type=section_type,
+        education_resume=np.array(education_resume, dtype=np.intp),
+        education_section=np.array(education_section, dtype=np.intp),
+        education_score=np.array(education_score, dtype=np.float64)
+    )
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Elementwise numerator / denominator, 0 where the denominator is 0."""
+    result = np.zeros(len(numerator), dtype=np.float64)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+
+def _aggregate(table: ScoreTable, groups: np.ndarray, education_groups: np.ndarray, size: int) -> Dict[str, np.ndarray]:
+    """Unrounded score columns for groups of points, e.g. resumes or sections."""
+    valid_contribution = ~np.isnan(table.contribution)
+
+    points = np.bincount(groups, minlength=size)
+    complete = np.bincount(groups, weights=table.star_complete, minlength=size)
+    metrics = np.bincount(groups, weights=table.metric_count, minlength=size)
+    technical = np.bincount(groups, weights=table.technical_score, minlength=size)
+    contributions = np.bincount(groups[valid_contribution], minlength=size)
+    contribution_sum = np.bincount(
+        groups[valid_contribution], weights=table.contribution[valid_contribution], minlength=size
+    )
+    educations = np.bincount(education_groups, minlength=size)
+    education = np.bincount(education_groups, weights=table.education_score, minlength=size)
+
+    star_format = _ratio(complete, points) * 5
+    metrics_ratio = _ratio(metrics, points)
+    metrics_usage = np.minimum(5, metrics_ratio * 2.5)
+    technical_depth = _ratio(technical, points)
+    education_quality = _ratio(education, educations)
+    return {
+        "points": points,
+        "star_format": star_format,
+        "metrics_usage": metrics_usage,
+        "metrics_ratio": metrics_ratio,
+        "technical_depth": technical_depth,
+        "education_quality": education_quality,
+        "overall": (star_format + metrics_usage + technical_depth + education_quality) / 4,
+        "contribution": _ratio(contribution_sum, contributions)
+    }
+
+
+def resume_score_columns(table: ScoreTable) -> Dict[str, np.ndarray]:
+    """Unrounded per-resume score columns, for analytics over the whole batch."""
+    return _aggregate(table, table.point_resume, table.education_resume, table.resume_count)
+
+
+def section_score_columns(table: ScoreTable) -> Dict[str, np.ndarray]:
+    """Unrounded per-section score columns, indexed like table.section_type."""
+    return _aggregate(table, table.point_section, table.education_section, len(table.section_type))
+
+
+def resume_scores(table: ScoreTable) -> List[Dict[str, float]]:
+    """Per-resume scores, equal to calculate_resume_scores and calculate_overall_scores."""
+    columns = resume_score_columns(table)
+    scores = []
+    for index in range(table.resume_count):
+        star, metrics, contribution = (
+            float(columns[key][index]) for key in ("star_format", "metrics_ratio", "contribution")
+        )
+        scores.append({
+            "star_format": round(float(columns["star_format"][index]), 2),
+            "metrics_usage": round(float(columns["metrics_usage"][index]), 2),
+            "technical_depth": round(float(columns["technical_depth"][index]), 2),
+            "education_quality": round(float(columns["education_quality"][index]), 2),
+            "overall": round(float(columns["overall"][index]), 2),
+            "starScore": round(star, 1),
+            "metricsScore": min(5.0, round(metrics * 2.5, 1)),
+            "contributionScore": round(contribution, 1)
+        })
+    return scores
+
+
+def section_scores(table: ScoreTable) -> List[Dict[str, Any]]:
+    """Per-section scores, in the order of the sections in the table."""
+    columns = section_score_columns(table)
+    return [
+        {
+            "resume": int(table.section_resume[index]),
+            "type": section_type,
+            "points": int(columns["points"][index]),
+            "star_format": round(float(columns["star_format"][index]), 2),
+            "metrics_usage": round(float(columns["metrics_usage"][index]), 2),
+            "technical_depth": round(float(columns["technical_depth"][index]), 2),
+            "education_quality": round(float(columns["education_quality"][index]), 2)
+        }
+        for index, section_type in enumerate(table.section_type)
+    ]
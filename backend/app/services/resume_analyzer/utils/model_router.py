@@ -0,0 +1,121 @@
+"""Model selection per resume section."""
+from typing import Dict, List, Optional, Sequence
+import logging
+from app.core.config import settings
+from app.services.resume_analyzer.utils.token import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Model tiers from cheapest to most capable
+MODEL_TIERS = ("small", "large")
+
+# Section types that list facts rather than achievements do fine on the small model.
+# Skills and Languages are analyzed locally and never reach a model.
+SECTION_MODEL_TIERS = {
+    "CERTIFICATIONS": "small",
+    "ACHIEVEMENTS": "small"
+}
+
+# Experience, Projects, Education and anything unrecognised
+DEFAULT_MODEL_TIER = "large"
+
+# Achievement sections this short, whose every point already shows an action and a
+# result locally, only need the model to verify them and go to the small model
+SIMPLE_SECTION_TYPES = frozenset(("EXPERIENCE", "PROJECTS"))
+SIMPLE_SECTION_MAX_POINTS = 3
+
+# Text before the first header and summaries hold no achievements to assess; they
+# join the call of the other sections rather than costing a call of their own
+NEUTRAL_SECTION_TYPES = frozenset(("GENERAL", "SUMMARY"))
+
+def _is_simple(section_type: str, points: Optional[Sequence]) -> bool:
+    """Whether a short achievement section has an action and a result signal on every point."""
+    return (
+        section_type.upper() in SIMPLE_SECTION_TYPES
+        and bool(points)
+        and len(points) <= SIMPLE_SECTION_MAX_POINTS
+        and all(point.action and point.result for point in points)
+    )
+
+class ModelRouter:
+    """Pick the model for each resume section from a tier table."""
+
+    def __init__(
+        self,
+        models: Optional[Dict[str, str]] = None,
+        section_tiers: Optional[Dict[str, str]] = None,
+        small_model_max_tokens: Optional[int] = None
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            models: Model name per tier, defaults to the configured models
+            section_tiers: Tier per section type, defaults to SECTION_MODEL_TIERS
+            small_model_max_tokens: Sections longer than this skip the small model
+        """
+        self.models = models or {
+            "small": settings.OPENAI_MODEL,
+            "large": settings.OPENAI_LARGE_MODEL
+        }
+        self.section_tiers = SECTION_MODEL_TIERS if section_tiers is None else section_tiers
+        self.small_model_max_tokens = (
+            settings.SMALL_MODEL_MAX_TOKENS if small_model_max_tokens is None
+            else small_model_max_tokens
+        )
+
+    @property
+    def default_model(self) -> str:
+        """Model used when a call covers sections of every type."""
+        return self.models[DEFAULT_MODEL_TIER]
+
+    def tier_for(self, section_type: str, text: str = "", points: Optional[Sequence] = None) -> str:
+        """
+        Get the tier for a section from its type and size, and for achievement
+        sections from the locally pre-analyzed signals of their points.
+        """
+        tier = self.section_tiers.get(section_type.upper(), DEFAULT_MODEL_TIER)
+        if tier != "small" and _is_simple(section_type, points):
+            tier = "small"
+        if tier == "small" and count_tokens(text, self.models["small"]) > self.small_model_max_tokens:
+            tier = MODEL_TIERS[MODEL_TIERS.index(tier) + 1]
+        return tier
+
+    def route(self, section_type: str, text: str = "", points: Optional[Sequence] = None) -> str:
+        """Get the model for a section from its type, size and pre-analyzed points."""
+        return self.models[self.tier_for(section_type, text, points)]
+
+    def escalate(self, model: str) -> Optional[str]:
+        """
+        Get the next more capable model after the given one.
+
+        Returns:
+            Optional[str]: The model to retry with, or None if there is none
+        """
+        tiers = [tier for tier in MODEL_TIERS if self.models[tier] == model]
+        if not tiers:
+            return None
+        for tier in MODEL_TIERS[MODEL_TIERS.index(tiers[-1]) + 1:]:
+            if self.models[tier] != model:
+                return self.models[tier]
+        return None
+
+    def group_by_model(self, sections: Sequence) -> Dict[str, List]:
+        """
+        Group pre-analyzed sections by the model that should analyze them.
+
+        Groups are ordered by their first section so merged output keeps
+        roughly the resume's order. Neutral sections go with the default model
+        if anything does, else with the only model called.
+        """
+        routed = [
+            None if section.section_type.upper() in NEUTRAL_SECTION_TYPES
+            else self.route(section.section_type, section.content, section.points)
+            for section in sections
+        ]
+        called = [model for model in routed if model is not None]
+        neutral_model = self.default_model if not called or self.default_model in called else called[0]
+        groups: Dict[str, List] = {}
+        for section, model in zip(sections, routed):
+            groups.setdefault(model or neutral_model, []).append(section)
+        return groups
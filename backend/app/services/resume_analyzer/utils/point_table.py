@@ -0,0 +1,264 @@
+"""Columnar storage of analyzed resume points.
+
+Analysis results are nested dicts (sections[].points[].star.*) that repeat
+every key for every point. PointTable keeps the points of one analysis as
+a struct of arrays instead: STAR flags packed into one byte per point,
+technical scores in a float array, metrics flattened with offsets, and
+text columns as plain lists. Scoring reads the arrays directly, caches
+store the compact column form, and the public JSON shape is only rebuilt
+for the API response or for a single point.
+
+Points that do not have the standard STAR point shape, such as education
+entries, are kept as-is and round-trip unchanged.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Bits of the per-point flags byte
+STAR_FLAGS = ("situation", "action", "result", "complete")
+HAS_RATIONALES = 1 << 4
+HAS_IMPROVEMENT = 1 << 5
+INTEGER_TECHNICAL_SCORE = 1 << 6
+
+RATIONALE_FIELDS = ("situation_rationale", "action_rationale", "result_rationale")
+_FULL_STAR_KEYS = frozenset(STAR_FLAGS + RATIONALE_FIELDS)
+_COMPACT_STAR_KEYS = frozenset(STAR_FLAGS)
+_POINT_KEYS = frozenset(("text", "star", "metrics", "technical_score"))
+
+# Version of the column format written by to_columns
+COLUMNS_VERSION = 1
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _pack_point(point: Any) -> Optional[Tuple[int, Optional[Tuple[str, str, str]], Optional[str]]]:
+    """Flags, rationales and improvement of a standard STAR point, None for any other shape."""
+    if not isinstance(point, dict):
+        return None
+    keys = point.keys()
+    if not (keys == _POINT_KEYS or (keys - {"improvement"} == _POINT_KEYS and isinstance(point["improvement"], str))):
+        return None
+    star, metrics, score = point["star"], point["metrics"], point["technical_score"]
+    if not (isinstance(point["text"], str) and isinstance(star, dict) and _is_number(score)):
+        return None
+    if not (isinstance(metrics, list) and all(isinstance(metric, str) for metric in metrics)):
+        return None
+    if star.keys() not in (_FULL_STAR_KEYS, _COMPACT_STAR_KEYS):
+        return None
+    if not all(isinstance(star[flag], bool) for flag in STAR_FLAGS):
+        return None
+
+    flags = sum(1 << bit for bit, flag in enumerate(STAR_FLAGS) if star[flag])
+    rationales = None
+    if star.keys() == _FULL_STAR_KEYS:
+        rationales = tuple(star[field] for field in RATIONALE_FIELDS)
+        if not all(isinstance(rationale, str) for rationale in rationales):
+            return None
+        flags |= HAS_RATIONALES
+    improvement = point.get("improvement")
+    if improvement is not None:
+        flags |= HAS_IMPROVEMENT
+    if isinstance(score, int):
+        flags |= INTEGER_TECHNICAL_SCORE
+    return flags, rationales, improvement
+
+
+class PointTable:
+    """Points of one analysis as parallel columns, with sections as offset ranges."""
+    __slots__ = (
+        "section_types", "section_extras", "section_offsets",
+        "texts", "flags", "rationales", "improvements",
+        "technical_scores", "metric_offsets", "metrics", "raw_points"
+    )
+
+    def __init__(
+        self,
+        section_types: List[str],
+        section_extras: List[Optional[Dict[str, Any]]],
+        section_offsets: np.ndarray,
+        texts: List[str],
+        flags: np.ndarray,
+        rationales: List[Optional[Sequence[str]]],
+        improvements: List[Optional[str]],
+        technical_scores: np.ndarray,
+        metric_offsets: np.ndarray,
+        metrics: List[str],
+        raw_points: Dict[int, Any]
+    ):
+        self.section_types = section_types
+        self.section_extras = section_extras  # Section keys other than type and points
+        self.section_offsets = section_offsets  # Point range of section i is offsets[i]:offsets[i + 1]
+        self.texts = texts
+        self.flags = flags
+        self.rationales = rationales
+        self.improvements = improvements
+        self.technical_scores = technical_scores
+        self.metric_offsets = metric_offsets  # Metrics of point j are metrics[offsets[j]:offsets[j + 1]]
+        self.metrics = metrics
+        self.raw_points = raw_points  # Points without the standard shape, by point index
+
+    @classmethod
+    def from_sections(cls, sections: Sequence[Dict[str, Any]]) -> "PointTable":
+        """Build a table from the sections of an analysis."""
+        section_types: List[str] = []
+        section_extras: List[Optional[Dict[str, Any]]] = []
+        section_offsets = [0]
+        texts: List[str] = []
+        flags: List[int] = []
+        rationales: List[Optional[Sequence[str]]] = []
+        improvements: List[Optional[str]] = []
+        technical_scores: List[float] = []
+        metric_offsets = [0]
+        metrics: List[str] = []
+        raw_points: Dict[int, Any] = {}
+
+        for section in sections:
+            section_types.append(section.get("type", ""))
+            extras = {key: value for key, value in section.items() if key not in ("type", "points")}
+            section_extras.append(extras or None)
+            for point in section.get("points", []):
+                packed = _pack_point(point)
+                if packed is None:
+                    raw_points[len(texts)] = point
+                    texts.append("")
+                    flags.append(0)
+                    rationales.append(None)
+                    improvements.append(None)
+                    technical_scores.append(np.nan)
+                else:
+                    point_flags, point_rationales, improvement = packed
+                    texts.append(point["text"])
+                    flags.append(point_flags)
+                    rationales.append(point_rationales)
+                    improvements.append(improvement)
+                    technical_scores.append(point["technical_score"])
+                    metrics.extend(point["metrics"])
+                metric_offsets.append(len(metrics))
+            section_offsets.append(len(texts))
+
+        return cls(
+            section_types=section_types,
+            section_extras=section_extras,
+            section_offsets=np.array(section_offsets, dtype=np.int32),
+            texts=texts,
+            flags=np.array(flags, dtype=np.uint8),
+            rationales=rationales,
+            improvements=improvements,
+            technical_scores=np.array(technical_scores, dtype=np.float64),
+            metric_offsets=np.array(metric_offsets, dtype=np.int32),
+            metrics=metrics,
+            raw_points=raw_points
+        )
+
+    @property
+    def section_count(self) -> int:
+        return len(self.section_types)
+
+    @property
+    def point_count(self) -> int:
+        return len(self.texts)
+
+    def section_points(self, section_index: int) -> range:
+        """Point indices of a section."""
+        return range(int(self.section_offsets[section_index]), int(self.section_offsets[section_index + 1]))
+
+    def metric_counts(self) -> np.ndarray:
+        """Number of metrics per point."""
+        return np.diff(self.metric_offsets)
+
+    def star_flag(self, flag: str) -> np.ndarray:
+        """One STAR flag of every point as a bool array."""
+        return (self.flags & (1 << STAR_FLAGS.index(flag))) != 0
+
+    def point_dict(self, index: int) -> Dict[str, Any]:
+        """Rebuild one point in the public JSON shape."""
+        if index in self.raw_points:
+            return self.raw_points[index]
+        flags = int(self.flags[index])
+        star: Dict[str, Any] = {}
+        rationales = self.rationales[index]
+        for bit, flag in enumerate(STAR_FLAGS):
+            star[flag] = bool(flags & (1 << bit))
+            if rationales is not None and bit < len(RATIONALE_FIELDS):
+                star[RATIONALE_FIELDS[bit]] = rationales[bit]
+        score = float(self.technical_scores[index])
+        point = {
+            "text": self.texts[index],
+            "star": star,
+            "metrics": self.metrics[self.metric_offsets[index]:self.metric_offsets[index + 1]],
+            "technical_score": int(score) if flags & INTEGER_TECHNICAL_SCORE else score
+        }
+        if flags & HAS_IMPROVEMENT:
+            point["improvement"] = self.improvements[index]
+        return point
+
+    def point(self, section_index: int, point_index: int) -> Dict[str, Any]:
+        """
+        Rebuild one point of a section.
+
+        Raises:
+            IndexError: If the section or point does not exist
+        """
+        if not 0 <= section_index < self.section_count:
+            raise IndexError(f"Section {section_index} out of range")
+        points = self.section_points(section_index)
+        if not 0 <= point_index < len(points):
+            raise IndexError(f"Point {point_index} out of range in section {section_index}")
+        return self.point_dict(points[point_index])
+
+    def to_sections(self) -> List[Dict[str, Any]]:
+        """Rebuild all sections in the public JSON shape."""
+        sections = []
+        for index, section_type in enumerate(self.section_types):
+            section = {"type": section_type, "points": [self.point_dict(j) for j in self.section_points(index)]}
+            if self.section_extras[index]:
+                section.update(self.section_extras[index])
+            sections.append(section)
+        return sections
+
+    def to_columns(self) -> Dict[str, Any]:
+        """JSON-serializable column form, for caches that store JSON."""
+        return {
+            "version": COLUMNS_VERSION,
+            "section_types": self.section_types,
+            "section_extras": self.section_extras,
+            "section_offsets": self.section_offsets.tolist(),
+            "texts": self.texts,
+            "flags": self.flags.tolist(),
+            "rationales": self.rationales,
+            "improvements": self.improvements,
+            "technical_scores": [None if np.isnan(score) else score for score in self.technical_scores.tolist()],
+            "metric_offsets": self.metric_offsets.tolist(),
+            "metrics": self.metrics,
+            "raw_points": {str(index): point for index, point in self.raw_points.items()}
+        }
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Any]) -> "PointTable":
+        """Rebuild a table from its column form."""
+        if columns.get("version") != COLUMNS_VERSION:
+            raise ValueError(f"Unsupported point table version: {columns.get('version')}")
+        return cls(
+            section_types=columns["section_types"],
+            section_extras=columns["section_extras"],
+            section_offsets=np.array(columns["section_offsets"], dtype=np.int32),
+            texts=columns["texts"],
+            flags=np.array(columns["flags"], dtype=np.uint8),
+            rationales=columns["rationales"],
+            improvements=columns["improvements"],
+            technical_scores=np.array(
+                [np.nan if score is None else score for score in columns["technical_scores"]], dtype=np.float64
+            ),
+            metric_offsets=np.array(columns["metric_offsets"], dtype=np.int32),
+            metrics=columns["metrics"],
+            raw_points={int(index): point for index, point in columns["raw_points"].items()}
+        )
+
+    @classmethod
+    def from_stored(cls, stored: Dict[str, Any]) -> "PointTable":
+        """Rebuild a table from its column form or from an analysis in the public shape."""
+        if "sections" in stored:
+            return cls.from_sections(stored["sections"])
+        return cls.from_columns(stored)
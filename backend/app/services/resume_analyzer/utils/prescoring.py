@@ -0,0 +1,152 @@
+"""Local pre-scoring of resumes against a job description.
+
+Ranks a batch of resumes without network access so only the most promising
+candidates are sent to the LLM for a detailed job match. Texts are turned
+into hashed unigram and bigram TF-IDF vectors, compared to the job by cosine
+similarity, and blended with the share of required and preferred skills
+that appear in each resume.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+from functools import lru_cache
+import re
+import zlib
+import numpy as np
+
+# Number of hash buckets per vector, small enough to score thousands of resumes in memory
+HASH_DIMENSIONS = 2 ** 14
+
+# Weight of text similarity in the blended score, the rest goes to skill overlap
+SIMILARITY_WEIGHT = 0.4
+
+# Preferred skills count this much relative to required ones
+PREFERRED_SKILL_WEIGHT = 0.5
+
+# Job description terms used for overlap when no extracted requirements exist yet
+FALLBACK_KEYWORD_COUNT = 30
+
+# Words with no signal about fit
+STOP_WORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can
+could did do does doing during each etc for from had has have having he her his
+how i if in into is it its itself just may me more most must my no nor not of on
+once only or other our out over own per same she should so some such than that the
+their them then there these they this those through to too under until up very
+was we were what when where which while who whom why will with within without
+would you your year years experience work working team teams strong ability
+""".split())
+
+# Words keep inner symbols so skills like C++, C#, Node.js and CI/CD stay whole
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of a text without stop words."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def _terms(tokens: Sequence[str]) -> List[str]:
+    """Unigrams and bigrams of a token sequence."""
+    return list(tokens) + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+@lru_cache(maxsize=65536)
+def _bucket(term: str) -> int:
+    """Stable hash bucket of a term, unlike hash() it does not change between processes."""
+    return zlib.crc32(term.encode("utf-8")) % HASH_DIMENSIONS
+
+
+def term_frequencies(texts: Sequence[str]) -> np.ndarray:
+    """Log-scaled hashed term counts, one row per text."""
+    counts = np.zeros((len(texts), HASH_DIMENSIONS), dtype=np.float32)
+    for row, text in enumerate(texts):
+        buckets = [_bucket(term) for term in _terms(tokenize(text))]
+        if buckets:
+            counts[row] = np.bincount(buckets, minlength=HASH_DIMENSIONS)
+    return np.log1p(counts, out=counts)
+
+
+def tfidf_similarity(resumes: Sequence[str], job_description: str) -> np.ndarray:
+    """Cosine similarity of each resume to the job description."""
+    if not resumes:
+        return np.zeros(0, dtype=np.float32)
+    tf = term_frequencies([job_description, *resumes])
+    document_frequency = np.count_nonzero(tf, axis=0)
+    idf = np.log((1 + len(tf)) / (1 + document_frequency)) + 1
+    vectors = tf * idf.astype(np.float32)
+    norms = np.linalg.norm(vectors, axis=1)
+    norms[norms == 0] = 1
+    vectors /= norms[:, None]
+    return vectors[1:] @ vectors[0]
+
+
+def _skill_pattern(skill: str) -> Optional[re.Pattern]:
+    """Whole-phrase pattern for a skill, tolerant of spacing and case."""
+    words = tokenize(skill) or _TOKEN_PATTERN.findall(skill.lower())
+    if not words:
+        return None
+    return re.compile(r"(?<![a-z0-9])" + r"\W+".join(re.escape(word) for word in words) + r"(?![a-z0-9])")
+
+
+def job_keywords(job_description: str, limit: int = FALLBACK_KEYWORD_COUNT) -> List[str]:
+    """Most frequent terms of a job description, in order of first use on ties."""
+    counts: Dict[str, int] = {}
+    for token in tokenize(job_description):
+        if len(token) > 1 and not token.isdigit():
+            counts[token] = counts.get(token, 0) + 1
+    return sorted(counts, key=counts.get, reverse=True)[:limit]
+
+
+def skill_overlap(
+    resumes: Sequence[str],
+    job_description: str,
+    requirements: Optional[Dict[str, Any]] = None
+) -> np.ndarray:
+    """
+    Weighted share of the job's skills that each resume mentions.
+
+    Args:
+        resumes: Resume texts
+        job_description: Job description, used for keywords when requirements are missing
+        requirements: Extracted job requirements with required and preferred skills
+
+    Returns:
+        np.ndarray: One score between 0 and 1 per resume
+    """
+    if requirements:
+        skills = [(skill, 1.0) for skill in requirements.get("required_skills", [])]
+        skills += [(skill, PREFERRED_SKILL_WEIGHT) for skill in requirements.get("preferred_skills", [])]
+    else:
+        skills = [(keyword, 1.0) for keyword in job_keywords(job_description)]
+    patterns = [(pattern, weight) for skill, weight in skills if (pattern := _skill_pattern(skill))]
+    if not resumes or not patterns:
+        return np.zeros(len(resumes), dtype=np.float32)
+
+    weights = np.array([weight for _, weight in patterns], dtype=np.float32)
+    found = np.array([
+        [pattern.search(text) is not None for pattern, _ in patterns]
+        for text in (resume.lower() for resume in resumes)
+    ], dtype=np.float32)
+    return found @ weights / weights.sum()
+
+
+def prescore_resumes(
+    resumes: Sequence[str],
+    job_description: str,
+    requirements: Optional[Dict[str, Any]] = None
+) -> np.ndarray:
+    """
+    Blend text similarity and skill overlap into one score per resume.
+
+    Returns:
+        np.ndarray: Scores between 0 and 1, higher is a better fit
+    """
+    similarity = tfidf_similarity(resumes, job_description)
+    overlap = skill_overlap(resumes, job_description, requirements)
+    return SIMILARITY_WEIGHT * similarity + (1 - SIMILARITY_WEIGHT) * overlap
+
+
+def select_top_k(scores: np.ndarray, k: int) -> List[int]:
+    """Indices of the k highest scores, best first, ties kept in input order."""
+    if k <= 0:
+        return []
+    return np.argsort(-scores, kind="stable")[:k].tolist()
@@ -1,85 +1,5 @@
 """Resume recommendations generation utilities."""
-from typing import List, Dict
-
-def generate_resume_recommendations(analysis_results: List[Dict]) -> List[Dict]:
-    """Generate recommendations based on resume analysis."""
-    recommendations = []
-    
-    # Track which sections are present (safely handle malformed results)
-    sections = set()
-    for result in analysis_results:
-        if result and isinstance(result, dict):
-            section = result.get("section")
-            if section:
-                sections.add(section)
-    
-    # Check for missing key sections
-    key_sections = {
-        "EXPERIENCE": "Add a work experience section to highlight your professional background.",
-        "EDUCATION": "Include an education section to showcase your academic qualifications.",
-        "SKILLS": "Add a skills section to highlight your technical and professional competencies."
-    }
-    
-    # Always check for missing key sections
-    for section, message in key_sections.items():
-        if section not in sections:
-            recommendations.append({
-                "type": "missing_section",
-                "section": section,
-                "message": message,
-                "priority": 1
-            })
-    
-    # If no valid sections were found, add a general recommendation
-    if not sections:
-        recommendations.append({
-            "type": "general",
-            "section": "OVERALL",
-            "message": "Add detailed sections about your experience, education, and skills.",
-            "priority": 1
-        })
-    
-    # Analyze existing sections
-    for result in analysis_results:
-        if not result or not isinstance(result, dict):
-            continue
-            
-        section = result.get("section")
-        if not section:
-            continue
-        
-        # STAR format recommendations
-        star_data = result.get("star", {})
-        if isinstance(star_data, dict) and not star_data.get("complete", False):
-            recommendations.append({
-                "type": "star_format",
-                "section": section,
-                "message": f"Use STAR format in your {section} section to better describe your achievements.",
-                "priority": 2
-            })
-        
-        # Metrics recommendations
-        metrics = result.get("metrics", [])
-        if isinstance(metrics, list) and not metrics:
-            recommendations.append({
-                "type": "metrics",
-                "section": section,
-                "message": f"Add quantifiable metrics in your {section} section to demonstrate impact.",
-                "priority": 2
-            })
-        
-        # Contribution clarity recommendations
-        contribution = result.get("contribution")
-        if isinstance(contribution, (int, float)) and contribution < 3:
-            recommendations.append({
-                "type": "contribution",
-                "section": section,
-                "message": f"Clarify your individual contributions in the {section} section.",
-                "priority": 3
-            })
-    
-    # Sort recommendations by priority (lower number = higher priority)
-    return sorted(recommendations, key=lambda x: x["priority"])
+from typing import List, Dict, Optional
 
 def generate_job_match_recommendations(job_match):
     """Generate recommendations based on job match analysis."""
@@ -114,3 +34,109 @@ def generate_job_match_recommendations(job_match):
         })
     
     return recommendations
+
+# Education entries whose average reputation is below this get a recommendation
+WEAK_EDUCATION_SCORE = 7
+# Points with a technical score below this get a recommendation
+WEAK_TECHNICAL_SCORE = 3
+# Examples given per recommendation
+MAX_EXAMPLES = 2
+
+def _weak_education(item: Dict) -> Optional[Dict]:
+    """School, score and rationale of an education section or entry with a low reputation."""
+    reputation = item.get("subject_course_school_reputation")
+    if not isinstance(reputation, dict):
+        return None
+    try:
+        score = (float(reputation["domestic_score"]) + float(reputation["international_score"])) / 2
+    except (KeyError, TypeError, ValueError):
+        return None
+    if score >= WEAK_EDUCATION_SCORE:
+        return None
+    return {
+        "school": item.get("school") or "Unknown Institution",
+        "score": round(score, 1),
+        "rationale": (
+            f"Domestic: {reputation.get('domestic_score_rationale', '')}, "
+            f"International: {reputation.get('international_score_rationale', '')}"
+        )
+    }
+
+def generate_section_recommendations(sections: List[Dict]) -> List[Dict]:
+    """
+    Generate prioritized recommendations from analyzed resume sections.
+    
+    Points missing STAR components, metrics or technical depth and weakly
+    rated education are collected, with a few of them as examples.
+    """
+    star_missing = []
+    metrics_missing = []
+    technical_weak = []
+    education_weak = []
+    
+    for section in sections:
+        if not isinstance(section, dict):
+            continue
+        points = [point for point in section.get("points", []) if isinstance(point, dict)]
+        if section.get("type") == "Education":
+            # Reputation is given per section or per entry
+            for item in (section, *points):
+                weak = _weak_education(item)
+                if weak:
+                    education_weak.append(weak)
+            continue
+        
+        for point in points:
+            text = point.get("text", "")
+            star = point.get("star") if isinstance(point.get("star"), dict) else {}
+            if not star.get("complete", False):
+                star_missing.append({
+                    "text": text,
+                    "rationale": {
+                        "situation": star.get("situation_rationale", ""),
+                        "action": star.get("action_rationale", ""),
+                        "result": star.get("result_rationale", "")
+                    }
+                })
+            if not point.get("metrics"):
+                metrics_missing.append(text)
+            try:
+                if float(point.get("technical_score", 0)) < WEAK_TECHNICAL_SCORE:
+                    technical_weak.append(text)
+            except (TypeError, ValueError):
+                technical_weak.append(text)
+    
+    recommendations = []
+    if star_missing:
+        recommendations.append({
+            "priority": "high",
+            "area": "STAR Format",
+            "action": "Add missing STAR components to key achievements",
+            "examples": star_missing[:MAX_EXAMPLES],
+            "rationale": "Missing STAR components identified with detailed explanations"
+        })
+    if metrics_missing:
+        recommendations.append({
+            "priority": "high",
+            "area": "Metrics",
+            "action": "Add quantifiable metrics to demonstrate impact",
+            "examples": metrics_missing[:MAX_EXAMPLES]
+        })
+    if technical_weak:
+        recommendations.append({
+            "priority": "medium",
+            "area": "Technical Depth",
+            "action": "Enhance technical details in project descriptions",
+            "examples": technical_weak[:MAX_EXAMPLES]
+        })
+    if education_weak:
+        recommendations.append({
+            "priority": "medium",
+            "area": "Education Quality",
+            "action": "Consider pursuing additional certifications or advanced degrees to strengthen your academic profile",
+            "examples": [
+                f"{edu['school']} (Current Score: {edu['score']}/10, Rationale: {edu['rationale']})"
+                for edu in education_weak[:MAX_EXAMPLES]
+            ]
+        })
+    return recommendations
@@ -68,3 +68,49 @@ def calculate_overall_scores(results: List[Dict]) -> Dict:
         "metricsScore": calculate_metrics_score(results),
         "contributionScore": calculate_contribution_score(results)
     }
+
+def calculate_resume_scores(sections: List[Dict]) -> Dict:
+    """
+    Calculate the scores of a resume from its analyzed sections.
+    
+    Education sections are scored by their reputation, all other points by
+    STAR completeness, metrics and technical depth.
+    """
+    total_points = 0
+    star_complete = 0
+    metrics_count = 0
+    technical_score_sum = 0
+    education_score_sum = 0
+    education_count = 0
+
+    for section in sections:
+        if section["type"] == "Education":
+            # Handle education sections
+            if "subject_course_school_reputation" in section:
+                rep = section["subject_course_school_reputation"]
+                # Calculate education score as average of domestic and international scores
+                education_score = (rep["domestic_score"] + rep["international_score"]) / 2
+                education_score_sum += education_score
+                education_count += 1
+        else:
+            # Handle regular sections
+            for point in section.get("points", []):
+                total_points += 1
+                if point.get("star", {}).get("complete", False):
+                    star_complete += 1
+                metrics_count += len(point.get("metrics", []))
+                technical_score_sum += point.get("technical_score", 0)
+
+    # Calculate average scores
+    star_score = (star_complete / total_points) * 5 if total_points > 0 else 0
+    metrics_score = min(5, metrics_count / total_points * 2.5) if total_points > 0 else 0
+    technical_score = technical_score_sum / total_points if total_points > 0 else 0
+    education_score = education_score_sum / education_count if education_count > 0 else 0
+
+    return {
+        "star_format": round(star_score, 2),
+        "metrics_usage": round(metrics_score, 2),
+        "technical_depth": round(technical_score, 2),
+        "education_quality": round(education_score, 2),
+        "overall": round((star_score + metrics_score + technical_score + education_score) / 4, 2)
+    }
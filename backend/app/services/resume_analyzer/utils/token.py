@@ -1,46 +1,80 @@
-"""Token usage tracking and cost calculation utilities."""
-from typing import Dict
-from dataclasses import dataclass
-from openai.types.completion_usage import CompletionUsage
-
-@dataclass
-class ModelPricing:
-    """Pricing information for different models."""
-    prompt_cost_per_1k: float
-    completion_cost_per_1k: float
-
-MODEL_PRICING = {
-    "gpt-4-turbo-preview": ModelPricing(0.01, 0.03),  # $0.01 per 1K prompt, $0.03 per 1K completion
-    "gpt-4o-mini-2024-07-18": ModelPricing(0.001, 0.002),  # Example pricing
-    "gpt-3.5-turbo": ModelPricing(0.0005, 0.0015)  # Default GPT-3.5 pricing
-}
-
-class TokenUsageTracker:
-    """Track token usage and calculate costs across different models."""
-    
-    def __init__(self):
-        self.usage = {
-            "total_tokens": 0,
-            "prompt_tokens": 0,
-            "completion_tokens": 0,
-            "total_cost": 0
-        }
-    
-    def update(self, usage: CompletionUsage, model: str) -> None:
-        """Update token usage statistics based on the model used."""
-        self.usage["total_tokens"] += usage.total_tokens
-        self.usage["prompt_tokens"] += usage.prompt_tokens
-        self.usage["completion_tokens"] += usage.completion_tokens
-        
-        # Get pricing for the model, default to GPT-3.5 if unknown
-        pricing = MODEL_PRICING.get(model, MODEL_PRICING["gpt-3.5-turbo"])
-        
-        # Calculate costs
-        prompt_cost = (usage.prompt_tokens / 1000) * pricing.prompt_cost_per_1k
-        completion_cost = (usage.completion_tokens / 1000) * pricing.completion_cost_per_1k
-        
-        self.usage["total_cost"] += prompt_cost + completion_cost
-    
-    def get_usage(self) -> Dict:
-        """Get current token usage statistics."""
-        return self.usage.copy()
+"""Token counting with the tokenizers of the models called."""
+from typing import Dict, List, Optional, Sequence
+from functools import lru_cache
+import logging
+import tiktoken
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Encodings for model families that the installed tiktoken may not map itself
+MODEL_FAMILY_ENCODINGS = [
+    ("gpt-4o", "o200k_base"),
+    ("gpt-4.1", "o200k_base"),
+    ("o1", "o200k_base"),
+    ("o3", "o200k_base"),
+    ("gpt-4", "cl100k_base"),
+    ("gpt-3.5", "cl100k_base"),
+]
+DEFAULT_ENCODING = "cl100k_base"
+
+# Fallback when no encoding can be loaded (e.g. offline without a tiktoken cache)
+CHARS_PER_TOKEN = 4
+
+# Chat formatting overhead per message and for priming the reply
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+@lru_cache(maxsize=None)
+def get_encoding(model: Optional[str] = None) -> Optional[tiktoken.Encoding]:
+    """
+    Load the tokenizer for a model once and reuse it.
+
+    Returns:
+        Optional[tiktoken.Encoding]: The encoding, or None if none could be loaded
+    """
+    model = model or settings.OPENAI_MODEL
+    candidates = [name for prefix, name in MODEL_FAMILY_ENCODINGS if model.startswith(prefix)]
+    candidates.append(DEFAULT_ENCODING)
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        pass
+
+    for name in dict.fromkeys(candidates):
+        try:
+            return tiktoken.get_encoding(name)
+        except Exception as e:
+            logger.debug("Could not load tiktoken encoding %s: %s", name, e)
+
+    logger.warning("No tiktoken encoding available for %s, falling back to character estimate", model)
+    return None
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens in a text for the given model.
+    Not memoized: a cache keyed on the text would keep whole resumes alive in every worker.
+    """
+    if not text:
+        return 0
+    encoding = get_encoding(model)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN
+    return len(encoding.encode_ordinary(text))
+
+def count_tokens_batch(texts: Sequence[str], model: Optional[str] = None) -> List[int]:
+    """Count the tokens in several texts at once, encoding them in parallel."""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return [len(text) // CHARS_PER_TOKEN for text in texts]
+    return [len(tokens) for tokens in encoding.encode_ordinary_batch(list(texts))]
+
+def count_message_tokens(messages: Sequence[Dict[str, str]], model: Optional[str] = None) -> int:
+    """Count the prompt tokens of a chat request, including per-message overhead."""
+    contents = [message.get("content") or "" for message in messages]
+    return (
+        sum(count_tokens_batch(contents, model))
+        + TOKENS_PER_MESSAGE * len(messages)
+        + TOKENS_PER_REPLY
+    )
@@ -1,16 +1,106 @@
 """File utilities for resume analyzer."""
+from typing import BinaryIO, Optional
+import zipfile
 import PyPDF2
 from docx import Document
+from fastapi import UploadFile
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text from a PDF file."""
+# Magic bytes used to identify supported upload formats
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+DOCX_MAIN_DOCUMENT = "word/document.xml"
+
+# The PDF spec allows junk before the header, but only within the first 1KB
+PDF_HEADER_SEARCH_BYTES = 1024
+
+# Separator placed between PDF pages so running headers/footers can be detected
+PAGE_BREAK = "\f"
+
+# Refuse DOCX archives whose main document inflates past this size (zip bombs)
+MAX_DOCX_DOCUMENT_BYTES = 50 * 1024 * 1024  # 50MB
+
+
+class FileTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size or page limits."""
+
+
+async def save_upload_to_file(
+    upload: UploadFile,
+    destination: BinaryIO,
+    max_bytes: int,
+    chunk_size: int = 64 * 1024
+) -> int:
+    """
+    Stream an upload to a file chunk by chunk, enforcing a byte limit.
+
+    Args:
+        upload: The uploaded file to read from
+        destination: Open binary file object to write to
+        max_bytes: Maximum number of bytes accepted
+        chunk_size: Number of bytes read per chunk
+
+    Returns:
+        int: Total number of bytes written
+
+    Raises:
+        FileTooLargeError: If the upload exceeds max_bytes
+    """
+    total = 0
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise FileTooLargeError(f"File exceeds the maximum upload size of {max_bytes} bytes")
+        destination.write(chunk)
+    return total
+
+
+def detect_file_type(file_path: str) -> Optional[str]:
+    """
+    Detect the type of a file from its magic bytes rather than its name.
+
+    Returns:
+        Optional[str]: "pdf", "docx" or None if the format is not supported
+    """
+    with open(file_path, 'rb') as file:
+        header = file.read(PDF_HEADER_SEARCH_BYTES)
+
+    if PDF_MAGIC in header:
+        return "pdf"
+
+    if header.startswith(ZIP_MAGIC):
+        try:
+            with zipfile.ZipFile(file_path) as archive:
+                info = archive.getinfo(DOCX_MAIN_DOCUMENT)
+        except (zipfile.BadZipFile, KeyError):
+            return None
+        if info.file_size > MAX_DOCX_DOCUMENT_BYTES:
+            raise FileTooLargeError("DOCX document content is too large to process")
+        return "docx"
+
+    return None
+
+
+def extract_text_from_pdf(file_path: str, max_pages: Optional[int] = None) -> str:
+    """
+    Extract text from a PDF file.
+
+    The page count is checked against max_pages before any page is parsed.
+    """
     try:
         with open(file_path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text
+            page_count = len(reader.pages)
+            if max_pages is not None and page_count > max_pages:
+                raise FileTooLargeError(
+                    f"PDF has {page_count} pages, the maximum allowed is {max_pages}"
+                )
+            pages = [page.extract_text() + "\n" for page in reader.pages]
+            return PAGE_BREAK.join(pages)
+    except FileTooLargeError:
+        raise
     except Exception as e:
         raise ValueError(f"Error extracting text from PDF: {str(e)}")
 
@@ -23,4 +113,4 @@ def extract_text_from_docx(file_path: str) -> str:
             text += paragraph.text + "\n"
         return text
     except Exception as e:
-        raise ValueError(f"Error extracting text from DOCX: {str(e)}") 
\ No newline at end of file
+        raise ValueError(f"Error extracting text from DOCX: {str(e)}")
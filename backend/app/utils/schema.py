@@ -0,0 +1,71 @@
+"""JSON schema generation for OpenAI structured outputs."""
+from typing import Any, Dict, Type
+from pydantic import BaseModel
+
+# Keywords strict structured outputs reject. Ranges are still enforced when
+# the output is validated against the pydantic model the schema came from.
+UNSUPPORTED_KEYWORDS = {
+    "title",
+    "default",
+    "minimum",
+    "maximum",
+    "exclusiveMinimum",
+    "exclusiveMaximum",
+    "minLength",
+    "maxLength",
+    "minItems",
+    "maxItems"
+}
+
+def _make_strict(schema: Any) -> Any:
+    """Recursively rewrite a JSON schema node into the strict subset."""
+    if isinstance(schema, list):
+        return [_make_strict(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+
+    # A lone allOf wraps a $ref that had sibling keywords such as a description
+    if len(schema.get("allOf", [])) == 1:
+        schema = {**schema["allOf"][0], **{k: v for k, v in schema.items() if k != "allOf"}}
+        if "$ref" in schema:
+            schema = {"$ref": schema["$ref"]}
+
+    strict = {}
+    for key, value in schema.items():
+        if key in UNSUPPORTED_KEYWORDS:
+            continue
+        if key in ("properties", "$defs"):
+            # Keys here are property and definition names, not keywords
+            strict[key] = {name: _make_strict(sub) for name, sub in value.items()}
+        elif key == "oneOf":
+            strict["anyOf"] = _make_strict(value)
+        else:
+            strict[key] = _make_strict(value)
+
+    if strict.get("type") == "object" and "properties" in strict:
+        strict["additionalProperties"] = False
+        strict["required"] = list(strict["properties"])
+    return strict
+
+def strict_json_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Generate a strict structured output JSON schema from a pydantic model.
+
+    Every object gets additionalProperties false and all of its properties
+    required, unions use anyOf, and unsupported keywords are removed.
+
+    Args:
+        model: The pydantic model describing the expected output
+
+    Returns:
+        Dict[str, Any]: JSON schema usable with strict function calling
+    """
+    return _make_strict(model.model_json_schema())
+
+def function_schema(name: str, description: str, model: Type[BaseModel]) -> Dict[str, Any]:
+    """Build a function definition whose parameters are generated from a pydantic model."""
+    return {
+        "name": name,
+        "description": description,
+        "parameters": strict_json_schema(model)
+    }
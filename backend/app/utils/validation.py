@@ -1,25 +1,134 @@
 """Validation utilities for resume analysis."""
-from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional, Union
+from pydantic import BaseModel, Field, TypeAdapter
+from pydantic_core import to_json
 
 class TokenUsage(BaseModel):
     """Token usage information."""
     total_tokens: int
     prompt_tokens: int
     completion_tokens: int
+    cached_tokens: int = 0
     total_cost: float
 
+class StarAssessment(BaseModel):
+    """STAR format assessment of a resume point."""
+    situation: bool = Field(description="Whether situation is present")
+    situation_rationale: str = Field(description="Explanation for situation assessment")
+    action: bool = Field(description="Whether action is present")
+    action_rationale: str = Field(description="Explanation for action assessment")
+    result: bool = Field(description="Whether result is present")
+    result_rationale: str = Field(description="Explanation for result assessment")
+    complete: bool = Field(description="Whether all STAR components are present")
+
+class StarRationales(BaseModel):
+    """Rationales for a STAR assessment whose flags are already known."""
+    situation_rationale: str = Field(description="Explanation for situation assessment")
+    action_rationale: str = Field(description="Explanation for action assessment")
+    result_rationale: str = Field(description="Explanation for result assessment")
+
+class ResumePointWithoutImprovement(BaseModel):
+    """Analysis of an achievement point whose improvement is generated on demand."""
+    text: str = Field(description="Full text of the point")
+    star: StarAssessment
+    metrics: List[str] = Field(description="Identified metrics and achievements")
+    technical_score: float = Field(ge=0, le=5, description="Technical depth score (0-5)")
+
+class ResumePoint(ResumePointWithoutImprovement):
+    """Analysis of an experience, project or other achievement point."""
+    improvement: str = Field(description="Suggested updated resume point following STAR format and with metrics")
+
+class ReputationScores(BaseModel):
+    """Reputation scores of a subject, course and school combination."""
+    domestic_score: float = Field(ge=0, le=10, description="Domestic reputation score (0-10)")
+    domestic_score_rationale: str = Field(description="Explanation for domestic reputation score")
+    international_score: float = Field(ge=0, le=10, description="International reputation score (0-10)")
+    international_score_rationale: str = Field(description="Explanation for international reputation score")
+
+class EducationEntry(BaseModel):
+    """Analysis of an education entry."""
+    text: str = Field(description="Full text of the education entry")
+    subject: str = Field(description="Subject/field of study")
+    course: str = Field(description="Degree/course name")
+    school: str = Field(description="Institution name")
+    subject_course_school_reputation: ReputationScores
+
+class ResumeSection(BaseModel):
+    """Analysis of one resume section."""
+    type: str = Field(description="Type of section (Experience, Projects, Education, Skills)")
+    points: List[Union[ResumePoint, EducationEntry]]
+
+class ResumeSectionsAnalysis(BaseModel):
+    """Model for resume analysis output, the schema the model must follow."""
+    sections: List[ResumeSection]
+
+class ResumeSectionWithoutImprovements(BaseModel):
+    """Analysis of one resume section without improvements."""
+    type: str = Field(description="Type of section (Experience, Projects, Education, Skills)")
+    points: List[Union[ResumePointWithoutImprovement, EducationEntry]]
+
+class ResumeSectionsAnalysisWithoutImprovements(BaseModel):
+    """Model for resume analysis output without improvements."""
+    sections: List[ResumeSectionWithoutImprovements]
+
+class CompactStarAssessment(BaseModel):
+    """STAR format assessment of a resume point without rationales."""
+    situation: bool = Field(description="Whether situation is present")
+    action: bool = Field(description="Whether action is present")
+    result: bool = Field(description="Whether result is present")
+    complete: bool = Field(description="Whether all STAR components are present")
+
+class CompactResumePoint(BaseModel):
+    """Compact analysis of an achievement point, without rationales or improvement."""
+    text: str = Field(description="Full text of the point")
+    star: CompactStarAssessment
+    metrics: List[str] = Field(description="Identified metrics and achievements")
+    technical_score: float = Field(ge=0, le=5, description="Technical depth score (0-5)")
+
+class CompactReputationScores(BaseModel):
+    """Reputation scores without rationales."""
+    domestic_score: float = Field(ge=0, le=10, description="Domestic reputation score (0-10)")
+    international_score: float = Field(ge=0, le=10, description="International reputation score (0-10)")
+
+class CompactEducationEntry(BaseModel):
+    """Compact analysis of an education entry."""
+    text: str = Field(description="Full text of the education entry")
+    subject: str = Field(description="Subject/field of study")
+    course: str = Field(description="Degree/course name")
+    school: str = Field(description="Institution name")
+    subject_course_school_reputation: CompactReputationScores
+
+class CompactResumeSection(BaseModel):
+    """Compact analysis of one resume section."""
+    type: str = Field(description="Type of section (Experience, Projects, Education, Skills)")
+    points: List[Union[CompactResumePoint, CompactEducationEntry]]
+
+class CompactResumeSectionsAnalysis(BaseModel):
+    """Model for compact resume analysis output."""
+    sections: List[CompactResumeSection]
+
+class JobRequirements(BaseModel):
+    """Structured requirements extracted from the job description."""
+    required_skills: List[str] = Field(description="Technical skills the job requires")
+    preferred_skills: List[str] = Field(description="Technical skills the job lists as preferred or nice to have")
+    required_years: int = Field(ge=0, description="Minimum years of experience required, 0 if not stated")
+    experience_level: str = Field(description="Seniority level, e.g. Junior, Mid, Senior, Staff")
+    domain_expertise: List[str] = Field(description="Industries or problem domains the job requires experience in")
+    project_scale: str = Field(description="Complexity and scale of the work, e.g. team size, traffic, data volume")
+    soft_skills: List[str] = Field(description="Soft skills the job asks for")
+    qualifications: List[str] = Field(description="Degrees, certifications and other formal qualifications")
+
 class TechnicalMatch(BaseModel):
     """Technical skills match information."""
     matched_skills: List[str]
     missing_skills: List[str]
-    skill_coverage_score: float = Field(ge=0, le=100)
+    skill_coverage_score: float = Field(ge=0, le=100, description="Skill coverage score (0-100)")
 
 class ExperienceMatch(BaseModel):
     """Experience match information."""
     required_years: int
     actual_years: int
-    experience_score: float = Field(ge=0, le=100)
+    experience_score: float = Field(ge=0, le=100, description="Experience match score (0-100)")
 
 class KeyRequirements(BaseModel):
     """Key requirements match information."""
@@ -29,35 +138,84 @@ class KeyRequirements(BaseModel):
 
 class JobMatchAnalysis(BaseModel):
     """Model for job match analysis."""
-    match_score: float = Field(ge=0, le=100)
+    match_score: float = Field(ge=0, le=100, description="Overall match score (0-100)")
     technical_match: TechnicalMatch
     experience_match: ExperienceMatch
     key_requirements: KeyRequirements
     recommendations: List[str]
 
+class JobMatchWithRequirements(JobMatchAnalysis):
+    """Job match analysis that also returns the requirements it matched against."""
+    job_requirements: JobRequirements
+
 class ResumeAnalysisResponse(BaseModel):
     """Complete response model for resume analysis."""
     status: str
     resumeAnalysis: Dict[str, Any]  # Contains sections from analyze_resume_section
     tokenUsage: TokenUsage
     jobMatchAnalysis: Optional[JobMatchAnalysis] = None  # Contains job match analysis if provided
+    analysisId: Optional[str] = None  # Used to fetch per-point details later
+    scores: Optional[Dict[str, float]] = None  # Computed locally from the analyzed sections
+    recommendations: Optional[List[Dict[str, Any]]] = None  # Prioritized fixes for weak points
+
+class PointRationaleResponse(BaseModel):
+    """Response model for the STAR rationale of a single analyzed point."""
+    status: str
+    analysisId: str
+    sectionIndex: int
+    pointIndex: int
+    text: str
+    star: StarAssessment
+    tokenUsage: TokenUsage
 
-def validate_analysis_response(response: Dict[str, Any]) -> Dict[str, Any]:
+class CandidateRanking(BaseModel):
+    """Rank of one resume against a job description."""
+    rank: int
+    index: int  # Position of the resume in the request
+    candidateId: Optional[str] = None  # Analysis id or file name of the resume
+    prescore: float
+    jobMatchAnalysis: Optional[Dict[str, Any]] = None  # Only for resumes matched by the LLM
+    error: Optional[str] = None
+
+class RankingResponse(BaseModel):
+    """Response model for one page of a resume ranking."""
+    status: str
+    total: int
+    page: int
+    pageSize: int
+    completed: int  # LLM matches finished so far
+    matchTotal: int  # LLM matches in this ranking
+    rankings: List[CandidateRanking]
+    tokenUsage: TokenUsage
+
+class ValidatedResponse(dict):
+    """An analysis response that already passed validation and is trusted as it is."""
+
+# Built once, rather than a model instance per response
+_ANALYSIS_RESPONSE_ADAPTER = TypeAdapter(ResumeAnalysisResponse)
+
+def validate_analysis_response(response: Dict[str, Any], trusted: bool = False) -> Dict[str, Any]:
     """
     Validate the analysis response against the schema.
     
     Args:
         response: The response dictionary to validate
+        trusted: Skip validation, e.g. for responses validated before they were stored
         
     Returns:
         Dict[str, Any]: The validated response or error message
     """
+    if trusted or isinstance(response, ValidatedResponse):
+        return response if isinstance(response, ValidatedResponse) else ValidatedResponse(response)
     try:
-        # Create a response object and validate
-        validated = ResumeAnalysisResponse(**response)
-        return validated.model_dump()
+        validated = _ANALYSIS_RESPONSE_ADAPTER.validate_python(response)
+        return ValidatedResponse(_ANALYSIS_RESPONSE_ADAPTER.dump_python(validated))
     except Exception as e:
         return {
             "status": "error",
             "message": f"Response validation failed: {str(e)}"
-        } 
\ No newline at end of file
+        }
+
+def dump_analysis_response(response: ValidatedResponse) -> bytes:
+    """Serialize a validated analysis response to JSON without validating it again."""
+    return to_json(response)
@@ -0,0 +1,267 @@
+"""A local OpenAI-compatible server for benchmarks.
+
+Serves POST /v1/chat/completions by replaying the recorded tool call
+arguments in fixtures/responses.json for the function a request forces,
+or streaming the recorded text for plain requests. Latency, jitter and
+injected errors are drawn from a seeded generator, so runs with the same
+seed and request order behave the same.
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1, or
+run it on its own:
+
+    python -m benchmarks.fake_openai --port 8100 --latency-ms 800
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import threading
+import time
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FIXTURES_PATH = Path(__file__).parent / "fixtures" / "responses.json"
+
+# Rough characters per token of English text, as in app.services.resume_analyzer.utils.token
+CHARS_PER_TOKEN = 4
+
+@dataclass
+class FakeOpenAIConfig:
+    """How the fake server behaves."""
+    latency_ms: float = 0.0  # Time before a response, or before the first streamed chunk
+    jitter_ms: float = 0.0  # Uniform random extra latency, up to this much
+    ms_per_output_token: float = 0.0  # Generation time added per completion token
+    stream_chunk_ms: float = 0.0  # Pause between streamed chunks
+    error_rate: float = 0.0  # Share of requests answered with error_status
+    error_status: int = 429
+    seed: int = 0
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+def _forced_function(body: Dict[str, Any]) -> Optional[str]:
+    """Name of the function a request forces, from tool_choice or the legacy function_call."""
+    choice = body.get("tool_choice")
+    if isinstance(choice, dict):
+        return choice.get("function", {}).get("name")
+    legacy = body.get("function_call")
+    if isinstance(legacy, dict):
+        return legacy.get("name")
+    return None
+
+def _usage(body: Dict[str, Any], completion: str) -> Dict[str, Any]:
+    prompt_tokens = sum(_tokens(str(message.get("content") or "")) for message in body.get("messages", []))
+    completion_tokens = _tokens(completion)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": 0}
+    }
+
+def create_app(config: Optional[FakeOpenAIConfig] = None, responses: Optional[Dict[str, Any]] = None) -> FastAPI:
+    """
+    Build the fake OpenAI app.
+
+    Args:
+        config: Latency and error behaviour, defaults to instant answers without errors
+        responses: Recorded responses by function name, plus "text" for plain requests;
+            defaults to fixtures/responses.json
+
+    Returns:
+        FastAPI: The app, with the number of requests served in app.state.requests
+    """
+    config = config or FakeOpenAIConfig()
+    if responses is None:
+        responses = json.loads(FIXTURES_PATH.read_text())
+    rng = random.Random(config.seed)
+    ids = itertools.count(1)
+    app = FastAPI(title="Fake OpenAI")
+    app.state.requests = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        request_id = f"chatcmpl-fake-{next(ids)}"
+        model = body.get("model", "fake-model")
+        # Draw everything up front, so concurrent requests do not interleave draws
+        delay = (config.latency_ms + rng.uniform(0, config.jitter_ms)) / 1000
+        failed = rng.random() < config.error_rate
+
+        if failed:
+            await asyncio.sleep(delay)
+            return JSONResponse(status_code=config.error_status, content={"error": {
+                "message": f"Injected error {config.error_status}",
+                "type": "rate_limit_error" if config.error_status == 429 else "server_error",
+                "code": None
+            }})
+
+        function_name = _forced_function(body)
+        if function_name is None:
+            return _stream_text(body, request_id, model, responses["text"], delay, config)
+        if function_name not in responses:
+            return JSONResponse(status_code=400, content={"error": {
+                "message": f"No recorded response for function {function_name}", "type": "invalid_request_error"
+            }})
+
+        arguments = json.dumps(responses[function_name])
+        usage = _usage(body, arguments)
+        await asyncio.sleep(delay + usage["completion_tokens"] * config.ms_per_output_token / 1000)
+        return {
+            "id": request_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [{
+                        "id": f"call-{request_id}",
+                        "type": "function",
+                        "function": {"name": function_name, "arguments": arguments}
+                    }]
+                },
+                "finish_reason": "tool_calls"
+            }],
+            "usage": usage
+        }
+
+    return app
+
+def _stream_text(
+    body: Dict[str, Any],
+    request_id: str,
+    model: str,
+    text: str,
+    delay: float,
+    config: FakeOpenAIConfig
+) -> Any:
+    """Answer a plain request, word by word as server-sent events if it asks for a stream."""
+    if not body.get("stream"):
+        return {
+            "id": request_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": _usage(body, text)
+        }
+
+    words: List[str] = [word + " " for word in text.split(" ")]
+    words[-1] = words[-1].rstrip()
+
+    def event(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+        return chunk_event([{"index": 0, "delta": delta, "finish_reason": finish_reason}])
+
+    def chunk_event(choices: List[Dict[str, Any]], **fields: Any) -> str:
+        chunk = {
+            "id": request_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": choices,
+            **fields
+        }
+        return f"data: {json.dumps(chunk)}\n\n"
+
+    async def events() -> AsyncIterator[str]:
+        await asyncio.sleep(delay)
+        yield event({"role": "assistant", "content": ""})
+        for word in words:
+            yield event({"content": word})
+            await asyncio.sleep((config.stream_chunk_ms + _tokens(word) * config.ms_per_output_token) / 1000)
+        yield event({}, finish_reason="stop")
+        if (body.get("stream_options") or {}).get("include_usage"):
+            yield chunk_event([], usage=_usage(body, text))
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+class FakeOpenAIServer:
+    """
+    The fake app served by uvicorn in a background thread, with its own event loop
+    so its simulated latency never blocks the code under test.
+
+        with FakeOpenAIServer(FakeOpenAIConfig(latency_ms=500)) as server:
+            client = AsyncOpenAI(api_key="sk-fake", base_url=server.base_url)
+    """
+
+    def __init__(self, config: Optional[FakeOpenAIConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.app = create_app(config)
+        self._server = uvicorn.Server(uvicorn.Config(
+            self.app, host=host, port=port, log_level="warning", access_log=False, lifespan="off"
+        ))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL for the OpenAI client, ending in /v1."""
+        host, port = self._server.servers[0].sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def requests(self) -> int:
+        """Requests served so far."""
+        return self.app.state.requests
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._server.run, name="fake-openai", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("Fake OpenAI server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the FakeOpenAIConfig options to a command line parser."""
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency of every LLM response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra latency, up to this much")
+    parser.add_argument("--ms-per-output-token", type=float, default=0.0, help="Generation time per output token")
+    parser.add_argument("--stream-chunk-ms", type=float, default=0.0, help="Pause between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of LLM requests that fail")
+    parser.add_argument("--error-status", type=int, default=429, help="HTTP status of injected errors")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for jitter and injected errors")
+
+def config_from_arguments(args: argparse.Namespace) -> FakeOpenAIConfig:
+    return FakeOpenAIConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        ms_per_output_token=args.ms_per_output_token,
+        stream_chunk_ms=args.stream_chunk_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI API that replays recorded responses")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(config_from_arguments(args)), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
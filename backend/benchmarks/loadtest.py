@@ -0,0 +1,410 @@
+"""Load test one uvicorn worker of the API at increasing concurrency.
+
+Starts the fake OpenAI server and a single uvicorn worker of the app as
+subprocesses, then for every concurrency level keeps that many requests in
+flight for a fixed time. Every level reports throughput and latency
+percentiles, plus what the worker recorded meanwhile:
+- the lag of its event loop
+- its CPU use
+- the time per request spent in synchronous calls on the loop: PDF
+  parsing, cache calls (RedisCache is synchronous), serialization and the
+  CPU-bound analysis stages
+
+Once those calls take up most of the loop's time, more concurrency only
+adds latency. The report names the level where throughput stops scaling,
+and the synchronous calls that dominate there.
+
+    python -m benchmarks.loadtest --latency-ms 800 --concurrency 1,2,4,8,16,32,64
+    python -m benchmarks.loadtest --endpoint file --redis --json report.json
+"""
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+from benchmarks.fake_openai import FakeOpenAIConfig, add_config_arguments, config_from_arguments
+from benchmarks.scenarios import SAMPLE_JOB, render_pdf, resume_variant
+from benchmarks.stats import ScenarioResult, format_table, percentiles
+
+BACKEND_DIR = Path(__file__).parent.parent
+STARTUP_TIMEOUT_SECONDS = 30
+REQUEST_TIMEOUT_SECONDS = 300
+# Unmeasured requests sent first, so the worker has loaded its lazy imports and encodings;
+# with "both", every endpoint is hit more than once
+WARMUP_REQUESTS = 4
+
+# Stages that run synchronously on the event loop; analyze, match and upload mostly await I/O
+SYNCHRONOUS_STAGES = {
+    "extract": "PDF/DOCX text extraction",
+    "serialize": "Response serialization",
+    "response_cache": "Response cache lookup",
+    "normalize": "Stage: normalize",
+    "load": "Stage: load (analysis store)",
+    "split": "Stage: split (pre-analysis)",
+    "score": "Stage: score",
+    "recommend": "Stage: recommend",
+    "validate": "Stage: validate",
+    "store": "Stage: store (analysis store)"
+}
+
+# Throughput gains below this factor between levels count as saturation
+SCALING_THRESHOLD = 1.1
+
+Sample = Tuple[str, FrozenSet[Tuple[str, str]]]
+Send = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+@dataclass
+class LoadStep:
+    """One concurrency level of a load test."""
+    result: ScenarioResult
+    loop_lag_ms: Dict[str, float] = field(default_factory=dict)  # mean and p99 of the worker's loop lag
+    worker_cpu: Optional[float] = None  # Share of one core the worker used
+    synchronous_ms: Dict[str, float] = field(default_factory=dict)  # Synchronous time per request by source
+
+    def loop_share(self, source: str) -> float:
+        """Share of the wall time the worker's loop spent in a synchronous source."""
+        if not self.result.seconds:
+            return 0.0
+        return self.synchronous_ms.get(source, 0.0) * self.result.requests / 1000 / self.result.seconds
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            **self.result.summary(),
+            "loop_lag_ms": self.loop_lag_ms,
+            "worker_cpu": self.worker_cpu,
+            "synchronous_ms": self.synchronous_ms
+        }
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _wait_until_ready(url: str, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args} exited with {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {STARTUP_TIMEOUT_SECONDS}s")
+
+@contextmanager
+def serve(config: FakeOpenAIConfig, redis: bool = False) -> Iterator[Tuple[str, subprocess.Popen]]:
+    """
+    Run the fake OpenAI server and one app worker.
+
+    Yields:
+        Tuple[str, subprocess.Popen]: The app's base URL and its worker process
+    """
+    llm_port, app_port = _free_port(), _free_port()
+    processes = []
+    try:
+        llm = subprocess.Popen([
+            sys.executable, "-m", "benchmarks.fake_openai", "--port", str(llm_port),
+            "--latency-ms", str(config.latency_ms), "--jitter-ms", str(config.jitter_ms),
+            "--ms-per-output-token", str(config.ms_per_output_token),
+            "--stream-chunk-ms", str(config.stream_chunk_ms), "--error-rate", str(config.error_rate),
+            "--error-status", str(config.error_status), "--seed", str(config.seed)
+        ], cwd=BACKEND_DIR)
+        processes.append(llm)
+        _wait_until_ready(f"http://127.0.0.1:{llm_port}/docs", llm)
+
+        env = {
+            **os.environ,
+            "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "sk-loadtest"),
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+            "ANALYSIS_STORE": os.environ.get("ANALYSIS_STORE", "memory"),
+            "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+            "METRICS_ENABLED": "true",
+            "USE_REDIS": "true" if redis else "false"
+        }
+        worker = subprocess.Popen([
+            sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(app_port),
+            "--workers", "1", "--log-level", "warning", "--no-access-log"
+        ], cwd=BACKEND_DIR, env=env)
+        processes.append(worker)
+        app_url = f"http://127.0.0.1:{app_port}"
+        _wait_until_ready(f"{app_url}/health", worker)
+        yield app_url, worker
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+async def scrape(client: httpx.AsyncClient) -> Dict[Sample, float]:
+    """The app's metric samples, by name and labels."""
+    response = await client.get("/metrics")
+    response.raise_for_status()
+    return {
+        (sample.name, frozenset(sample.labels.items())): sample.value
+        for family in text_string_to_metric_families(response.text)
+        for sample in family.samples
+    }
+
+def _delta(before: Dict[Sample, float], after: Dict[Sample, float], name: str, **labels: str) -> float:
+    key = (name, frozenset(labels.items()))
+    return after.get(key, 0.0) - before.get(key, 0.0)
+
+def histogram_quantile(quantile: float, buckets: Sequence[Tuple[float, float]]) -> float:
+    """
+    Estimate a quantile from cumulative histogram buckets, interpolating within a bucket.
+
+    Args:
+        quantile: Quantile between 0 and 1
+        buckets: (upper bound, cumulative count) pairs, ending with the +Inf bucket
+    """
+    buckets = sorted(buckets)
+    total = buckets[-1][1] if buckets else 0
+    if not total:
+        return 0.0
+    rank = quantile * total
+    lower_bound, lower_count = 0.0, 0.0
+    for upper_bound, count in buckets:
+        if count >= rank:
+            if upper_bound == float("inf"):
+                return lower_bound
+            if count == lower_count:
+                return upper_bound
+            return lower_bound + (upper_bound - lower_bound) * (rank - lower_count) / (count - lower_count)
+        lower_bound, lower_count = upper_bound, count
+    return lower_bound
+
+def loop_lag(before: Dict[Sample, float], after: Dict[Sample, float]) -> Dict[str, float]:
+    """Mean and p99 event loop lag in milliseconds between two scrapes."""
+    name = "resume_event_loop_lag_seconds"
+    count = _delta(before, after, f"{name}_count")
+    buckets = [
+        (float(dict(labels)["le"]), value - before.get((sample, labels), 0.0))
+        for (sample, labels), value in after.items() if sample == f"{name}_bucket"
+    ]
+    return {
+        "mean": _delta(before, after, f"{name}_sum") / count * 1000 if count else 0.0,
+        "p99": histogram_quantile(0.99, buckets) * 1000
+    }
+
+def synchronous_time(before: Dict[Sample, float], after: Dict[Sample, float], requests: int) -> Dict[str, float]:
+    """Milliseconds per request spent in each synchronous source between two scrapes."""
+    if not requests:
+        return {}
+    seconds = {
+        label: _delta(before, after, "resume_analysis_stage_duration_seconds_sum", stage=stage)
+        for stage, label in SYNCHRONOUS_STAGES.items()
+    }
+    for sample, labels in after:
+        if sample == "resume_cache_operation_duration_seconds_sum":
+            labels = dict(labels)
+            seconds[f"Cache {labels['operation']} ({labels['backend']})"] = _delta(
+                before, after, sample, **labels
+            )
+    return {label: total / requests * 1000 for label, total in seconds.items() if total > 0}
+
+def _cpu_seconds(pid: int) -> Optional[float]:
+    """User and system CPU time of a process, where /proc is available."""
+    try:
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+def _peak_rss_mb(pid: int) -> float:
+    """Peak resident memory of a process in MB, where /proc is available."""
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+def request_sender(endpoint: str) -> Callable[[int], Send]:
+    """
+    Requests for an endpoint: "analyze", "file" or "both" alternating.
+    Every request carries a new resume, so no cache answers it.
+    """
+    def make(i: int) -> Send:
+        if endpoint == "file" or (endpoint == "both" and i % 2):
+            # Rendered before the request is timed
+            pdf = render_pdf(resume_variant(i))
+            return lambda client: client.post(
+                "/api/resume/analyze/file",
+                files={"file": (f"resume-{i}.pdf", pdf, "application/pdf")},
+                data={"job_description": SAMPLE_JOB}
+            )
+        return lambda client: client.post(
+            "/api/resume/analyze", json={"resume_text": resume_variant(i), "job_description": SAMPLE_JOB}
+        )
+    return make
+
+async def warm_up(
+    client: httpx.AsyncClient,
+    make_request: Callable[[int], Send],
+    ids: Iterator[int],
+    requests: int = WARMUP_REQUESTS
+) -> None:
+    """Send a fixed number of requests one after another, without measuring them."""
+    for _ in range(requests):
+        try:
+            await make_request(next(ids))(client)
+        except httpx.HTTPError:
+            pass
+
+async def run_step(
+    app_url: str,
+    worker_pid: int,
+    concurrency: int,
+    duration: float,
+    make_request: Callable[[int], Send],
+    ids: Iterator[int]
+) -> LoadStep:
+    """Keep concurrency requests in flight for duration seconds and measure them."""
+    result = ScenarioResult(name=f"c={concurrency}", concurrency=concurrency, seconds=0.0)
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=app_url, timeout=REQUEST_TIMEOUT_SECONDS, limits=limits) as client:
+        before = await scrape(client)
+        cpu_before = _cpu_seconds(worker_pid)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + duration
+
+        async def user() -> None:
+            while loop.time() < deadline:
+                send = make_request(next(ids))
+                sent = time.perf_counter()
+                try:
+                    response = await send(client)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    result.latencies.append(time.perf_counter() - sent)
+                else:
+                    result.errors += 1
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        result.seconds = loop.time() - started
+        cpu_after = _cpu_seconds(worker_pid)
+        after = await scrape(client)
+
+    result.llm_requests = int(sum(
+        value - before.get((sample, labels), 0.0)
+        for (sample, labels), value in after.items() if sample == "resume_llm_request_duration_seconds_count"
+    ))
+    result.peak_rss_mb = _peak_rss_mb(worker_pid)
+    return LoadStep(
+        result=result,
+        loop_lag_ms=loop_lag(before, after),
+        worker_cpu=None if cpu_before is None or cpu_after is None else (cpu_after - cpu_before) / result.seconds,
+        synchronous_ms=synchronous_time(before, after, result.requests)
+    )
+
+async def run_load_test(
+    concurrency_levels: Sequence[int],
+    duration: float,
+    endpoint: str,
+    config: FakeOpenAIConfig,
+    redis: bool = False
+) -> List[LoadStep]:
+    """Run every concurrency level in turn against one worker."""
+    ids = itertools.count()
+    make_request = request_sender(endpoint)
+    with serve(config, redis=redis) as (app_url, worker):
+        async with httpx.AsyncClient(base_url=app_url, timeout=REQUEST_TIMEOUT_SECONDS) as client:
+            await warm_up(client, make_request, ids)
+        steps = []
+        for concurrency in concurrency_levels:
+            steps.append(await run_step(app_url, worker.pid, concurrency, duration, make_request, ids))
+            print(f"  concurrency {concurrency}: {steps[-1].result.throughput:.1f} req/s", flush=True)
+        return steps
+
+def saturation_step(steps: Sequence[LoadStep]) -> Optional[LoadStep]:
+    """The last level before throughput stopped scaling, or None if it scaled throughout."""
+    for previous, step in zip(steps, steps[1:]):
+        if step.result.throughput < previous.result.throughput * SCALING_THRESHOLD:
+            return previous
+    return None
+
+def format_report(steps: Sequence[LoadStep]) -> str:
+    """Latency, loop lag and the synchronous calls that cap throughput, as text."""
+    lines = [format_table([step.result for step in steps]), ""]
+    header = f"{'level':<8}{'loop lag mean ms':>18}{'loop lag p99 ms':>17}{'worker cpu':>12}{'sync ms/req':>13}"
+    lines += [header, "-" * len(header)]
+    for step in steps:
+        cpu = "n/a" if step.worker_cpu is None else f"{step.worker_cpu:.0%}"
+        lines.append(
+            f"{step.result.name:<8}{step.loop_lag_ms.get('mean', 0.0):>18.1f}{step.loop_lag_ms.get('p99', 0.0):>17.1f}"
+            f"{cpu:>12}{sum(step.synchronous_ms.values()):>13.1f}"
+        )
+
+    saturated = saturation_step(steps)
+    focus = saturated or steps[-1]
+    lines.append("")
+    if saturated is None:
+        lines.append(f"Throughput still scaled at concurrency {steps[-1].result.concurrency}; try higher levels.")
+    else:
+        latency = percentiles(steps[-1].result.latencies)["p95"] * 1000
+        lines.append(
+            f"Throughput stops scaling at concurrency {saturated.result.concurrency} "
+            f"({saturated.result.throughput:.1f} req/s); p95 latency reaches {latency:.0f} ms "
+            f"at concurrency {steps[-1].result.concurrency}."
+        )
+    lines.append(f"Synchronous calls on the event loop at concurrency {focus.result.concurrency}:")
+    for source, ms in sorted(focus.synchronous_ms.items(), key=lambda item: -item[1]):
+        lines.append(f"  {source:<36}{ms:>9.2f} ms/request{focus.loop_share(source):>8.0%} of loop time")
+    if focus.worker_cpu is not None:
+        attributed = sum(focus.loop_share(source) for source in SYNCHRONOUS_STAGES.values())
+        lines.append(
+            f"  {'Other worker CPU (framework, HTTP, JSON)':<36}{'':>20}"
+            f"{max(0.0, focus.worker_cpu - attributed):>8.0%} of loop time"
+        )
+    lines.append("Cache calls are also counted in the stage that made them.")
+    return "\n".join(lines)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test one API worker at increasing concurrency")
+    parser.add_argument(
+        "--concurrency", default="1,2,4,8,16,32,64",
+        help="Comma-separated concurrency levels, run in order"
+    )
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per concurrency level")
+    parser.add_argument("--endpoint", choices=("analyze", "file", "both"), default="both")
+    parser.add_argument("--redis", action="store_true", help="Use RedisCache in the worker, REDIS_URL must be reachable")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results to a JSON file")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    config = config_from_arguments(args)
+    print(f"Load testing {args.endpoint} for {args.duration:.0f}s at each of concurrency {levels}")
+    steps = asyncio.run(run_load_test(levels, args.duration, args.endpoint, config, redis=args.redis))
+    print()
+    print(format_report(steps))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "config": vars(config),
+                "endpoint": args.endpoint,
+                "redis": args.redis,
+                "steps": [step.summary() for step in steps]
+            }, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+if __name__ == "__main__":
+    main()
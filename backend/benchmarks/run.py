@@ -0,0 +1,84 @@
+"""Run benchmark scenarios against the app, with a fake OpenAI backend.
+
+The app runs in this process and is called through httpx without a
+network hop; only its LLM calls go over HTTP, to the fake server. Every
+scenario starts with a new analyzer, so caches are cold.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --latency-ms 800 --jitter-ms 400 --error-rate 0.02
+    python -m benchmarks.run --scenario cache_hit --scenario file_upload --json results.json
+"""
+from typing import List
+import argparse
+import asyncio
+import json
+import httpx
+from openai import AsyncOpenAI
+from app.dependencies import get_resume_analyzer
+from app.main import app
+from app.services.analysis_store import InMemoryAnalysisStore
+from app.services.resume_analyzer import ResumeAnalyzer
+from benchmarks.fake_openai import FakeOpenAIConfig, FakeOpenAIServer, add_config_arguments, config_from_arguments
+from benchmarks.scenarios import Scenario, build_scenarios, run_scenario
+from benchmarks.stats import ScenarioResult, format_table
+
+REQUEST_TIMEOUT_SECONDS = 300
+# The fake server accepts any key, one is only needed for a valid Authorization header
+BENCHMARK_API_KEY = "sk-benchmark"
+
+async def run_benchmarks(
+    scenarios: List[Scenario],
+    config: FakeOpenAIConfig,
+    trace_memory: bool = False
+) -> List[ScenarioResult]:
+    """Run scenarios one after another against a fake OpenAI server with the given behaviour."""
+    results = []
+    with FakeOpenAIServer(config) as server:
+        try:
+            for scenario in scenarios:
+                # The client is passed in, so the environment and settings of the process are not used
+                analyzer = ResumeAnalyzer(
+                    openai_client=AsyncOpenAI(api_key=BENCHMARK_API_KEY, base_url=server.base_url),
+                    analysis_store=InMemoryAnalysisStore()
+                )
+                app.dependency_overrides[get_resume_analyzer] = lambda: analyzer
+                async with httpx.AsyncClient(
+                    app=app, base_url="http://benchmark", timeout=REQUEST_TIMEOUT_SECONDS
+                ) as client:
+                    results.append(await run_scenario(
+                        scenario, client, llm_requests=lambda: server.requests, trace_memory=trace_memory
+                    ))
+        finally:
+            app.dependency_overrides.pop(get_resume_analyzer, None)
+    return results
+
+def main() -> None:
+    scenarios = build_scenarios()
+    parser = argparse.ArgumentParser(description="Benchmark the API against a fake OpenAI backend")
+    parser.add_argument(
+        "--scenario", action="append", choices=sorted(scenarios),
+        help="Scenario to run, repeatable; all by default"
+    )
+    parser.add_argument("--scale", type=float, default=1.0, help="Factor for the number of requests per scenario")
+    parser.add_argument("--trace-memory", action="store_true", help="Report peak Python allocations, slows runs down")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results to a JSON file")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    if args.scale != 1.0:
+        scenarios = build_scenarios(args.scale)
+    selected = [scenarios[name] for name in (args.scenario or scenarios)]
+    config = config_from_arguments(args)
+    for scenario in selected:
+        print(f"{scenario.name}: {scenario.description}")
+    results = asyncio.run(run_benchmarks(selected, config, trace_memory=args.trace_memory))
+    print()
+    print(format_table(results))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(config), "results": [result.summary() for result in results]}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+if __name__ == "__main__":
+    main()
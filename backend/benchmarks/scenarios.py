@@ -0,0 +1,165 @@
+"""Benchmark scenarios, each a stream of requests to the app at a fixed concurrency."""
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import time
+import tracemalloc
+import httpx
+from benchmarks.stats import ScenarioResult, peak_rss_mb
+
+DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+SAMPLE_RESUME = (DATA_DIR / "resumes" / "sample_resume.txt").read_text()
+SAMPLE_JOB = (DATA_DIR / "job_descriptions" / "sample_job.txt").read_text()
+
+Send = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+@dataclass
+class Scenario:
+    """
+    Requests to send, concurrency at most at once.
+    send(client, i) sends the i-th request; warmup requests are sent first and not measured.
+    """
+    name: str
+    description: str
+    requests: int
+    concurrency: int
+    send: Send
+    warmup: int = 0
+
+def resume_variant(index: int) -> str:
+    """The sample resume under a different name, so every variant misses the caches."""
+    return SAMPLE_RESUME.replace("JOHN DOE", f"JOHN DOE {index}", 1)
+
+def render_pdf(text: str) -> bytes:
+    """A PDF of the text, one line per text line."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    y = 750
+    for line in text.splitlines():
+        if y < 50:
+            pdf.showPage()
+            y = 750
+        pdf.drawString(40, y, line[:110])
+        y -= 14
+    pdf.save()
+    return buffer.getvalue()
+
+def _analyze(index_offset: int = 0, job_description: Optional[str] = None) -> Send:
+    async def send(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post("/api/resume/analyze", json={
+            "resume_text": resume_variant(index_offset + i),
+            "job_description": job_description
+        })
+    return send
+
+def _analyze_same_resume() -> Send:
+    async def send(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post("/api/resume/analyze", json={"resume_text": SAMPLE_RESUME})
+    return send
+
+def _rank(batch_size: int) -> Send:
+    async def send(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        resumes = [resume_variant(10_000 + i * batch_size + j) for j in range(batch_size)]
+        return await client.post("/api/resume/rank", json={"job_description": SAMPLE_JOB, "resumes": resumes})
+    return send
+
+def _upload(pdfs: List[bytes]) -> Send:
+    async def send(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post(
+            "/api/resume/analyze/file",
+            files={"file": (f"resume-{i}.pdf", pdfs[i % len(pdfs)], "application/pdf")}
+        )
+    return send
+
+def build_scenarios(scale: float = 1.0) -> Dict[str, Scenario]:
+    """
+    The benchmark scenarios, by name.
+
+    Args:
+        scale: Factor for the number of requests of every scenario
+    """
+    def count(requests: int) -> int:
+        return max(1, round(requests * scale))
+
+    uploads = count(20)
+    return {
+        "single": Scenario(
+            "single", "One analysis at a time, every resume new", count(20), 1, _analyze(0)
+        ),
+        "concurrent": Scenario(
+            "concurrent", "Analyses with a job match, 20 at once, every resume new",
+            count(100), 20, _analyze(1_000, SAMPLE_JOB)
+        ),
+        "batch": Scenario(
+            "batch", "Rankings of 25 new resumes against a job", count(5), 1, _rank(25)
+        ),
+        "cache_hit": Scenario(
+            "cache_hit", "The same analysis repeatedly, 20 at once, served from the response cache",
+            count(200), 20, _analyze_same_resume(), warmup=1
+        ),
+        "file_upload": Scenario(
+            "file_upload", "PDF uploads, 5 at once, every resume new", uploads, 5,
+            _upload([render_pdf(resume_variant(20_000 + i)) for i in range(uploads)])
+        )
+    }
+
+async def run_scenario(
+    scenario: Scenario,
+    client: httpx.AsyncClient,
+    llm_requests: Callable[[], int] = lambda: 0,
+    trace_memory: bool = False
+) -> ScenarioResult:
+    """
+    Send the requests of a scenario and measure them.
+
+    Args:
+        scenario: Scenario to run
+        client: Client for the app under test
+        llm_requests: Count of requests the LLM backend has received so far
+        trace_memory: Whether to measure peak Python allocations, which slows the run down
+
+    Returns:
+        ScenarioResult: Latencies, errors, throughput and memory of the measured requests
+    """
+    for i in range(scenario.warmup):
+        await scenario.send(client, i)
+
+    result = ScenarioResult(name=scenario.name, concurrency=scenario.concurrency, seconds=0.0)
+    semaphore = asyncio.Semaphore(scenario.concurrency)
+
+    async def measure(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await scenario.send(client, i)
+                ok = response.status_code == 200 and _succeeded(response)
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                result.latencies.append(time.perf_counter() - started)
+            else:
+                result.errors += 1
+
+    llm_before = llm_requests()
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(measure(i) for i in range(scenario.requests)))
+    result.seconds = time.perf_counter() - started
+    if trace_memory:
+        result.traced_peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    result.llm_requests = llm_requests() - llm_before
+    result.peak_rss_mb = peak_rss_mb()
+    return result
+
+def _succeeded(response: httpx.Response) -> bool:
+    """Whether a 200 response is a success rather than an error body."""
+    if "json" not in response.headers.get("content-type", ""):
+        return True
+    return response.json().get("status") == "success"
@@ -0,0 +1,68 @@
+"""Latency statistics and reports for benchmark runs."""
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+import resource
+import sys
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+def percentiles(samples: Sequence[float]) -> Dict[str, float]:
+    """p50, p95 and p99 of the samples, 0 for none."""
+    if not samples:
+        return {f"p{p}": 0.0 for p in PERCENTILES}
+    values = np.percentile(np.asarray(samples, dtype=float), PERCENTILES)
+    return {f"p{p}": float(value) for p, value in zip(PERCENTILES, values)}
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+@dataclass
+class ScenarioResult:
+    """Outcome of one benchmark scenario."""
+    name: str
+    concurrency: int
+    seconds: float  # Wall time of the measured requests
+    latencies: List[float] = field(default_factory=list)  # Seconds per successful request
+    errors: int = 0
+    llm_requests: int = 0  # Requests the fake LLM server received
+    peak_rss_mb: float = 0.0
+    traced_peak_mb: Optional[float] = None  # Peak Python allocations, with --trace-memory
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies) + self.errors
+
+    @property
+    def throughput(self) -> float:
+        """Successful requests per second."""
+        return len(self.latencies) / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """The result without raw latencies, with latencies in milliseconds."""
+        summary = {key: value for key, value in asdict(self).items() if key != "latencies"}
+        summary.update(
+            requests=self.requests,
+            throughput=self.throughput,
+            **{name: seconds * 1000 for name, seconds in percentiles(self.latencies).items()}
+        )
+        return summary
+
+def format_table(results: Sequence[ScenarioResult]) -> str:
+    """The results as a plain text table."""
+    header = (
+        f"{'scenario':<14}{'conc':>6}{'reqs':>7}{'errors':>8}{'req/s':>9}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'llm calls':>11}{'rss MB':>9}"
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        summary = result.summary()
+        lines.append(
+            f"{result.name:<14}{result.concurrency:>6}{result.requests:>7}{result.errors:>8}"
+            f"{summary['throughput']:>9.1f}{summary['p50']:>10.1f}{summary['p95']:>10.1f}{summary['p99']:>10.1f}"
+            f"{result.llm_requests:>11}{result.peak_rss_mb:>9.1f}"
+        )
+    return "\n".join(lines)
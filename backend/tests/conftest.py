@@ -0,0 +1,24 @@
+import json
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Keep analyses of one test run out of the next, the default store is a SQLite file
+os.environ["ANALYSIS_STORE"] = "memory"
+
+
+@pytest.fixture
+def tool_call_response():
+    """Factory for a chat completion whose forced tool call has the given arguments."""
+    def make(arguments):
+        response = MagicMock()
+        response.choices[0].message.tool_calls = [
+            SimpleNamespace(function=SimpleNamespace(arguments=json.dumps(arguments)))
+        ]
+        response.usage = SimpleNamespace(
+            total_tokens=110, prompt_tokens=100, completion_tokens=10,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=40)
+        )
+        return response
+    return make
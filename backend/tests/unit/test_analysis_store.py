@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import AsyncMock
+from app.services import analysis_store
+from fastapi.testclient import TestClient
+from app.main import app
+from app.dependencies import get_resume_analyzer
+from app.services.analysis_store import InMemoryAnalysisStore, SQLiteAnalysisStore
+from app.services.cache import InMemoryCache
+from app.services.resume_analyzer import ResumeAnalyzer
+
+RESUME = """Jane Doe
+EXPERIENCE
+- Reduced API latency by 35% by adding a read-through cache
+"""
+
+TOKEN_USAGE = {"total_tokens": 10, "prompt_tokens": 8, "completion_tokens": 2, "total_cost": 0.001}
+
+
+def _record(analysis_id, resume_hash="r1", job_hash=None, model="large-model", created_at=0.0):
+    return {
+        "analysis_id": analysis_id,
+        "resume_hash": resume_hash,
+        "job_hash": job_hash,
+        "model": model,
+        "prompt_version": "1",
+        "analysis_mode": "full",
+        "created_at": created_at,
+        "resume_text": "resume",
+        "result": {"status": "success", "resumeAnalysis": {"sections": []}}
+    }
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryAnalysisStore()
+    return SQLiteAnalysisStore(str(tmp_path / "analyses.db"))
+
+
+def test_save_and_get(store):
+    """Test that records round-trip, including their result."""
+    store.save(_record("a1"))
+    assert store.get("a1") == _record("a1")
+    assert store.get("missing") is None
+
+
+def test_find_filters_newest_first(store):
+    """Test lookups by the indexed fields."""
+    store.save(_record("a1", created_at=1.0))
+    store.save(_record("a2", job_hash="j1", created_at=2.0))
+    store.save(_record("a3", resume_hash="r2", job_hash="j1", model="small-model", created_at=3.0))
+
+    assert [r["analysis_id"] for r in store.find()] == ["a3", "a2", "a1"]
+    assert [r["analysis_id"] for r in store.find(resume_hash="r1")] == ["a2", "a1"]
+    assert [r["analysis_id"] for r in store.find(job_hash="j1", model="large-model")] == ["a2"]
+    assert [r["analysis_id"] for r in store.find(since=2.0, limit=1)] == ["a3"]
+    assert "result" not in store.find()[0]
+
+
+def test_sqlite_store_persists(tmp_path):
+    """Test that analyses survive reopening the database."""
+    path = str(tmp_path / "analyses.db")
+    SQLiteAnalysisStore(path).save(_record("a1"))
+    assert SQLiteAnalysisStore(path).get("a1")["result"]["status"] == "success"
+
+
+def test_prune_applies_retention_and_size_limit(store):
+    """Test that expired records and the oldest beyond the limit are pruned."""
+    now = time.time()
+    store.retention_seconds = 100
+    store.max_records = 2
+    store.save(_record("expired", created_at=now - 200))
+    for index in range(3):
+        store.save(_record(f"a{index}", created_at=now - 10 + index))
+
+    assert store.prune() == 2
+    assert [r["analysis_id"] for r in store.find()] == ["a2", "a1"]
+
+
+def test_prune_runs_every_interval_of_saves(store, monkeypatch):
+    """Test that saves trigger pruning without a separate job."""
+    monkeypatch.setattr(analysis_store, "PRUNE_INTERVAL", 2)
+    store.max_records = 1
+    store.save(_record("a1", created_at=1.0))
+    assert len(store.find()) == 1
+    store.save(_record("a2", created_at=2.0))
+    assert [r["analysis_id"] for r in store.find()] == ["a2"]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_calls_run_off_the_event_loop(tmp_path):
+    """Test that the analyzer makes blocking store calls from a worker thread."""
+    store = SQLiteAnalysisStore(str(tmp_path / "analyses.db"))
+    store.save(_record("a1"))
+    threads = []
+    get = store.get
+    store.get = lambda analysis_id: threads.append(threading.current_thread()) or get(analysis_id)
+    analyzer = ResumeAnalyzer(analysis_store=store)
+    analyzer.openai_service.cache = InMemoryCache()
+
+    assert await analyzer.get_resume_text("a1") == "resume"
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_stored_analysis_is_served_without_regenerating(tmp_path):
+    """Test that analyses are fetched by id and repeated requests skip the LLM."""
+    store = SQLiteAnalysisStore(str(tmp_path / "analyses.db"))
+    analyzer = ResumeAnalyzer(analysis_store=store)
+    analyzer.openai_service.cache = InMemoryCache()
+    analyzer.openai_service.analyze_resume_content = AsyncMock(return_value={
+        "status": "success",
+        "content": {"sections": [{"type": "Experience", "points": []}]},
+        "token_usage": TOKEN_USAGE
+    })
+    app.dependency_overrides[get_resume_analyzer] = lambda: analyzer
+    try:
+        client = TestClient(app)
+        first = client.post("/api/resume/analyze", json={"resume_text": RESUME}).json()
+        analysis_id = first["analysisId"]
+        assert store.get(analysis_id)["job_hash"] is None
+
+        # A fresh cache, as after a restart, still finds the analysis in storage
+        analyzer.openai_service.cache = InMemoryCache()
+        response = client.get(f"/api/resume/analysis/{analysis_id}")
+        assert response.status_code == 200
+        assert response.json()["resumeAnalysis"] == first["resumeAnalysis"]
+
+        again = client.post("/api/resume/analyze", json={"resume_text": RESUME}).json()
+        assert again["analysisId"] == analysis_id
+        assert analyzer.openai_service.analyze_resume_content.await_count == 1
+        # Served from storage, so this request spent nothing
+        assert first["tokenUsage"]["total_tokens"] == TOKEN_USAGE["total_tokens"]
+        assert again["tokenUsage"]["total_tokens"] == 0
+        assert asyncio.run(analyzer.get_resume_text(analysis_id)) == store.get(analysis_id)["resume_text"]
+
+        assert client.get("/api/resume/analysis/unknown").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
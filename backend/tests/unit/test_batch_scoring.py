@@ -0,0 +1,146 @@
+import random
+import pytest
+from app.services.resume_analyzer.utils.batch_scoring import (
+    build_score_table,
+    resume_score_columns,
+    resume_scores,
+    section_scores
+)
+from app.services.resume_analyzer.utils.scoring import calculate_overall_scores, calculate_resume_scores
+
+SECTION_TYPES = ["Experience", "Projects", "Skills", "Education"]
+
+
+def _reputation(rng):
+    return {"domestic_score": rng.randint(1, 10), "international_score": rng.randint(1, 10)}
+
+
+def _random_analysis(rng):
+    sections = []
+    for _ in range(rng.randint(0, 5)):
+        section_type = rng.choice(SECTION_TYPES)
+        if section_type == "Education":
+            points = [{"text": "BS"} for _ in range(rng.randint(0, 3))]
+        else:
+            points = [
+                {
+                    "text": "point",
+                    "star": {"complete": rng.random() < 0.4},
+                    "metrics": ["1%"] * rng.randint(0, 4),
+                    "technical_score": rng.randint(1, 5),
+                    "contribution": rng.choice([None, 0, 2.5, 4, 5, 7])
+                }
+                for _ in range(rng.randint(0, 6))
+            ]
+        section = {"type": section_type, "points": points}
+        if section_type == "Education" and rng.random() < 0.5:
+            # Entry reputations only where the section has one, the legacy formula ignores them
+            section["subject_course_school_reputation"] = _reputation(rng)
+            for point in points:
+                point["subject_course_school_reputation"] = _reputation(rng)
+        sections.append(section)
+    return {"sections": sections}
+
+
+def test_matches_scalar_formulas():
+    """Test that vectorized scores equal the per-resume scoring functions."""
+    rng = random.Random(7)
+    analyses = [_random_analysis(rng) for _ in range(300)]
+    scores = resume_scores(build_score_table(analyses))
+
+    for analysis, score in zip(analyses, scores):
+        expected = calculate_resume_scores(analysis["sections"])
+        points = [
+            point for section in analysis["sections"] if section["type"] != "Education"
+            for point in section["points"]
+        ]
+        expected.update(calculate_overall_scores(points))
+        assert score == expected
+
+
+def test_section_scores():
+    """Test per-section aggregates and education entries."""
+    analyses = [
+        {"sections": [
+            {"type": "Experience", "points": [
+                {"star": {"complete": True}, "metrics": ["35%", "$2M"], "technical_score": 4},
+                {"star": {"complete": False}, "metrics": [], "technical_score": 2}
+            ]},
+            {"type": "Education", "subject_course_school_reputation": {"domestic_score": 9, "international_score": 7},
+             "points": []}
+        ]},
+        {"sections": []}
+    ]
+    table = build_score_table(analyses)
+    assert section_scores(table) == [
+        {"resume": 0, "type": "Experience", "points": 2, "star_format": 2.5,
+         "metrics_usage": 2.5, "technical_depth": 3.0, "education_quality": 0.0},
+        {"resume": 0, "type": "Education", "points": 0, "star_format": 0.0,
+         "metrics_usage": 0.0, "technical_depth": 0.0, "education_quality": 8.0}
+    ]
+    columns = resume_score_columns(table)
+    assert columns["overall"].tolist() == pytest.approx([(2.5 + 2.5 + 3.0 + 8.0) / 4, 0.0])
+
+
+def test_legacy_resume_scores():
+    """Test that resume scores keep the outputs of the legacy per-resume formula."""
+    sections = [
+        {"type": "Experience", "points": [
+            {"star": {"complete": True}, "metrics": ["35%", "$2M", "3x"], "technical_score": 4},
+            {"star": {"complete": False}, "metrics": [], "technical_score": 3},
+            {"star": {"complete": True}, "metrics": ["10"], "technical_score": 5}
+        ]},
+        {"type": "Education", "subject_course_school_reputation": {"domestic_score": 9, "international_score": 6},
+         "points": [{"subject_course_school_reputation": {"domestic_score": 1, "international_score": 1}}]},
+        {"type": "Education", "points": [
+            {"subject_course_school_reputation": {"domestic_score": 2, "international_score": 2}}
+        ]}
+    ]
+    expected = {
+        "star_format": 3.33,
+        "metrics_usage": 3.33,
+        "technical_depth": 4.0,
+        "education_quality": 7.5,
+        "overall": 4.54
+    }
+    assert calculate_resume_scores(sections) == expected
+    # Equal for sections rated as a whole; the batch scorer also counts the last one, rated per entry
+    score = resume_scores(build_score_table([{"sections": sections[:2]}]))[0]
+    assert {key: score[key] for key in expected} == expected
+    score = resume_scores(build_score_table([{"sections": sections}]))[0]
+    assert score["education_quality"] == (7.5 + 2) / 2
+
+
+def test_education_entry_reputations():
+    """Test that education sections rated per entry score the average of their entries."""
+    entry = {"text": "BSc Computer Science", "subject": "Computer Science", "course": "BSc", "school": "State College"}
+    sections = [
+        {"type": "Education", "points": [
+            {**entry, "subject_course_school_reputation": {
+                "domestic_score": 9, "domestic_score_rationale": "Top ranked",
+                "international_score": 8, "international_score_rationale": "Well known"
+            }},
+            {**entry, "subject_course_school_reputation": {
+                "domestic_score": 6, "domestic_score_rationale": "Regional",
+                "international_score": 5, "international_score_rationale": "Little known"
+            }},
+            {"text": "Online course"}
+        ]},
+        {"type": "Education", "points": []}
+    ]
+    table = build_score_table([{"sections": sections}])
+    assert resume_scores(table)[0]["education_quality"] == 7.0
+    assert [section["education_quality"] for section in section_scores(table)] == [7.0, 0.0]
+
+
+def test_malformed_points_do_not_raise():
+    """Test that missing or mistyped fields count as empty."""
+    table = build_score_table([{"sections": [{"type": "Experience", "points": [
+        {"star": None, "metrics": None, "technical_score": "high"}, "not a point"
+    ]}]}, None])
+    assert resume_scores(table)[0]["technical_depth"] == 0.0
+    assert resume_scores(table)[1]["overall"] == 0.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
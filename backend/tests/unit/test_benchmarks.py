@@ -0,0 +1,76 @@
+import pytest
+import tenacity
+from openai import AsyncOpenAI
+from benchmarks.fake_openai import FakeOpenAIConfig, FakeOpenAIServer
+from benchmarks.run import run_benchmarks
+from benchmarks.scenarios import build_scenarios
+from benchmarks.stats import percentiles
+from app.services import openai_service
+from app.services.cache import InMemoryCache
+from app.services.openai_service import OpenAIService
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeOpenAIServer() as server:
+        yield server
+
+
+def _service(base_url):
+    service = OpenAIService(AsyncOpenAI(api_key="sk-test", base_url=base_url, max_retries=0))
+    service.cache = InMemoryCache()
+    return service
+
+
+@pytest.mark.asyncio
+async def test_fake_server_replays_function_calls(server):
+    """Test that forced function calls get the recorded arguments and a usage block."""
+    result = await _service(server.base_url).analyze_job_match("Python developer", "Python role")
+    assert result["status"] == "success"
+    assert result["content"]["match_score"] == 82
+    assert result["token_usage"]["completion_tokens"] > 0
+
+
+@pytest.mark.asyncio
+async def test_fake_server_streams_text(server):
+    """Test that plain requests are streamed in chunks."""
+    chunks = [
+        chunk async for chunk in _service(server.base_url).stream_improvement("Experience", "Built a cache", {})
+    ]
+    assert len(chunks) > 1
+    assert "".join(chunks).startswith("Led the migration")
+
+
+@pytest.mark.asyncio
+async def test_fake_server_injects_errors(monkeypatch):
+    """Test that injected errors reach the service as failed calls, after its retries."""
+    monkeypatch.setattr(openai_service, "RETRY_WAIT", tenacity.wait_none())
+    with FakeOpenAIServer(FakeOpenAIConfig(error_rate=1.0, error_status=429)) as failing:
+        result = await _service(failing.base_url).analyze_job_match("Python developer", "Python role")
+        assert failing.requests == 3
+    assert result["status"] == "error"
+    assert "429" in result["message"]
+
+
+@pytest.mark.asyncio
+async def test_scenarios_run_without_errors():
+    """Test a small run of every scenario against the fake backend."""
+    scenarios = build_scenarios(scale=0.05)
+    results = await run_benchmarks(list(scenarios.values()), FakeOpenAIConfig())
+    assert [result.name for result in results] == list(scenarios)
+    for result in results:
+        assert result.errors == 0, result.name
+        assert result.throughput > 0
+    by_name = {result.name: result for result in results}
+    assert by_name["cache_hit"].llm_requests == 0
+    assert by_name["single"].llm_requests > 0
+
+
+def test_percentiles():
+    """Test latency percentiles, and zeros without samples."""
+    assert percentiles([0.1] * 99 + [1.0]) == {"p50": 0.1, "p95": 0.1, "p99": pytest.approx(0.109)}
+    assert percentiles([]) == {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
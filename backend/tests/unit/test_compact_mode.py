@@ -0,0 +1,159 @@
+import pytest
+from unittest.mock import AsyncMock
+from fastapi.testclient import TestClient
+from app.main import app
+from app.dependencies import get_resume_analyzer
+from app.services.cache import InMemoryCache
+from app.services.openai_service import COMPACT_RESUME_ANALYSIS_FUNCTIONS
+from app.services.prompts import point_rationale_user_messages
+from app.services.resume_analyzer import AnalysisNotFoundError, ResumeAnalyzer
+
+RESUME = """Jane Doe
+EXPERIENCE
+- Reduced API latency by 35% by adding a read-through cache
+SKILLS
+Python, Kubernetes
+"""
+
+COMPACT_POINT = {
+    "text": "Reduced API latency by 35% by adding a read-through cache",
+    "star": {"situation": False, "action": True, "result": True, "complete": False},
+    "metrics": ["35%"],
+    "technical_score": 4
+}
+
+STAR_RATIONALE = {
+    "situation": False,
+    "situation_rationale": "No context for the change is given",
+    "action": True,
+    "action_rationale": "Adding a read-through cache is a concrete action",
+    "result": True,
+    "result_rationale": "Latency reduction of 35% is quantified",
+    "complete": False
+}
+
+TOKEN_USAGE = {"total_tokens": 10, "prompt_tokens": 8, "completion_tokens": 2, "total_cost": 0.001}
+
+
+@pytest.fixture
+def analyzer():
+    """Analyzer with a private cache and a mocked compact LLM response."""
+    analyzer = ResumeAnalyzer()
+    analyzer.openai_service.cache = InMemoryCache()
+    analyzer.openai_service.analyze_resume_content = AsyncMock(return_value={
+        "status": "success",
+        "content": {"sections": [{"type": "Experience", "points": [COMPACT_POINT]}]},
+        "token_usage": TOKEN_USAGE
+    })
+    analyzer.openai_service.explain_point = AsyncMock(return_value={
+        "status": "success",
+        "content": STAR_RATIONALE,
+        "token_usage": TOKEN_USAGE
+    })
+    return analyzer
+
+
+def _property_names(schema):
+    """Collect every property name in a JSON schema."""
+    names = set()
+    if isinstance(schema, dict):
+        names.update(schema.get("properties", {}))
+        for value in schema.values():
+            names |= _property_names(value)
+    elif isinstance(schema, list):
+        for item in schema:
+            names |= _property_names(item)
+    return names
+
+
+def test_compact_schema_has_no_rationales():
+    """Test that the compact schema only asks for booleans, metrics and scores."""
+    names = _property_names(COMPACT_RESUME_ANALYSIS_FUNCTIONS[0]["parameters"])
+    assert not [name for name in names if name.endswith("rationale")]
+    assert "improvement" not in names
+    assert {"situation", "metrics", "technical_score", "domestic_score"} <= names
+
+
+@pytest.mark.asyncio
+async def test_compact_analysis(analyzer):
+    """Test that compact mode reaches the LLM call and local sections stay compact."""
+    result = await analyzer.analyze_resume(RESUME, analysis_mode="compact")
+
+    assert result["status"] == "success"
+    assert result["analysisId"]
+    assert analyzer.openai_service.analyze_resume_content.call_args.kwargs["analysis_mode"] == "compact"
+    skills = result["resumeAnalysis"]["sections"][1]
+    assert skills["type"] == "Skills"
+    assert skills["points"][0]["star"] == {
+        "situation": False, "action": False, "result": False, "complete": False
+    }
+    assert "improvement" not in skills["points"][0]
+
+
+@pytest.mark.asyncio
+async def test_explain_point_fills_in_rationales(analyzer):
+    """Test that rationales for a compact point are generated on demand."""
+    result = await analyzer.analyze_resume(RESUME, analysis_mode="compact")
+
+    explained = await analyzer.explain_point(result["analysisId"], 0, 0)
+    assert explained["star"] == STAR_RATIONALE
+    assert explained["text"] == COMPACT_POINT["text"]
+    analyzer.openai_service.explain_point.assert_awaited_once_with(
+        "Experience", COMPACT_POINT["text"], COMPACT_POINT["star"]
+    )
+
+    # Points that already carry rationales are answered from the stored analysis
+    full = await analyzer.analyze_resume(RESUME)
+    assert full["analysisId"] != result["analysisId"]
+    with pytest.raises(AnalysisNotFoundError):
+        await analyzer.explain_point(full["analysisId"], 5, 0)
+    explained = await analyzer.explain_point(full["analysisId"], 1, 0)
+    assert explained["star"]["situation_rationale"].startswith("Not evaluated")
+    assert analyzer.openai_service.explain_point.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_explain_point_keeps_stored_flags(analyzer):
+    """Test that generated rationales never change the STAR flags stored with the analysis."""
+    analyzer.openai_service.explain_point.return_value = {
+        "status": "success",
+        "content": {**STAR_RATIONALE, "situation": True, "complete": True},
+        "token_usage": TOKEN_USAGE
+    }
+    result = await analyzer.analyze_resume(RESUME, analysis_mode="compact")
+
+    explained = await analyzer.explain_point(result["analysisId"], 0, 0)
+    assert {key: explained["star"][key] for key in COMPACT_POINT["star"]} == COMPACT_POINT["star"]
+    assert explained["star"]["action_rationale"] == STAR_RATIONALE["action_rationale"]
+
+
+def test_rationale_prompt_carries_stored_flags():
+    """Test that the stored flags are sent with the point, so points with other flags get other cache keys."""
+    star = COMPACT_POINT["star"]
+    messages = point_rationale_user_messages("Experience", COMPACT_POINT["text"], star)
+    assert "- Situation: missing" in messages[0]
+    assert "- Result: present" in messages[0]
+    assert messages != point_rationale_user_messages("Experience", COMPACT_POINT["text"], {**star, "situation": True})
+
+
+def test_rationale_endpoint(analyzer):
+    """Test the follow-up endpoint for a single point."""
+    app.dependency_overrides[get_resume_analyzer] = lambda: analyzer
+    try:
+        client = TestClient(app)
+        response = client.post("/api/resume/analyze", json={"resume_text": RESUME, "analysis_mode": "compact"})
+        assert response.status_code == 200
+        analysis_id = response.json()["analysisId"]
+
+        response = client.get(f"/api/resume/analysis/{analysis_id}/sections/0/points/0/rationale")
+        assert response.status_code == 200
+        assert response.json()["star"]["action_rationale"] == STAR_RATIONALE["action_rationale"]
+
+        response = client.get("/api/resume/analysis/unknown/sections/0/points/0/rationale")
+        assert response.status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
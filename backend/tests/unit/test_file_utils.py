@@ -0,0 +1,80 @@
+import io
+import zipfile
+import pytest
+from fastapi import UploadFile
+from reportlab.pdfgen import canvas
+from app.utils.file_utils import (
+    FileTooLargeError,
+    detect_file_type,
+    extract_text_from_pdf,
+    save_upload_to_file
+)
+
+
+def _write_pdf(path, pages: int) -> None:
+    """Write a simple PDF with the given number of pages."""
+    pdf = canvas.Canvas(str(path))
+    for i in range(pages):
+        pdf.drawString(100, 750, f"Page {i + 1}")
+        pdf.showPage()
+    pdf.save()
+
+
+@pytest.mark.asyncio
+async def test_save_upload_streams_within_limit(tmp_path):
+    """Test that uploads under the limit are copied in full."""
+    upload = UploadFile(file=io.BytesIO(b"x" * 1000), filename="resume.pdf")
+    destination = tmp_path / "upload.bin"
+    with open(destination, "wb") as out:
+        written = await save_upload_to_file(upload, out, max_bytes=2000, chunk_size=128)
+    assert written == 1000
+    assert destination.read_bytes() == b"x" * 1000
+
+
+@pytest.mark.asyncio
+async def test_save_upload_aborts_past_limit(tmp_path):
+    """Test that streaming stops as soon as the byte limit is exceeded."""
+    upload = UploadFile(file=io.BytesIO(b"x" * 5000), filename="resume.pdf")
+    destination = tmp_path / "upload.bin"
+    with open(destination, "wb") as out:
+        with pytest.raises(FileTooLargeError):
+            await save_upload_to_file(upload, out, max_bytes=1000, chunk_size=256)
+    assert destination.stat().st_size <= 1000
+
+
+def test_detect_file_type_ignores_suffix(tmp_path):
+    """Test that file type comes from magic bytes, not the file name."""
+    pdf_path = tmp_path / "resume.docx"
+    _write_pdf(pdf_path, pages=1)
+    assert detect_file_type(str(pdf_path)) == "pdf"
+
+    docx_path = tmp_path / "resume.pdf"
+    with zipfile.ZipFile(docx_path, "w") as archive:
+        archive.writestr("word/document.xml", "<w:document/>")
+    assert detect_file_type(str(docx_path)) == "docx"
+
+    text_path = tmp_path / "resume.pdf"
+    text_path.write_bytes(b"Just some text pretending to be a PDF")
+    assert detect_file_type(str(text_path)) is None
+
+
+def test_detect_file_type_rejects_plain_zip(tmp_path):
+    """Test that a zip archive without a Word document is not accepted as DOCX."""
+    zip_path = tmp_path / "resume.docx"
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        archive.writestr("notes.txt", "hello")
+    assert detect_file_type(str(zip_path)) is None
+
+
+def test_extract_text_from_pdf_page_limit(tmp_path):
+    """Test that PDFs over the page limit are rejected before text extraction."""
+    pdf_path = tmp_path / "resume.pdf"
+    _write_pdf(pdf_path, pages=3)
+
+    assert "Page 3" in extract_text_from_pdf(str(pdf_path), max_pages=3)
+    with pytest.raises(FileTooLargeError):
+        extract_text_from_pdf(str(pdf_path), max_pages=2)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
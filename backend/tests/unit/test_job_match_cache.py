@@ -0,0 +1,84 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.services.cache import InMemoryCache, make_namespaced_key
+from app.services.openai_service import OpenAIService
+
+REQUIREMENTS = {
+    "required_skills": ["Python", "PostgreSQL"],
+    "preferred_skills": ["Kubernetes"],
+    "required_years": 5,
+    "experience_level": "Senior",
+    "domain_expertise": ["Payments"],
+    "project_scale": "High traffic services",
+    "soft_skills": ["Mentoring"],
+    "qualifications": []
+}
+
+MATCH = {
+    "match_score": 80,
+    "technical_match": {"matched_skills": ["Python"], "missing_skills": ["Kubernetes"], "skill_coverage_score": 66},
+    "experience_match": {"required_years": 5, "actual_years": 6, "experience_score": 90},
+    "key_requirements": {"met": ["Python"], "partially_met": [], "not_met": ["Kubernetes"]},
+    "recommendations": ["Mention container experience"]
+}
+
+
+@pytest.fixture
+def service(tool_call_response):
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(side_effect=[
+        tool_call_response({**MATCH, "job_requirements": REQUIREMENTS}),
+        tool_call_response(MATCH)
+    ])
+    service = OpenAIService(client)
+    service.cache = InMemoryCache()
+    return service
+
+
+def test_make_namespaced_key():
+    """Test that keys are namespaced and depend on every part and its position."""
+    key = make_namespaced_key("job_match", "resume", "job")
+    assert key.startswith("job_match:")
+    assert key == make_namespaced_key("job_match", "resume", "job")
+    assert key != make_namespaced_key("job_match", "job", "resume")
+    assert key != make_namespaced_key("job_match", "resumejob")
+    assert key != make_namespaced_key("job_requirements", "resume", "job")
+
+
+@pytest.mark.asyncio
+async def test_requirements_are_extracted_once_per_job(service):
+    """Test that the first match caches the job's requirements for later matches."""
+    create = service.client.chat.completions.create
+
+    first = await service.analyze_job_match("Resume A", "Senior Python engineer")
+    assert first["content"] == MATCH
+    assert service.get_job_requirements("Senior Python engineer") == REQUIREMENTS
+    first_request = create.call_args.kwargs
+    assert "job_requirements" in first_request["tools"][0]["function"]["parameters"]["properties"]
+
+    second = await service.analyze_job_match("Resume B", "Senior Python engineer")
+    assert second["content"] == MATCH
+    second_request = create.call_args.kwargs
+    assert "job_requirements" not in second_request["tools"][0]["function"]["parameters"]["properties"]
+
+    # Cached requirements never replace the job description, so the input does not depend on match order
+    assert first_request["messages"][1]["content"] == "Job Description:\nSenior Python engineer"
+    assert second_request["messages"][1] == first_request["messages"][1]
+
+
+@pytest.mark.asyncio
+async def test_repeated_match_is_served_from_cache(service):
+    """Test that the same resume and job are only matched once per model."""
+    create = service.client.chat.completions.create
+
+    first = await service.analyze_job_match("Resume A", "Senior Python engineer")
+    again = await service.analyze_job_match("Resume A", "Senior Python engineer")
+    assert again == first
+    assert create.await_count == 1
+
+    await service.analyze_job_match("Resume A", "Senior Python engineer", model="other-model")
+    assert create.await_count == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
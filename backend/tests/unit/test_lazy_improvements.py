@@ -0,0 +1,192 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+import tenacity
+from fastapi.testclient import TestClient
+from app.main import app
+from app.dependencies import get_resume_analyzer
+from app.services import openai_service
+from app.services.cache import InMemoryCache
+from app.services.openai_service import (
+    RESUME_ANALYSIS_WITHOUT_IMPROVEMENTS_FUNCTIONS,
+    OpenAIService
+)
+from app.services.resume_analyzer import ResumeAnalyzer
+
+RESUME = """Jane Doe
+EXPERIENCE
+- Reduced API latency by adding a read-through cache
+"""
+
+STAR = {
+    "situation": False,
+    "situation_rationale": "No context for the change is given",
+    "action": True,
+    "action_rationale": "Adding a read-through cache is a concrete action",
+    "result": False,
+    "result_rationale": "The latency reduction is not quantified",
+    "complete": False
+}
+
+POINT = {
+    "text": "Reduced API latency by adding a read-through cache",
+    "star": STAR,
+    "metrics": [],
+    "technical_score": 3
+}
+
+TOKEN_USAGE = {"total_tokens": 10, "prompt_tokens": 8, "completion_tokens": 2, "total_cost": 0.001}
+
+
+async def _fake_stream(*chunks):
+    """Stand-in for a streamed chat completion."""
+    for chunk in chunks:
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))])
+
+
+async def _single_chunk(text):
+    yield text
+
+
+async def _failing_stream(error):
+    raise error
+    yield
+
+
+def test_schema_without_improvements():
+    """Test that improvements can be dropped from the required output."""
+    parameters = RESUME_ANALYSIS_WITHOUT_IMPROVEMENTS_FUNCTIONS[0]["parameters"]
+    point = parameters["$defs"]["ResumePointWithoutImprovement"]
+    assert point["required"] == ["text", "star", "metrics", "technical_score"]
+
+
+@pytest.mark.asyncio
+async def test_stream_improvement_is_cached():
+    """Test that a streamed improvement is cached once complete."""
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(
+        return_value=_fake_stream("Cut API latency ", "by [X%] ", None, "with a read-through cache")
+    )
+    service = OpenAIService(client)
+    service.cache = InMemoryCache()
+
+    first = [chunk async for chunk in service.stream_improvement("Experience", POINT["text"], STAR)]
+    assert "".join(first) == "Cut API latency by [X%] with a read-through cache"
+
+    request = client.chat.completions.create.call_args.kwargs
+    assert request["stream"] is True
+    assert "- Situation: missing (No context for the change is given)" in request["messages"][1]["content"]
+
+    second = [chunk async for chunk in service.stream_improvement("Experience", POINT["text"], STAR)]
+    assert second == ["".join(first)]
+    assert client.chat.completions.create.await_count == 1
+
+
+def test_improvement_endpoint_streams_on_demand():
+    """Test that analyses can skip improvements and fetch them per point later."""
+    analyzer = ResumeAnalyzer()
+    analyzer.openai_service.cache = InMemoryCache()
+    analyzer.openai_service.analyze_resume_content = AsyncMock(return_value={
+        "status": "success",
+        "content": {"sections": [{"type": "Experience", "points": [POINT]}]},
+        "token_usage": TOKEN_USAGE
+    })
+    analyzer.openai_service.stream_improvement = MagicMock(
+        side_effect=lambda *args: _single_chunk("Cut latency by [X%]")
+    )
+    app.dependency_overrides[get_resume_analyzer] = lambda: analyzer
+    try:
+        client = TestClient(app)
+        response = client.post(
+            "/api/resume/analyze",
+            json={"resume_text": RESUME, "include_improvements": False}
+        )
+        assert response.status_code == 200
+        call = analyzer.openai_service.analyze_resume_content.call_args
+        assert call.kwargs["include_improvements"] is False
+        analysis_id = response.json()["analysisId"]
+
+        response = client.get(f"/api/resume/analysis/{analysis_id}/sections/0/points/0/improvement")
+        assert response.status_code == 200
+        assert response.text == "Cut latency by [X%]"
+        analyzer.openai_service.stream_improvement.assert_called_once_with("Experience", POINT["text"], STAR)
+
+        response = client.get(f"/api/resume/analysis/{analysis_id}/sections/0/points/3/improvement")
+        assert response.status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_stream_improvement_retries_and_records_usage(monkeypatch):
+    """Test that a failed stream is retried before the first chunk and that the final usage chunk is read."""
+    monkeypatch.setattr(openai_service, "RETRY_WAIT", tenacity.wait_none())
+    usage = SimpleNamespace(total_tokens=30, prompt_tokens=20, completion_tokens=10, prompt_tokens_details=None)
+    chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="Cut latency"))])]
+    chunks.append(SimpleNamespace(choices=[], usage=usage.__dict__))
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(side_effect=[ConnectionError("reset"), stream()])
+    service = OpenAIService(client)
+    service.cache = InMemoryCache()
+    recorded = MagicMock()
+    monkeypatch.setattr(openai_service.metrics, "record_llm_call", recorded)
+
+    assert [chunk async for chunk in service.stream_improvement("Experience", POINT["text"], STAR)] == ["Cut latency"]
+    assert client.chat.completions.create.await_count == 2
+    request = client.chat.completions.create.call_args.kwargs
+    assert request["extra_body"] == {"stream_options": {"include_usage": True}}
+    token_usage = recorded.call_args.args[3]
+    assert token_usage["prompt_tokens"] == 20
+    assert token_usage["completion_tokens"] == 10
+
+
+def test_improvement_endpoint_fails_before_streaming():
+    """Test that an LLM failure before the first chunk is an error status, not a truncated 200."""
+    analyzer = ResumeAnalyzer()
+    analyzer.openai_service.cache = InMemoryCache()
+    analyzer.openai_service.analyze_resume_content = AsyncMock(return_value={
+        "status": "success",
+        "content": {"sections": [{"type": "Experience", "points": [POINT]}]},
+        "token_usage": TOKEN_USAGE
+    })
+    analyzer.openai_service.stream_improvement = MagicMock(
+        side_effect=lambda *args: _failing_stream(RuntimeError("upstream down"))
+    )
+    app.dependency_overrides[get_resume_analyzer] = lambda: analyzer
+    try:
+        client = TestClient(app)
+        response = client.post("/api/resume/analyze", json={"resume_text": RESUME, "include_improvements": False})
+        analysis_id = response.json()["analysisId"]
+
+        response = client.get(f"/api/resume/analysis/{analysis_id}/sections/0/points/0/improvement")
+        assert response.status_code == 502
+        assert "upstream down" in response.json()["detail"]
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_existing_improvement_is_returned_without_a_call():
+    """Test that improvements already in the analysis are not regenerated."""
+    analyzer = ResumeAnalyzer()
+    analyzer.openai_service.cache = InMemoryCache()
+    analyzer.openai_service.analyze_resume_content = AsyncMock(return_value={
+        "status": "success",
+        "content": {"sections": [{"type": "Experience", "points": [{**POINT, "improvement": "Rewritten"}]}]},
+        "token_usage": TOKEN_USAGE
+    })
+    analyzer.openai_service.stream_improvement = MagicMock()
+
+    result = await analyzer.analyze_resume(RESUME)
+    chunks = await analyzer.improve_point(result["analysisId"], 0, 0)
+    assert [chunk async for chunk in chunks] == ["Rewritten"]
+    analyzer.openai_service.stream_improvement.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,103 @@
+import itertools
+import httpx
+import pytest
+from benchmarks.loadtest import (
+    WARMUP_REQUESTS,
+    LoadStep,
+    histogram_quantile,
+    loop_lag,
+    request_sender,
+    saturation_step,
+    synchronous_time,
+    warm_up
+)
+from benchmarks.stats import ScenarioResult
+
+LAG = "resume_event_loop_lag_seconds"
+STAGE = "resume_analysis_stage_duration_seconds_sum"
+CACHE = "resume_cache_operation_duration_seconds_sum"
+
+
+def _labels(**labels):
+    return frozenset(labels.items())
+
+
+def _step(concurrency, throughput, seconds=10.0):
+    result = ScenarioResult(name=f"c={concurrency}", concurrency=concurrency, seconds=seconds)
+    result.latencies = [0.5] * int(throughput * seconds)
+    return LoadStep(result=result)
+
+
+def test_histogram_quantile_interpolates_within_buckets():
+    """Test quantiles from cumulative buckets, and the +Inf bucket falling back to the last bound."""
+    buckets = [(0.01, 50.0), (0.1, 90.0), (1.0, 100.0), (float("inf"), 100.0)]
+    assert histogram_quantile(0.5, buckets) == pytest.approx(0.01)
+    assert histogram_quantile(0.7, buckets) == pytest.approx(0.055)
+    assert histogram_quantile(0.99, [(0.1, 0.0), (float("inf"), 10.0)]) == 0.1
+    assert histogram_quantile(0.99, []) == 0.0
+
+
+def test_lag_and_synchronous_time_between_scrapes():
+    """Test that only what happened between two scrapes is reported, per request."""
+    before = {
+        (f"{LAG}_count", _labels()): 10.0,
+        (f"{LAG}_sum", _labels()): 0.01,
+        (f"{LAG}_bucket", _labels(le="0.001")): 10.0,
+        (f"{LAG}_bucket", _labels(le="0.1")): 10.0,
+        (f"{LAG}_bucket", _labels(le="+Inf")): 10.0,
+        (STAGE, _labels(stage="extract")): 1.0
+    }
+    after = {
+        (f"{LAG}_count", _labels()): 20.0,
+        (f"{LAG}_sum", _labels()): 0.21,
+        (f"{LAG}_bucket", _labels(le="0.001")): 10.0,
+        (f"{LAG}_bucket", _labels(le="0.1")): 20.0,
+        (f"{LAG}_bucket", _labels(le="+Inf")): 20.0,
+        (STAGE, _labels(stage="extract")): 3.0,
+        (STAGE, _labels(stage="analyze")): 50.0,
+        (CACHE, _labels(backend="redis", operation="get")): 0.5
+    }
+    lag = loop_lag(before, after)
+    assert lag["mean"] == pytest.approx(20.0)
+    assert lag["p99"] == pytest.approx(99.01)
+
+    per_request = synchronous_time(before, after, requests=100)
+    assert per_request == {
+        "PDF/DOCX text extraction": pytest.approx(20.0),
+        "Cache get (redis)": pytest.approx(5.0)
+    }
+
+
+def test_saturation_is_where_throughput_stops_scaling():
+    """Test that the level before throughput flattens is reported."""
+    assert saturation_step([_step(1, 2), _step(2, 4), _step(4, 4.2), _step(8, 4.1)]).result.concurrency == 2
+    assert saturation_step([_step(1, 2), _step(2, 4)]) is None
+
+
+@pytest.mark.asyncio
+async def test_warm_up_sends_a_fixed_number_of_requests():
+    """Test that the warm-up reaches every endpoint and does not stop at failed requests."""
+    paths = []
+
+    def handle(request):
+        paths.append(request.url.path)
+        return httpx.Response(500 if len(paths) == 1 else 200)
+
+    ids = itertools.count()
+    async with httpx.AsyncClient(base_url="http://worker", transport=httpx.MockTransport(handle)) as client:
+        await warm_up(client, request_sender("analyze"), ids, requests=1)
+        await warm_up(client, request_sender("both"), ids)
+    assert len(paths) == 1 + WARMUP_REQUESTS
+    assert set(paths) == {"/api/resume/analyze", "/api/resume/analyze/file"}
+    assert next(ids) == 1 + WARMUP_REQUESTS
+
+
+def test_loop_share():
+    """Test the share of wall time a synchronous source takes."""
+    step = _step(4, 10.0)
+    step.synchronous_ms = {"PDF/DOCX text extraction": 50.0}
+    assert step.loop_share("PDF/DOCX text extraction") == pytest.approx(0.5)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,118 @@
+import httpx
+import io
+import json
+import logging
+import pytest
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+from openai import APIConnectionError
+from app import main
+from app.core.logging_config import HOT_PATH_LOGGERS, SamplingFilter, configure_logging, stop_logging
+
+
+class CountingArgument:
+    """Log argument that counts how often it is formatted."""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "argument"
+
+
+@pytest.fixture
+def stream():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    stream = io.StringIO()
+    configure_logging(level="INFO", log_format="json", sample_rate=0.0, stream=stream)
+    yield stream
+    # Put back the logging the test run started with
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+    for name in HOT_PATH_LOGGERS:
+        hot_logger = logging.getLogger(name)
+        hot_logger.filters[:] = [f for f in hot_logger.filters if not isinstance(f, SamplingFilter)]
+
+
+def _lines(stream):
+    stop_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_json_with_extra_fields(stream):
+    """Test that records are written as JSON with their extra fields and traceback."""
+    logger = logging.getLogger("app.test")
+    logger.info("Analysis %s done", "abc", extra={"duration_ms": 12})
+    try:
+        raise ValueError("Bad input")
+    except ValueError:
+        logger.error("Failed", exc_info=True)
+
+    done, failed = _lines(stream)
+    assert done["message"] == "Analysis abc done"
+    assert done["level"] == "INFO"
+    assert done["logger"] == "app.test"
+    assert done["duration_ms"] == 12
+    assert "ValueError: Bad input" in failed["exception"]
+
+
+def test_filtered_records_are_not_formatted(stream):
+    """Test that arguments of records below the level are never formatted."""
+    argument = CountingArgument()
+    logging.getLogger("app.test").debug("Cache hit for %s", argument)
+    assert _lines(stream) == []
+    assert argument.formatted == 0
+
+
+def test_hot_path_records_are_sampled(stream):
+    """Test that hot-path records below WARNING are sampled but warnings always pass."""
+    logger = logging.getLogger("app.services.cache")
+    logger.info("Cache hit")
+    logger.warning("Cache unavailable")
+    assert [line["message"] for line in _lines(stream)] == ["Cache unavailable"]
+
+
+def test_logging_is_configured_on_startup(monkeypatch):
+    """Test that logging is configured when the app starts, not when it is imported."""
+    configure = MagicMock()
+    monkeypatch.setattr(main, "configure_logging", configure)
+    with TestClient(main.app):
+        configure.assert_called_once_with()
+
+
+def test_only_unexpected_errors_log_tracebacks(stream):
+    """Test that the global handler logs LLM errors on one line and other errors with their traceback."""
+    @main.app.get("/test/errors/{kind}")
+    async def fail(kind: str):
+        if kind == "llm":
+            raise APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+        raise KeyError("sections")
+
+    client = TestClient(main.app, raise_server_exceptions=False)
+    try:
+        assert client.get("/test/errors/llm").status_code == 500
+        assert client.get("/test/errors/bug").status_code == 500
+    finally:
+        main.app.router.routes.pop()
+
+    llm, bug = [line for line in _lines(stream) if line["logger"] == "app.main"]
+    assert llm["message"] == "Global exception handler caught APIConnectionError: Connection error."
+    assert "exception" not in llm
+    assert llm["path"] == "/test/errors/llm"
+    assert "KeyError: 'sections'" in bug["exception"]
+
+
+def test_sampling_filter_rate():
+    """Test that a full rate passes everything and a zero rate only warnings."""
+    record = logging.LogRecord("app", logging.DEBUG, "", 0, "Cache hit", None, None)
+    assert SamplingFilter(1.0).filter(record)
+    assert not SamplingFilter(0.0).filter(record)
+    record.levelno = logging.ERROR
+    assert SamplingFilter(0.0).filter(record)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,173 @@
+import asyncio
+import time
+import pytest
+import tenacity
+from unittest.mock import AsyncMock, MagicMock
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from app.core import metrics
+from app.services import openai_service
+from app.main import app
+from app.services.analysis_store import InMemoryAnalysisStore
+from app.services.cache import InMemoryCache
+from app.services.openai_service import OpenAIService
+from app.services.resume_analyzer import ResumeAnalyzer
+
+MODEL = "metrics-test-model"
+
+MATCH = {
+    "match_score": 80,
+    "technical_match": {"matched_skills": ["Python"], "missing_skills": [], "skill_coverage_score": 100},
+    "experience_match": {"required_years": 5, "actual_years": 6, "experience_score": 90},
+    "key_requirements": {"met": ["Python"], "partially_met": [], "not_met": []},
+    "recommendations": []
+}
+
+REQUIREMENTS = {
+    "required_skills": ["Python"],
+    "preferred_skills": [],
+    "required_years": 5,
+    "experience_level": "Senior",
+    "domain_expertise": [],
+    "project_scale": "",
+    "soft_skills": [],
+    "qualifications": []
+}
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class ServerError(Exception):
+    status_code = 502
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+@pytest.mark.asyncio
+async def test_llm_calls_record_latency_tokens_and_cache_lookups(tool_call_response):
+    """Test LLM latency, tokens by kind and cache misses then hits."""
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(return_value=tool_call_response({**MATCH, "job_requirements": REQUIREMENTS}))
+    service = OpenAIService(client)
+    service.cache = InMemoryCache()
+
+    calls = _sample("resume_llm_request_duration_seconds_count", operation="analyze_job_match", model=MODEL)
+    prompt = _sample("resume_llm_tokens_total", model=MODEL, kind="prompt")
+    cached = _sample("resume_llm_tokens_total", model=MODEL, kind="cached_prompt")
+    hits = _sample("resume_cache_lookups_total", namespace="job_match", result="hit")
+
+    await service.analyze_job_match("resume", "job", model=MODEL)
+    await service.analyze_job_match("resume", "job", model=MODEL)
+
+    assert _sample("resume_llm_request_duration_seconds_count", operation="analyze_job_match", model=MODEL) == calls + 1
+    assert _sample("resume_llm_tokens_total", model=MODEL, kind="prompt") == prompt + 60
+    assert _sample("resume_llm_tokens_total", model=MODEL, kind="cached_prompt") == cached + 40
+    assert _sample("resume_cache_lookups_total", namespace="job_match", result="hit") == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limits_are_counted_apart(monkeypatch):
+    """Test that 429 responses are retried, then counted once with their own reason."""
+    monkeypatch.setattr(openai_service, "RETRY_WAIT", tenacity.wait_none())
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(side_effect=RateLimited("Too many requests"))
+    service = OpenAIService(client)
+    service.cache = InMemoryCache()
+
+    before = _sample("resume_llm_errors_total", operation="analyze_job_match", reason="rate_limited")
+    retries = _sample("resume_llm_retries_total", operation="analyze_job_match")
+    result = await service.analyze_job_match("resume", "job", model=MODEL)
+    assert result["status"] == "error"
+    assert client.chat.completions.create.await_count == 3
+    assert _sample("resume_llm_errors_total", operation="analyze_job_match", reason="rate_limited") == before + 1
+    assert _sample("resume_llm_retries_total", operation="analyze_job_match") == retries + 2
+
+
+@pytest.mark.asyncio
+async def test_only_transient_errors_are_retried(monkeypatch, tool_call_response):
+    """Test that timeouts and 5xx responses are retried and other errors are returned at once."""
+    monkeypatch.setattr(openai_service, "RETRY_WAIT", tenacity.wait_none())
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(side_effect=[
+        TimeoutError("Request timed out"),
+        ServerError("Bad gateway"),
+        tool_call_response({"sections": []})
+    ])
+    service = OpenAIService(client)
+    service.cache = InMemoryCache()
+
+    retries = _sample("resume_llm_retries_total", operation="analyze_resume_content")
+    result = await service.analyze_resume_content("resume", model=MODEL)
+    assert result["status"] == "success"
+    assert _sample("resume_llm_retries_total", operation="analyze_resume_content") == retries + 2
+
+    client.chat.completions.create = AsyncMock(side_effect=BadRequest("Invalid request"))
+    result = await service.explain_point("Experience", "Built a cache", {"complete": False}, model=MODEL)
+    assert result["status"] == "error"
+    assert client.chat.completions.create.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stages_are_recorded():
+    """Test that every stage of an analysis is observed."""
+    analyzer = ResumeAnalyzer(analysis_store=InMemoryAnalysisStore())
+    analyzer.openai_service.cache = InMemoryCache()
+    analyzer.openai_service.analyze_resume_content = AsyncMock(return_value={
+        "status": "success",
+        "content": {"sections": [{"type": "Experience", "points": []}]},
+        "token_usage": {"total_tokens": 10, "prompt_tokens": 8, "completion_tokens": 2, "total_cost": 0.001}
+    })
+    before = {
+        stage: _sample("resume_analysis_stage_duration_seconds_count", stage=stage)
+        for stage in analyzer.pipeline.stage_names
+    }
+    await analyzer.analyze_resume("Jane Doe\nEXPERIENCE\n- Built a cache")
+    for stage, count in before.items():
+        assert _sample("resume_analysis_stage_duration_seconds_count", stage=stage) == count + 1
+
+
+@pytest.mark.asyncio
+async def test_event_loop_lag_is_recorded():
+    """Test that a blocking call shows up as event loop lag."""
+    before = _sample("resume_event_loop_lag_seconds_sum")
+    monitor = asyncio.create_task(metrics.monitor_event_loop_lag(0.01))
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)  # Blocks the loop
+    await asyncio.sleep(0.02)
+    monitor.cancel()
+    assert _sample("resume_event_loop_lag_seconds_sum") - before >= 0.08
+
+
+def test_cache_operations_are_timed():
+    """Test that cache calls are timed by backend and operation."""
+    cache = InMemoryCache()
+    gets = _sample("resume_cache_operation_duration_seconds_count", backend="memory", operation="get")
+    sets = _sample("resume_cache_operation_duration_seconds_count", backend="memory", operation="set")
+    cache.set("timed:key", 1)
+    cache.get("timed:key")
+    cache.get("timed:missing")
+    assert _sample("resume_cache_operation_duration_seconds_count", backend="memory", operation="get") == gets + 2
+    assert _sample("resume_cache_operation_duration_seconds_count", backend="memory", operation="set") == sets + 1
+
+
+def test_metrics_endpoint():
+    """Test that requests are recorded by route template and served as Prometheus text."""
+    client = TestClient(app)
+    client.get("/api/resume/analysis/unknown-id")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/api/resume/analysis/{analysis_id}"' in response.text
+    assert "unknown-id" not in response.text
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,157 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.services.analysis_store import InMemoryAnalysisStore
+from app.services.cache import InMemoryCache
+from app.services.resume_analyzer import ResumeAnalyzer
+from app.services.resume_analyzer.processors.pre_analysis import analyze_point, pre_analyze_resume
+from app.services.resume_analyzer.utils.model_router import ModelRouter
+
+MODELS = {"small": "small-model", "large": "large-model"}
+
+RESUME = """Jane Doe
+EXPERIENCE
+- Reduced API latency by 35% by adding a read-through cache
+- Led the migration of the billing system to Kubernetes
+CERTIFICATIONS
+- AWS Certified Solutions Architect
+"""
+
+ROUTED_RESUME = """Jane Doe
+EXPERIENCE
+- Reduced API latency by 35% by adding a read-through cache
+PROJECTS
+- Led the migration of the billing system to Kubernetes
+CERTIFICATIONS
+- AWS Certified Solutions Architect
+SKILLS
+Python, Redis
+"""
+
+VALID_POINT = {
+    "text": "Reduced API latency by 35% by adding a read-through cache",
+    "star": {
+        "situation": False,
+        "situation_rationale": "No context for the change is given",
+        "action": True,
+        "action_rationale": "Adding a read-through cache is a concrete action",
+        "result": True,
+        "result_rationale": "Latency reduction of 35% is quantified",
+        "complete": False
+    },
+    "metrics": ["35%"],
+    "technical_score": 4,
+    "improvement": ""
+}
+
+
+def _analysis(sections):
+    return {
+        "status": "success",
+        "content": {"sections": sections},
+        "token_usage": {"total_tokens": 10, "prompt_tokens": 8, "completion_tokens": 2, "total_cost": 0.001}
+    }
+
+
+def test_route_by_section_type():
+    """Test that list-like sections go to the small model and the rest to the large one."""
+    router = ModelRouter(MODELS, small_model_max_tokens=1000)
+    assert router.route("Certifications", "AWS Certified") == "small-model"
+    assert router.route("ACHIEVEMENTS", "Hackathon winner") == "small-model"
+    assert router.route("EXPERIENCE", "Built things") == "large-model"
+    assert router.route("VOLUNTEERING", "Coached a team") == "large-model"
+    assert router.default_model == "large-model"
+
+
+def test_route_large_sections_to_large_model():
+    """Test that sections over the token limit skip the small model."""
+    router = ModelRouter(MODELS, small_model_max_tokens=5)
+    assert router.route("CERTIFICATIONS", "AWS Certified Solutions Architect, " * 20) == "large-model"
+
+
+def test_route_simple_sections_to_small_model():
+    """Test that short achievement sections whose points all show an action and a result use the small model."""
+    router = ModelRouter(MODELS, small_model_max_tokens=1000)
+    simple = [analyze_point("- Cut costs by 20% by rightsizing clusters")]
+    unclear = simple + [analyze_point("- Worked on the billing system")]
+    assert router.route("EXPERIENCE", "", simple) == "small-model"
+    assert router.route("PROJECTS", "", simple * 3) == "small-model"
+    assert router.route("PROJECTS", "", simple * 4) == "large-model"
+    assert router.route("EXPERIENCE", "", unclear) == "large-model"
+    assert router.route("EDUCATION", "", simple) == "large-model"
+    assert router.route("EXPERIENCE", "", []) == "large-model"
+
+
+def test_neutral_sections_join_other_calls():
+    """Test that the text before the first header never costs a call of its own."""
+    router = ModelRouter(MODELS, small_model_max_tokens=1000)
+    simple = "Jane Doe\nEXPERIENCE\n- Reduced API latency by 35% by adding a read-through cache\n"
+    groups = router.group_by_model(pre_analyze_resume(simple))
+    assert {model: [s.section_type for s in sections] for model, sections in groups.items()} == {
+        "small-model": ["GENERAL", "EXPERIENCE"]
+    }
+    groups = router.group_by_model(pre_analyze_resume(RESUME))
+    assert {model: [s.section_type for s in sections] for model, sections in groups.items()} == {
+        "large-model": ["GENERAL", "EXPERIENCE"], "small-model": ["CERTIFICATIONS"]
+    }
+    assert list(router.group_by_model(pre_analyze_resume("Jane Doe\nBuilt things\n"))) == ["large-model"]
+
+
+def test_escalate():
+    """Test escalation to the next tier and its end points."""
+    router = ModelRouter(MODELS)
+    assert router.escalate("small-model") == "large-model"
+    assert router.escalate("large-model") is None
+    assert router.escalate("unknown-model") is None
+    assert ModelRouter({"small": "same", "large": "same"}).escalate("same") is None
+
+
+@pytest.mark.asyncio
+async def test_analyzer_fans_out_and_escalates():
+    """Test that routed groups are analyzed separately and invalid small-model output is retried."""
+    analyzer = ResumeAnalyzer(model_router=ModelRouter(MODELS, small_model_max_tokens=1000))
+
+    async def analyze(text, hints=None, model=None, **options):
+        if model == "small-model":
+            return _analysis([{"type": "Certifications", "points": [{"text": "AWS"}]}])
+        if "CERTIFICATIONS" in text:
+            return _analysis([{"type": "Certifications", "points": []}])
+        return _analysis([{"type": "Experience", "points": [VALID_POINT]}])
+
+    analyzer.openai_service.analyze_resume_content = AsyncMock(side_effect=analyze)
+    result = await analyzer.analyze_resume(RESUME)
+
+    assert result["status"] == "success"
+    models = [call.kwargs["model"] for call in analyzer.openai_service.analyze_resume_content.call_args_list]
+    assert sorted(models) == ["large-model", "large-model", "small-model"]
+    assert [s["type"] for s in result["resumeAnalysis"]["sections"]] == ["Experience", "Certifications"]
+    assert result["tokenUsage"]["total_tokens"] == 30
+
+
+@pytest.mark.asyncio
+async def test_analyze_content_calls_routed_models(tool_call_response):
+    """Test which model each LLM-bound section is sent to, through the real OpenAI service."""
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(return_value=tool_call_response({"sections": []}))
+    analyzer = ResumeAnalyzer(
+        openai_client=client,
+        model_router=ModelRouter(MODELS, small_model_max_tokens=1000),
+        analysis_store=InMemoryAnalysisStore()
+    )
+    analyzer.openai_service.cache = InMemoryCache()
+
+    result = await analyzer.analyze_resume(ROUTED_RESUME)
+
+    assert result["status"] == "success"
+    sent = {
+        call.kwargs["model"]: call.kwargs["messages"][-1]["content"]
+        for call in client.chat.completions.create.await_args_list
+    }
+    assert sorted(sent) == ["large-model", "small-model"]
+    assert "CERTIFICATIONS" in sent["small-model"] and "read-through cache" in sent["small-model"]
+    assert "Jane Doe" in sent["large-model"] and "PROJECTS" in sent["large-model"]
+    assert "CERTIFICATIONS" not in sent["large-model"]
+    assert not any("Redis" in content for content in sent.values())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,184 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.core.config import settings
+from app.services.analysis_store import InMemoryAnalysisStore
+from app.services.cache import InMemoryCache
+from app.services.resume_analyzer import ResumeAnalyzer, pipeline
+from app.services.resume_analyzer.pipeline import AnalysisContext, Stage, default_pipeline, empty_token_usage
+from app.services.resume_analyzer.utils.recommendations import generate_section_recommendations
+
+RESUME = """Jane Doe
+EXPERIENCE
+- Reduced API latency by 35% by adding a read-through cache
+SKILLS
+Python, Redis
+"""
+
+POINT = {
+    "text": "Reduced API latency by 35% by adding a read-through cache",
+    "star": {
+        "situation": False, "situation_rationale": "No context",
+        "action": True, "action_rationale": "Added a cache",
+        "result": True, "result_rationale": "35% faster",
+        "complete": False
+    },
+    "metrics": ["35%"],
+    "technical_score": 2,
+    "improvement": "Cut p95 API latency by 35% for 2M daily requests by adding a Redis read-through cache"
+}
+
+EDUCATION_ENTRY = {
+    "text": "BSc Computer Science, State College, 2018",
+    "subject": "Computer Science",
+    "course": "BSc",
+    "school": "State College",
+    "subject_course_school_reputation": {
+        "domestic_score": 6, "domestic_score_rationale": "Regional",
+        "international_score": 4, "international_score_rationale": "Little known"
+    }
+}
+
+TOKEN_USAGE = {"total_tokens": 10, "prompt_tokens": 8, "completion_tokens": 2, "total_cost": 0.001}
+
+
+@pytest.fixture
+def analyzer():
+    analyzer = ResumeAnalyzer(analysis_store=InMemoryAnalysisStore())
+    analyzer.openai_service.cache = InMemoryCache()
+    analyzer.openai_service.analyze_resume_content = AsyncMock(return_value={
+        "status": "success",
+        "content": {"sections": [{"type": "Experience", "points": [POINT]}]},
+        "token_usage": TOKEN_USAGE
+    })
+    return analyzer
+
+
+def test_default_stage_order():
+    """Test the stages of a full analysis."""
+    assert default_pipeline().stage_names == [
+        "normalize", "load", "split", "analyze", "match", "score", "recommend", "validate", "store"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_analysis_is_scored_and_timed(analyzer):
+    """Test that analyses carry scores and recommendations and every stage is timed."""
+    ctx = AnalysisContext(resume_text=RESUME)
+    result = await analyzer.pipeline.run(analyzer, ctx)
+
+    assert result["status"] == "success"
+    assert result["scores"]["star_format"] == 0.0
+    assert result["scores"]["technical_depth"] == 2.0
+    assert [r["area"] for r in result["recommendations"]] == ["STAR Format", "Technical Depth"]
+    assert result["tokenUsage"]["total_tokens"] == 10
+    assert list(ctx.timings) == analyzer.pipeline.stage_names
+
+
+@pytest.mark.asyncio
+async def test_stored_analysis_skips_later_stages(analyzer):
+    """Test that the load stage ends analyses already on record."""
+    first = await analyzer.analyze_resume(RESUME)
+    ctx = AnalysisContext(resume_text=RESUME)
+    stored = await analyzer.pipeline.run(analyzer, ctx)
+    assert stored == {**first, "tokenUsage": empty_token_usage()}
+    assert list(ctx.timings) == ["normalize", "load"]
+    assert analyzer.openai_service.analyze_resume_content.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_stages_can_be_swapped(analyzer):
+    """Test that a stage is replaced by name and unknown names are rejected."""
+    class NoRecommendations(Stage):
+        name = "recommend"
+
+        async def run(self, analyzer, ctx):
+            ctx.recommendations = []
+
+    analyzer.pipeline = analyzer.pipeline.replace("recommend", NoRecommendations())
+    result = await analyzer.analyze_resume(RESUME)
+    assert result["recommendations"] == []
+    with pytest.raises(KeyError):
+        analyzer.pipeline.replace("missing", NoRecommendations())
+
+
+@pytest.mark.asyncio
+async def test_education_entries_are_scored(analyzer):
+    """Test that reputations the LLM gives per education entry count in scores and recommendations."""
+    analyzer.openai_service.analyze_resume_content.return_value = {
+        "status": "success",
+        "content": {"sections": [
+            {"type": "Experience", "points": [POINT]},
+            {"type": "Education", "points": [EDUCATION_ENTRY]}
+        ]},
+        "token_usage": TOKEN_USAGE
+    }
+    result = await analyzer.analyze_resume(RESUME)
+
+    assert result["scores"]["education_quality"] == 5.0
+    assert result["scores"]["overall"] == round((0.0 + 2.5 + 2.0 + 5.0) / 4, 2)
+    assert result["recommendations"][-1]["area"] == "Education Quality"
+
+
+@pytest.mark.asyncio
+async def test_invalid_scores_are_not_stored(analyzer):
+    """Test that scores and recommendations are validated with the rest of the response."""
+    class BadScores(Stage):
+        name = "score"
+
+        async def run(self, analyzer, ctx):
+            ctx.scores = {"overall": "high"}
+
+    analyzer.pipeline = analyzer.pipeline.replace("score", BadScores())
+    ctx = AnalysisContext(resume_text=RESUME)
+    result = await analyzer.pipeline.run(analyzer, ctx)
+    assert result["scores"] == {"overall": "high"}
+    assert "store" not in ctx.timings
+    assert await analyzer._load_record(ctx.analysis_id) is None
+
+
+@pytest.mark.asyncio
+async def test_oversized_prompts_are_rejected_before_calls(analyzer, monkeypatch):
+    """Test that analyses are sized before the LLM is called and rejected over the limit."""
+    monkeypatch.setattr(settings, "MAX_PROMPT_TOKENS", 50)
+    result = await analyzer.analyze_resume(RESUME + "- Led a migration\n" * 200)
+    assert result["status"] == "error"
+    assert "too long" in result["message"]
+    analyzer.openai_service.analyze_resume_content.assert_not_awaited()
+
+    monkeypatch.setattr(settings, "MAX_PROMPT_TOKENS", 0)
+    assert (await analyzer.analyze_resume(RESUME))["status"] == "success"
+
+
+@pytest.mark.asyncio
+async def test_split_stage_is_cached(analyzer):
+    """Test that the local pre-analysis of a resume is reused by other analyses of it."""
+    with patch.object(pipeline, "pre_analyze_resume", wraps=pipeline.pre_analyze_resume) as pre_analyze:
+        await analyzer.analyze_resume(RESUME)
+        analyzer.analysis_store.clear()
+        result = await analyzer.analyze_resume(RESUME)
+    assert result["status"] == "success"
+    assert pre_analyze.call_count == 1
+
+
+def test_section_recommendations_tolerate_odd_points():
+    """Test education entries, compact points and malformed points."""
+    sections = [
+        {"type": "Education", "points": [{
+            "school": "State College",
+            "subject_course_school_reputation": {
+                "domestic_score": 5, "international_score": 4,
+                "domestic_score_rationale": "Regional", "international_score_rationale": "Little known"
+            }
+        }]},
+        {"type": "Projects", "points": [
+            {"text": "Built a CLI", "star": {"complete": True}, "metrics": ["2x"], "technical_score": "n/a"},
+            "not a point"
+        ]}
+    ]
+    recommendations = generate_section_recommendations(sections)
+    assert [r["area"] for r in recommendations] == ["Technical Depth", "Education Quality"]
+    assert recommendations[1]["examples"][0].startswith("State College (Current Score: 4.5/10")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
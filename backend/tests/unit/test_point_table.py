@@ -0,0 +1,144 @@
+import json
+import random
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.services.cache import InMemoryCache
+from app.services.resume_analyzer import ResumeAnalyzer, _analysis_cache_key
+from app.services.resume_analyzer.utils.batch_scoring import build_score_table, resume_scores, section_scores
+from app.services.resume_analyzer.utils.point_table import PointTable
+
+EDUCATION_ENTRY = {
+    "text": "BS Computer Science, MIT, 2018",
+    "subject": "Computer Science",
+    "course": "BS",
+    "school": "MIT",
+    "subject_course_school_reputation": {"domestic_score": 10, "international_score": 9}
+}
+
+
+def _point(rng, compact=False, improvement=True):
+    star = {flag: rng.random() < 0.5 for flag in ("situation", "action", "result", "complete")}
+    if not compact:
+        star = {
+            "situation": star["situation"], "situation_rationale": "context given",
+            "action": star["action"], "action_rationale": "clear action",
+            "result": star["result"], "result_rationale": "measured outcome",
+            "complete": star["complete"]
+        }
+    point = {
+        "text": f"Point {rng.random()}",
+        "star": star,
+        "metrics": ["35%", "$2M"][:rng.randint(0, 2)],
+        "technical_score": rng.choice([0, 3, 4.5])
+    }
+    if improvement and not compact:
+        point["improvement"] = "Better point"
+    return point
+
+
+def _analysis(rng):
+    compact = rng.random() < 0.3
+    sections = [
+        {"type": "Experience", "points": [_point(rng, compact, rng.random() < 0.5) for _ in range(rng.randint(0, 5))]},
+        {"type": "Education", "points": [EDUCATION_ENTRY]},
+        {"type": "Projects", "points": [_point(rng, compact) for _ in range(rng.randint(0, 3))]}
+    ]
+    return {"sections": sections}
+
+
+def test_round_trip():
+    """Test that sections survive conversion to columns, JSON and back unchanged."""
+    rng = random.Random(3)
+    for _ in range(50):
+        analysis = _analysis(rng)
+        table = PointTable.from_sections(analysis["sections"])
+        assert table.to_sections() == analysis["sections"]
+        restored = PointTable.from_columns(json.loads(json.dumps(table.to_columns())))
+        assert json.dumps(restored.to_sections()) == json.dumps(analysis["sections"])
+
+
+def test_unusual_points_are_kept_raw():
+    """Test that points with unexpected fields or types round-trip as they are."""
+    sections = [{"type": "Experience", "note": "extra", "points": [
+        {"text": "x", "star": {"complete": "yes"}, "metrics": [], "technical_score": 1},
+        {"text": "y", "star": None, "metrics": [1], "technical_score": True},
+        "not a point"
+    ]}]
+    table = PointTable.from_sections(sections)
+    assert sorted(table.raw_points) == [0, 1, 2]
+    assert table.to_sections() == sections
+
+
+def test_columns_are_smaller_than_nested_json():
+    """Test that the column form does not repeat keys per point."""
+    rng = random.Random(5)
+    sections = {"sections": [{"type": "Experience", "points": [_point(rng) for _ in range(30)]}]}
+    columns = PointTable.from_sections(sections["sections"]).to_columns()
+    assert len(json.dumps(columns)) < 0.8 * len(json.dumps(sections))
+
+
+def test_point_lookup():
+    """Test single points are rebuilt and out of range lookups raise."""
+    rng = random.Random(9)
+    analysis = _analysis(rng)
+    table = PointTable.from_sections(analysis["sections"])
+    assert table.point(1, 0) == EDUCATION_ENTRY
+    for section_index, section in enumerate(analysis["sections"]):
+        for point_index, point in enumerate(section["points"]):
+            assert table.point(section_index, point_index) == point
+    with pytest.raises(IndexError):
+        table.point(1, 1)
+    with pytest.raises(IndexError):
+        table.point(3, 0)
+
+
+def test_scoring_reads_tables_like_dicts():
+    """Test that scores from tables equal scores from the nested dicts, list-only sections left out."""
+    rng = random.Random(11)
+    analyses = [_analysis(rng) for _ in range(100)]
+    for analysis in analyses[::3]:
+        analysis["sections"].append({"type": "Skills", "points": [_point(rng)]})
+    tables = [PointTable.from_sections(analysis["sections"]) for analysis in analyses]
+    mixed = [table if i % 2 else analysis for i, (table, analysis) in enumerate(zip(tables, analyses))]
+
+    expected = build_score_table(analyses, exclude_types={"SKILLS"})
+    for inputs in (tables, mixed):
+        score_table = build_score_table(inputs, exclude_types={"SKILLS"})
+        assert resume_scores(score_table) == resume_scores(expected)
+        assert section_scores(score_table) == section_scores(expected)
+    assert "Skills" not in expected.section_type
+
+
+@pytest.mark.asyncio
+async def test_analyzer_caches_columns():
+    """Test that analyses are cached in column form and points are served from it."""
+    rng = random.Random(13)
+    point = _point(rng)
+    analyzer = ResumeAnalyzer()
+    analyzer.openai_service.cache = InMemoryCache()
+    analyzer.openai_service.analyze_resume_content = AsyncMock(return_value={
+        "status": "success",
+        "content": {"sections": [{"type": "Experience", "points": [point]}]},
+        "token_usage": {"total_tokens": 10, "prompt_tokens": 8, "completion_tokens": 2, "total_cost": 0.001}
+    })
+
+    result = await analyzer.analyze_resume("Jane Doe\nEXPERIENCE\n- Built a cache")
+    cached = analyzer.openai_service.cache.get(_analysis_cache_key(result["analysisId"]))
+    assert "sections" not in cached
+    with patch.object(PointTable, "from_stored") as from_stored, \
+            patch.object(PointTable, "from_sections") as from_sections:
+        assert (await analyzer._get_point(result["analysisId"], 0, 0))["point"] == point
+        from_stored.assert_not_called()
+        from_sections.assert_not_called()
+
+    # Other workers sharing the cache build the table once
+    other = ResumeAnalyzer(analysis_store=analyzer.analysis_store)
+    other.openai_service.cache = analyzer.openai_service.cache
+    with patch.object(PointTable, "from_stored", wraps=PointTable.from_stored) as from_stored:
+        for _ in range(2):
+            assert (await other._get_point(result["analysisId"], 0, 0))["point"] == point
+        assert from_stored.call_count == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,70 @@
+import pytest
+from app.services.resume_analyzer.processors.pre_analysis import (
+    analyze_point,
+    build_llm_input,
+    build_local_sections,
+    extract_metrics,
+    pre_analyze_resume
+)
+
+SAMPLE_RESUME = """Jane Doe
+jane@example.com | +1 555 123 4567
+EXPERIENCE
+Senior Engineer at Acme, 2019 - 2023
+- Reduced API latency by 35% to address a legacy bottleneck
+- Led a team of 5 engineers
+SKILLS
+Python, Kubernetes, PostgreSQL
+"""
+
+
+def test_extract_metrics():
+    """Test that quantities are found and bare years are skipped."""
+    text = "Saved $1.2M in 6 months, cut costs by 35%, 3x faster, 10TB+ of data, since 2019"
+    assert extract_metrics(text) == ["$1.2M", "6 months", "35%", "3x", "10TB+"]
+
+
+def test_analyze_point_flags_star_candidates():
+    """Test that action verbs, situation cues and measured results are flagged."""
+    point = analyze_point("- Reduced API latency by 35% to address a legacy bottleneck")
+    assert point.text == "Reduced API latency by 35% to address a legacy bottleneck"
+    assert (point.situation, point.action, point.result) == (True, True, True)
+    assert point.complete
+
+    point = analyze_point("Responsible for the build system")
+    assert (point.situation, point.action, point.result) == (False, False, False)
+    assert point.metrics == []
+
+
+def test_skills_sections_skip_llm():
+    """Test that only listing sections are kept out of the LLM input."""
+    pre_analysis = pre_analyze_resume(SAMPLE_RESUME)
+    assert [(s.section_type, s.requires_llm) for s in pre_analysis] == [
+        ("GENERAL", True), ("EXPERIENCE", True), ("SKILLS", False)
+    ]
+
+    text, hints = build_llm_input(pre_analysis)
+    assert "EXPERIENCE" in text
+    assert "Kubernetes" not in text
+    assert hints.splitlines() == [
+        "- Reduced API latency by 35% to address a legacy bottleneck"
+        " | candidate STAR: situation, action, result | metrics: 35%",
+        "- Led a team of 5 engineers | candidate STAR: action | metrics: 5"
+    ]
+    # Contact details are not hinted as metrics
+    assert "555" not in hints
+
+
+def test_build_local_sections():
+    """Test that skipped sections are reported with the LLM output shape."""
+    sections = build_local_sections(pre_analyze_resume(SAMPLE_RESUME))
+    assert len(sections) == 1
+    assert sections[0]["type"] == "Skills"
+    point = sections[0]["points"][0]
+    assert point["text"] == "Python, Kubernetes, PostgreSQL"
+    assert point["star"]["complete"] is False
+    assert point["technical_score"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
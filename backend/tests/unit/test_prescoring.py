@@ -0,0 +1,84 @@
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock
+from app.services.cache import InMemoryCache
+from app.services.resume_analyzer import ResumeAnalyzer
+from app.services.resume_analyzer.utils.prescoring import (
+    prescore_resumes,
+    select_top_k,
+    skill_overlap,
+    tfidf_similarity,
+    tokenize
+)
+
+JOB_DESCRIPTION = "Senior backend engineer. Python and PostgreSQL required, Kubernetes is a plus."
+
+RESUMES = [
+    "Java developer building Spring services and Android apps",
+    "Backend engineer: Python, PostgreSQL and Kubernetes on AWS",
+    "Python data analyst using pandas and Excel"
+]
+
+REQUIREMENTS = {"required_skills": ["Python", "PostgreSQL"], "preferred_skills": ["Kubernetes"]}
+
+TOKEN_USAGE = {"total_tokens": 10, "prompt_tokens": 8, "completion_tokens": 2, "total_cost": 0.001}
+
+
+def test_tokenize_keeps_symbol_skills():
+    """Test that skills with inner symbols survive tokenization."""
+    assert tokenize("C++, C# and Node.js with CI/CD.") == ["c++", "c#", "node.js", "ci/cd"]
+
+
+def test_similarity_prefers_relevant_resumes():
+    """Test that the closest resume to the job scores highest."""
+    similarity = tfidf_similarity(RESUMES, JOB_DESCRIPTION)
+    assert similarity.shape == (3,)
+    assert int(np.argmax(similarity)) == 1
+    assert tfidf_similarity([], JOB_DESCRIPTION).shape == (0,)
+
+
+def test_skill_overlap_with_requirements():
+    """Test that required skills count fully and preferred skills half."""
+    overlap = skill_overlap(RESUMES, JOB_DESCRIPTION, REQUIREMENTS)
+    assert overlap.tolist() == pytest.approx([0.0, 1.0, 0.4])
+    # Skills match as whole words only
+    assert skill_overlap(["Pythonic code"], JOB_DESCRIPTION, REQUIREMENTS).tolist() == [0.0]
+
+
+def test_select_top_k():
+    """Test that the best scores come first and ties keep input order."""
+    scores = np.array([0.2, 0.9, 0.5, 0.9])
+    assert select_top_k(scores, 3) == [1, 3, 2]
+    assert select_top_k(scores, 10) == [1, 3, 2, 0]
+    assert select_top_k(scores, 0) == []
+
+
+@pytest.mark.asyncio
+async def test_rank_resumes_matches_only_top_k():
+    """Test that only the best pre-scored resumes are sent to the LLM."""
+    analyzer = ResumeAnalyzer()
+    analyzer.openai_service.cache = InMemoryCache()
+
+    async def analyze_job_match(resume_text, job_description, model=None, **options):
+        return {
+            "status": "success",
+            "content": {"match_score": 90 if "Kubernetes" in resume_text else 40},
+            "token_usage": TOKEN_USAGE
+        }
+
+    analyzer.openai_service.analyze_job_match = AsyncMock(side_effect=analyze_job_match)
+    result = await analyzer.rank_resumes(RESUMES, JOB_DESCRIPTION, top_k=2)
+
+    assert result["status"] == "success"
+    assert analyzer.openai_service.analyze_job_match.await_count == 2
+    matched = {call.args[0] for call in analyzer.openai_service.analyze_job_match.call_args_list}
+    assert RESUMES[0] not in matched
+    assert [ranking["index"] for ranking in result["rankings"]] == [1, 2, 0]
+    assert result["rankings"][2]["jobMatchAnalysis"] is None
+    assert result["tokenUsage"]["total_tokens"] == 20
+    scores = prescore_resumes(RESUMES, JOB_DESCRIPTION)
+    assert result["rankings"][2]["prescore"] == round(float(scores[0]), 4)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
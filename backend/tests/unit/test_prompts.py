@@ -0,0 +1,119 @@
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from app.core.config import settings
+from app.services.cache import InMemoryCache
+from app.services.openai_service import (
+    RESUME_ANALYSIS_FUNCTIONS,
+    OpenAIService,
+    _build_token_usage
+)
+from app.services.pricing import estimate_cost
+from app.services.prompts import (
+    PRE_ANALYSIS_HINTS_HEADER,
+    RESUME_ANALYSIS_SYSTEM_PROMPT,
+    build_chat_request,
+    job_match_user_messages,
+    resume_analysis_user_messages
+)
+
+
+def _static_prefix(request):
+    """Serialize everything that precedes the per-request content."""
+    return json.dumps([request["messages"][0], request["tools"], request["tool_choice"]])
+
+
+def test_static_prefix_is_byte_stable():
+    """Test that different resumes share an identical request prefix."""
+    requests = [
+        build_chat_request(
+            "gpt-4o", RESUME_ANALYSIS_SYSTEM_PROMPT, RESUME_ANALYSIS_FUNCTIONS,
+            "analyze_resume_section", resume_analysis_user_messages(text)
+        )
+        for text in ("EXPERIENCE\n- Built things", "PROJECTS\n- Built other things")
+    ]
+    assert _static_prefix(requests[0]) == _static_prefix(requests[1])
+    assert [m["role"] for m in requests[0]["messages"]] == ["system", "user"]
+
+
+def test_variable_content_comes_last():
+    """Test that hints follow the resume and the job description precedes the resume."""
+    [content] = resume_analysis_user_messages("EXPERIENCE", hints="- Led | metrics: 5")
+    assert content == f"EXPERIENCE\n\n{PRE_ANALYSIS_HINTS_HEADER}\n- Led | metrics: 5"
+
+    assert job_match_user_messages("my resume", "the job") == [
+        "Job Description:\nthe job", "Resume:\nmy resume"
+    ]
+
+
+@pytest.mark.parametrize("details", [
+    {"cached_tokens": 1024},
+    SimpleNamespace(cached_tokens=1024)
+])
+def test_build_token_usage_records_cached_tokens(details):
+    """Test that cached prompt tokens are reported and billed at the cached rate."""
+    usage = SimpleNamespace(
+        total_tokens=2100, prompt_tokens=2000, completion_tokens=100,
+        prompt_tokens_details=details
+    )
+    token_usage = _build_token_usage(usage, "unknown-model")
+    assert token_usage["cached_tokens"] == 1024
+    assert token_usage["total_cost"] == pytest.approx((
+        976 * settings.COST_PER_INPUT_TOKEN
+        + 1024 * settings.COST_PER_CACHED_INPUT_TOKEN
+        + 100 * settings.COST_PER_OUTPUT_TOKEN
+    ) / 1000)
+
+
+def test_token_usage_is_priced_by_served_model():
+    """Test that calls are priced for the model that served them."""
+    usage = SimpleNamespace(
+        total_tokens=2000, prompt_tokens=1000, completion_tokens=1000,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=0)
+    )
+    assert _build_token_usage(usage, "gpt-4o-2024-08-06")["total_cost"] == pytest.approx(0.0125)
+    assert _build_token_usage(usage, "gpt-4o-mini-2024-07-18")["total_cost"] == pytest.approx(0.00075)
+    assert estimate_cost(1000, 0, "gpt-4o-2024-08-06", cached_tokens=1000) == pytest.approx(0.00125)
+
+
+@pytest.mark.asyncio
+async def test_routed_calls_record_cost_of_served_model(tool_call_response):
+    """Test that the cost of a call follows the model named in the response, not the default prices."""
+    response = tool_call_response({"sections": []})
+    response.model = "gpt-4o-mini-2024-07-18"
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(return_value=response)
+    service = OpenAIService(client)
+    service.cache = InMemoryCache()
+
+    result = await service.analyze_resume_content("resume", model="gpt-4o-mini")
+    assert result["token_usage"]["total_cost"] == pytest.approx(estimate_cost(100, 10, "gpt-4o-mini-2024-07-18", 40))
+
+
+def test_build_token_usage_without_details():
+    """Test that responses without cache details count no cached tokens."""
+    usage = SimpleNamespace(total_tokens=150, prompt_tokens=100, completion_tokens=50)
+    assert _build_token_usage(usage, "gpt-4o-2024-08-06")["cached_tokens"] == 0
+
+
+@pytest.mark.asyncio
+async def test_job_match_request_layout():
+    """Test that the job match call sends the static prefix before the job and resume."""
+    response = MagicMock()
+    response.choices[0].message.function_call.arguments = '{"match_score": 80}'
+    response.usage = SimpleNamespace(total_tokens=10, prompt_tokens=8, completion_tokens=2)
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(return_value=response)
+
+    service = OpenAIService(client)
+    service.cache = InMemoryCache()
+    result = await service.analyze_job_match("my resume", "the job")
+
+    assert result["status"] == "success"
+    messages = client.chat.completions.create.call_args.kwargs["messages"]
+    assert [m["content"] for m in messages[1:]] == ["Job Description:\nthe job", "Resume:\nmy resume"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
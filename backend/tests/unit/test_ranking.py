@@ -0,0 +1,172 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.config import settings
+from app.dependencies import get_resume_analyzer
+from app.services.analysis_store import InMemoryAnalysisStore
+from app.services.cache import InMemoryCache
+from app.services.resume_analyzer import AnalysisNotFoundError, ResumeAnalyzer
+
+JOB_DESCRIPTION = "Backend engineer with Python, PostgreSQL and Kubernetes."
+
+RESUMES = [
+    "Java developer building Spring Boot services",
+    "Backend engineer: Python, PostgreSQL and Kubernetes",
+    "Python developer with PostgreSQL",
+    "Graphic designer"
+]
+
+TOKEN_USAGE = {"total_tokens": 10, "prompt_tokens": 8, "completion_tokens": 2, "total_cost": 0.001}
+
+
+@pytest.fixture
+def analyzer():
+    """Analyzer whose job matches score by the number of job skills in a resume."""
+    analyzer = ResumeAnalyzer()
+    analyzer.openai_service.cache = InMemoryCache()
+    analyzer.running = analyzer.peak = 0
+
+    async def analyze_job_match(resume_text, job_description, model=None, **options):
+        analyzer.running += 1
+        analyzer.peak = max(analyzer.peak, analyzer.running)
+        await asyncio.sleep(0.01)
+        analyzer.running -= 1
+        score = 30 * sum(skill in resume_text for skill in ("Python", "PostgreSQL", "Kubernetes"))
+        return {"status": "success", "content": {"match_score": score}, "token_usage": TOKEN_USAGE}
+
+    analyzer.openai_service.analyze_job_match = AsyncMock(side_effect=analyze_job_match)
+    analyzer.openai_service.analyze_resume_content = AsyncMock(return_value={
+        "status": "success",
+        "content": {"sections": []},
+        "token_usage": TOKEN_USAGE
+    })
+    return analyzer
+
+
+@pytest.mark.asyncio
+async def test_stream_rankings_limits_concurrency(analyzer, monkeypatch):
+    """Test that matches run at most RANKING_CONCURRENCY at a time and each one updates the ranking."""
+    monkeypatch.setattr(settings, "RANKING_CONCURRENCY", 2)
+    updates = [update async for update in await analyzer.stream_rankings(RESUMES * 2, JOB_DESCRIPTION, top_k=6)]
+
+    assert [update["completed"] for update in updates] == list(range(7))
+    assert updates[0]["rankings"][0]["jobMatchAnalysis"] is None
+    assert updates[-1]["done"] is True
+    assert analyzer.peak == 2
+    final = updates[-1]["rankings"]
+    assert [ranking["rank"] for ranking in final] == list(range(1, 9))
+    assert final[0]["jobMatchAnalysis"]["match_score"] == 90
+    assert final[-1]["jobMatchAnalysis"] is None
+    assert updates[-1]["tokenUsage"]["total_tokens"] == 60
+
+
+@pytest.mark.asyncio
+async def test_stream_rankings_matches_every_resume_the_same_way(analyzer):
+    """Test that all selected resumes are matched concurrently against the full job description."""
+    updates = [update async for update in await analyzer.stream_rankings(RESUMES, JOB_DESCRIPTION, top_k=3)]
+
+    assert [update["completed"] for update in updates] == [0, 1, 2, 3]
+    assert analyzer.peak == 3
+    jobs = {call.args[1] for call in analyzer.openai_service.analyze_job_match.await_args_list}
+    assert jobs == {JOB_DESCRIPTION}
+
+
+@pytest.mark.asyncio
+async def test_stream_rankings_reuses_stored_job_matches(analyzer):
+    """Test that resumes already analyzed against the job are ranked by their stored match."""
+    analyzer.analysis_store = InMemoryAnalysisStore()
+    matcher = analyzer.openai_service.analyze_job_match
+    analyzer.openai_service.analyze_job_match = AsyncMock(return_value={
+        "status": "success",
+        "content": {
+            "match_score": 95,
+            "technical_match": {"matched_skills": [], "missing_skills": [], "skill_coverage_score": 100},
+            "experience_match": {"required_years": 3, "actual_years": 4, "experience_score": 90},
+            "key_requirements": {"met": ["Python"], "partially_met": [], "not_met": []},
+            "recommendations": []
+        },
+        "token_usage": TOKEN_USAGE
+    })
+    result = await analyzer.analyze_resume(RESUMES[1], JOB_DESCRIPTION)
+    assert result["jobMatchAnalysis"]["match_score"] == 95
+    analyzer.openai_service.analyze_job_match = matcher
+
+    updates = [update async for update in await analyzer.stream_rankings(RESUMES, JOB_DESCRIPTION, top_k=3)]
+    final = updates[-1]
+    assert final["rankings"][0]["index"] == 1
+    assert final["rankings"][0]["jobMatchAnalysis"] == result["jobMatchAnalysis"]
+    matched = [call.args[0] for call in analyzer.openai_service.analyze_job_match.await_args_list]
+    assert RESUMES[1] not in matched
+    assert len(matched) == 2
+    assert final["tokenUsage"]["total_tokens"] == 20
+
+
+@pytest.mark.asyncio
+async def test_stream_rankings_rejects_empty_job(analyzer):
+    """Test that an empty job description fails before streaming."""
+    with pytest.raises(ValueError):
+        await analyzer.stream_rankings(RESUMES, "  ")
+
+
+def test_rank_endpoint_paginates(analyzer):
+    """Test ranking cached analyses and texts together, one page at a time."""
+    app.dependency_overrides[get_resume_analyzer] = lambda: analyzer
+    try:
+        client = TestClient(app)
+        analysis_id = client.post("/api/resume/analyze", json={"resume_text": RESUMES[1]}).json()["analysisId"]
+
+        response = client.post("/api/resume/rank", json={
+            "job_description": JOB_DESCRIPTION,
+            "analysis_ids": [analysis_id],
+            "resumes": [RESUMES[0], RESUMES[2], RESUMES[3]],
+            "page_size": 2
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 4
+        assert data["completed"] == data["matchTotal"] == 4
+        assert [r["candidateId"] for r in data["rankings"]] == [analysis_id, None]
+        assert [r["index"] for r in data["rankings"]] == [0, 2]
+
+        response = client.post("/api/resume/rank", json={
+            "job_description": JOB_DESCRIPTION, "resumes": RESUMES, "page": 2, "page_size": 3
+        })
+        assert [r["rank"] for r in response.json()["rankings"]] == [4]
+
+        response = client.post("/api/resume/rank", json={"job_description": JOB_DESCRIPTION, "analysis_ids": ["unknown"]})
+        assert response.status_code == 404
+        response = client.post("/api/resume/rank", json={"job_description": JOB_DESCRIPTION})
+        assert response.status_code == 400
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_rank_endpoint_streams_ndjson(analyzer):
+    """Test that the streaming mode sends the ranking after every finished match."""
+    app.dependency_overrides[get_resume_analyzer] = lambda: analyzer
+    try:
+        client = TestClient(app)
+        response = client.post("/api/resume/rank", json={
+            "job_description": JOB_DESCRIPTION, "resumes": RESUMES, "top_k": 2, "stream": True
+        })
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        updates = [json.loads(line) for line in response.text.splitlines()]
+        assert [update["completed"] for update in updates] == [0, 1, 2]
+        assert updates[-1]["rankings"][0]["jobMatchAnalysis"]["match_score"] == 90
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_resume_text(analyzer):
+    """Test that unknown analyses have no resume text."""
+    with pytest.raises(AnalysisNotFoundError):
+        await analyzer.get_resume_text("unknown")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,107 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.config import settings
+from app.dependencies import get_resume_analyzer
+from app.services.analysis_store import InMemoryAnalysisStore
+from app.services.cache import InMemoryCache
+from app.services.resume_analyzer import ResumeAnalyzer
+from app.services.resume_analyzer.pipeline import empty_token_usage
+from app.services.response_cache import cache_response, etag_matches, get_cached_response, make_etag
+
+RESUME = """Jane Doe
+EXPERIENCE
+- Reduced API latency by 35% by adding a read-through cache
+"""
+
+
+@pytest.fixture
+def analyzer():
+    analyzer = ResumeAnalyzer(analysis_store=InMemoryAnalysisStore())
+    analyzer.openai_service.cache = InMemoryCache()
+    analyzer.openai_service.analyze_resume_content = AsyncMock(return_value={
+        "status": "success",
+        "content": {"sections": [{"type": "Experience", "points": []}]},
+        "token_usage": {"total_tokens": 10, "prompt_tokens": 8, "completion_tokens": 2, "total_cost": 0.001}
+    })
+    app.dependency_overrides[get_resume_analyzer] = lambda: analyzer
+    yield analyzer
+    app.dependency_overrides.clear()
+
+
+def test_round_trip_keeps_bytes():
+    """Test that cached bodies come back byte for byte, with their ETag."""
+    cache = InMemoryCache()
+    body = json.dumps({"text": "résumé\nline"}).encode("utf-8")
+    stored = cache_response(cache, "analysis", "a1", body, ttl=60)
+    assert stored.etag == make_etag(body)
+    assert get_cached_response(cache, "analysis", "a1") == stored
+    assert get_cached_response(cache, "analysis", "a2") is None
+
+
+def test_etag_matches():
+    """Test If-None-Match lists, weak tags and wildcards."""
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_repeat_requests_are_served_from_cached_bytes(analyzer):
+    """Test that repeats skip the analyzer and spend no tokens, and matching ETags get a 304 on GET only."""
+    client = TestClient(app)
+    first = client.post("/api/resume/analyze", json={"resume_text": RESUME})
+    assert first.json()["tokenUsage"]["total_tokens"] == 10
+
+    with patch.object(analyzer, "analyze_resume", AsyncMock()) as analyze, \
+            patch.object(analyzer, "get_analysis") as get_analysis:
+        again = client.post("/api/resume/analyze", json={"resume_text": RESUME})
+        stored = client.get(f"/api/resume/analysis/{first.json()['analysisId']}")
+        etag = again.headers["etag"]
+        not_modified = client.get(
+            f"/api/resume/analysis/{first.json()['analysisId']}", headers={"If-None-Match": etag}
+        )
+        precondition_failed = client.post(
+            "/api/resume/analyze", json={"resume_text": RESUME}, headers={"If-None-Match": etag}
+        )
+        analyze.assert_not_called()
+        get_analysis.assert_not_called()
+
+    assert again.content == stored.content
+    assert again.json() == {**first.json(), "tokenUsage": empty_token_usage()}
+    assert stored.headers["etag"] == etag
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert precondition_failed.status_code == 412
+
+
+def test_cached_responses_match_stored_analyses(analyzer, monkeypatch):
+    """Test that a response cache hit and a stored analysis send the same body."""
+    client = TestClient(app)
+    first = client.post("/api/resume/analyze", json={"resume_text": RESUME})
+    cached = client.post("/api/resume/analyze", json={"resume_text": RESUME})
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+    stored = client.post("/api/resume/analyze", json={"resume_text": RESUME})
+    assert first.headers["etag"] != cached.headers["etag"]
+    assert cached.content == stored.content
+    assert cached.headers["etag"] == stored.headers["etag"]
+
+
+def test_disabled_response_cache(analyzer, monkeypatch):
+    """Test that responses still carry ETags but are regenerated when caching is off."""
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+    client = TestClient(app)
+    client.post("/api/resume/analyze", json={"resume_text": RESUME})
+    with patch.object(analyzer, "analyze_resume", wraps=analyzer.analyze_resume) as analyze:
+        again = client.post("/api/resume/analyze", json={"resume_text": RESUME})
+        third = client.post("/api/resume/analyze", json={"resume_text": RESUME})
+        assert analyze.call_count == 2
+    # Both repeats are served from storage, with the same body and ETag
+    assert again.headers["etag"] == third.headers["etag"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
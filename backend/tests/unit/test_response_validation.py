@@ -0,0 +1,79 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.dependencies import get_resume_analyzer
+from app.services.analysis_store import InMemoryAnalysisStore
+from app.services.cache import InMemoryCache
+from app.services.resume_analyzer import ResumeAnalyzer
+from app.services.resume_analyzer.pipeline import empty_token_usage
+from app.utils import validation
+from app.utils.validation import ValidatedResponse, dump_analysis_response, validate_analysis_response
+
+RESUME = """Jane Doe
+EXPERIENCE
+- Reduced API latency by 35% by adding a read-through cache
+"""
+
+RESPONSE = {
+    "status": "success",
+    "resumeAnalysis": {"sections": []},
+    "tokenUsage": {"total_tokens": 10, "prompt_tokens": 8, "completion_tokens": 2, "total_cost": 0.001}
+}
+
+
+def test_validation_fills_defaults_and_marks_trusted():
+    """Test that validated responses carry schema defaults and are not validated twice."""
+    validated = validate_analysis_response(RESPONSE)
+    assert isinstance(validated, ValidatedResponse)
+    assert validated["tokenUsage"]["cached_tokens"] == 0
+
+    with patch.object(validation, "_ANALYSIS_RESPONSE_ADAPTER") as adapter:
+        assert validate_analysis_response(validated) is validated
+        assert validate_analysis_response({"anything": 1}, trusted=True) == {"anything": 1}
+        adapter.validate_python.assert_not_called()
+
+
+def test_invalid_response_returns_error():
+    """Test that schema violations are reported rather than raised."""
+    result = validate_analysis_response({"status": "success"})
+    assert result["status"] == "error"
+    assert "Response validation failed" in result["message"]
+
+
+def test_dump_matches_json():
+    """Test that pre-serialized bytes hold the same JSON as the response."""
+    validated = validate_analysis_response(RESPONSE)
+    assert json.loads(dump_analysis_response(validated)) == validated
+
+
+def test_stored_analysis_is_validated_once():
+    """Test that analyses served again from storage skip validation."""
+    analyzer = ResumeAnalyzer(analysis_store=InMemoryAnalysisStore())
+    analyzer.openai_service.cache = InMemoryCache()
+    analyzer.openai_service.analyze_resume_content = AsyncMock(return_value={
+        "status": "success",
+        "content": {"sections": [{"type": "Experience", "points": []}]},
+        "token_usage": RESPONSE["tokenUsage"]
+    })
+    app.dependency_overrides[get_resume_analyzer] = lambda: analyzer
+    adapter = validation._ANALYSIS_RESPONSE_ADAPTER
+    try:
+        client = TestClient(app)
+        with patch.object(validation, "_ANALYSIS_RESPONSE_ADAPTER", wraps=adapter) as spy:
+            first = client.post("/api/resume/analyze", json={"resume_text": RESUME})
+            assert spy.validate_python.call_count == 1
+
+            again = client.post("/api/resume/analyze", json={"resume_text": RESUME})
+            stored = client.get(f"/api/resume/analysis/{first.json()['analysisId']}")
+            assert spy.validate_python.call_count == 1
+
+        assert again.headers["content-type"] == "application/json"
+        assert again.json() == stored.json() == {**first.json(), "tokenUsage": empty_token_usage()}
+    finally:
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
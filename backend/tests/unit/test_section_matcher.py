@@ -0,0 +1,90 @@
+import pytest
+from app.services.resume_analyzer.processors.section import (
+    DEFAULT_SECTION_MATCHER,
+    SectionHeaderMatcher,
+    split_into_sections,
+    split_into_typed_sections
+)
+
+SAMPLE_RESUME = """John Doe
+EXPERIENCE
+Software Engineer at Tech Corp
+- Improved system performance by 40%
+Skills: Python, Kubernetes
+EDUCATIONAL BACKGROUND
+BS in Computer Science
+PROJECTSResume Reviewer
+Expérience professionnelle
+Consultant chez Acme
+"""
+
+
+def test_matcher_header_forms():
+    """Test colon, standalone and run-together headers."""
+    match = DEFAULT_SECTION_MATCHER.match("Technical Skills: Python, Go")
+    assert match == ("SKILLS", "Technical Skills", "Python, Go")
+
+    match = DEFAULT_SECTION_MATCHER.match("Work Experience")
+    assert match == ("EXPERIENCE", "Work Experience", "")
+
+    match = DEFAULT_SECTION_MATCHER.match("PROJECTSResume Reviewer")
+    assert match == ("PROJECTS", "PROJECTS", "Resume Reviewer")
+
+    assert DEFAULT_SECTION_MATCHER.match("Led a team of five engineers") is None
+
+
+def test_matcher_is_case_insensitive_for_accents():
+    """Test that accented multilingual headers match regardless of case."""
+    match = DEFAULT_SECTION_MATCHER.match("expérience professionnelle")
+    assert match.section_type == "EXPERIENCE"
+    assert DEFAULT_SECTION_MATCHER.section_type("Educación") == "EDUCATION"
+
+
+def test_split_into_typed_sections():
+    """Test that sections come back with canonical types in document order."""
+    sections = split_into_typed_sections(SAMPLE_RESUME)
+    assert [section_type for section_type, _, _ in sections] == [
+        "GENERAL", "EXPERIENCE", "SKILLS", "EDUCATION", "PROJECTS", "EXPERIENCE"
+    ]
+    assert sections[1] == (
+        "EXPERIENCE",
+        "EXPERIENCE",
+        "Software Engineer at Tech Corp\n- Improved system performance by 40%"
+    )
+
+
+def test_split_into_sections_keeps_header_names():
+    """Test that the untyped split still returns the header names."""
+    sections = split_into_sections(SAMPLE_RESUME)
+    assert [header for header, _ in sections] == [
+        "GENERAL", "EXPERIENCE", "Skills", "EDUCATIONAL BACKGROUND",
+        "PROJECTS", "Expérience professionnelle"
+    ]
+    assert split_into_sections("   \n  ") == []
+
+
+def test_matcher_accepts_extra_header_dictionaries():
+    """Test that user-supplied header names extend the built-in dictionary."""
+    german = DEFAULT_SECTION_MATCHER.extended({
+        "experience": ["Berufserfahrung"],
+        "education": ["Ausbildung"],
+        "volunteering": ["Ehrenamt"]
+    })
+    text = "BERUFSERFAHRUNG\nEntwickler bei Acme\nAusbildung\nInformatik\nEhrenamt\nTrainer"
+    assert [t for t, _, _ in split_into_typed_sections(text, german)] == [
+        "EXPERIENCE", "EDUCATION", "VOLUNTEERING"
+    ]
+    # The default matcher is left unchanged
+    assert DEFAULT_SECTION_MATCHER.match("Berufserfahrung") is None
+
+
+def test_matcher_prefers_longest_header():
+    """Test that the longest header name wins when several share a prefix."""
+    matcher = SectionHeaderMatcher({"EXPERIENCE": ["EXPERIENCE", "EXPERIENCE SUMMARY"]})
+    assert matcher.match("Experience SummaryLed teams") == (
+        "EXPERIENCE", "EXPERIENCE SUMMARY", "Led teams"
+    )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,115 @@
+import pytest
+from unittest.mock import AsyncMock
+from app.services.cache import InMemoryCache
+from app.services.prompts import KNOWN_SKILLS_HEADER, job_match_user_messages
+from app.services.resume_analyzer import ResumeAnalyzer
+from app.services.resume_analyzer.processors.skills import (
+    build_skill_index,
+    default_skill_index,
+    match_skills,
+    merge_technical_match
+)
+
+RESUME = "Backend engineer. Python3, Postgres and k8s on AWS. Some JavaScript."
+JOB_DESCRIPTION = "We need Python, PostgreSQL, Kubernetes and Kafka. Go-getters welcome."
+
+
+def test_extract_normalizes_aliases():
+    """Test that aliases map to one canonical skill in order of first mention."""
+    index = default_skill_index()
+    assert index.extract(RESUME) == ["Python", "PostgreSQL", "Kubernetes", "AWS", "JavaScript"]
+    assert index.extract("React Native and React, Node.js, micro-services") == [
+        "React Native", "React", "Node.js", "Microservices"
+    ]
+
+
+def test_extract_respects_word_boundaries():
+    """Test that skills inside longer words or plain English are not matched."""
+    index = default_skill_index()
+    assert index.extract("javascript") == ["JavaScript"]
+    assert index.extract("Go-getters who excel at spring cleaning") == []
+    assert index.extract("C++ and C#") == ["C++", "C#"]
+
+
+def test_extract_skips_ambiguous_words():
+    """Test that plain English words and acronyms with other meanings are not taken for skills."""
+    index = default_skill_index()
+    assert index.extract("A demo that sparked interest in the team") == []
+    assert index.extract("Added guard rails to the deploy process") == []
+    assert index.extract("An agile team with 5 ml of algorithms and containerization on aks") == []
+    assert index.extract("Ruby on Rails, PySpark and Amazon EKS") == ["Ruby on Rails", "Spark", "Kubernetes"]
+
+
+def test_custom_taxonomy():
+    """Test that longer aliases win over their parts."""
+    index = build_skill_index({"Vue": ("vue",), "Vue Router": ("vue router",)})
+    assert index.extract("Vue router with Vue") == ["Vue Router", "Vue"]
+    assert index.canonicalize("  vue  ROUTER ") == "Vue Router"
+    assert index.canonicalize("Leadership") == "Leadership"
+
+
+def test_match_skills():
+    """Test the deterministic technical match."""
+    assert match_skills(RESUME, JOB_DESCRIPTION) == {
+        "matched_skills": ["Python", "PostgreSQL", "Kubernetes"],
+        "missing_skills": ["Kafka"],
+        "skill_coverage_score": 75.0
+    }
+    assert match_skills(RESUME, "Great communicator")["skill_coverage_score"] == 0.0
+
+
+def test_merge_keeps_llm_verdicts_and_adds_taxonomy_skills():
+    """Test that taxonomy skills only add to the LLM's technical match and are not duplicated."""
+    local = match_skills(RESUME, JOB_DESCRIPTION)
+    merged = merge_technical_match(local, {
+        "matched_skills": ["python", "K8s", "Kafka", "Stakeholder management"],
+        "missing_skills": ["Apache Kafka", "Go-to-market"],
+        "skill_coverage_score": 90
+    })
+    assert merged == {
+        "matched_skills": ["Python", "Kubernetes", "Kafka", "Stakeholder management", "PostgreSQL"],
+        "missing_skills": ["Go-to-market"],
+        "skill_coverage_score": 90
+    }
+    # Without an LLM score one is computed over the merged lists
+    assert merge_technical_match(local, None)["skill_coverage_score"] == 75.0
+
+
+def test_known_skills_are_sent_to_the_model():
+    """Test that locally matched skills are listed after the job and resume."""
+    messages = job_match_user_messages("resume", "job", known_skills=match_skills(RESUME, JOB_DESCRIPTION))
+    assert messages[2] == (
+        f"{KNOWN_SKILLS_HEADER}\nMatched: Python, PostgreSQL, Kubernetes\nMissing: Kafka"
+    )
+    assert len(job_match_user_messages("resume", "job", known_skills=match_skills("", "Nothing"))) == 2
+
+
+@pytest.mark.asyncio
+async def test_analyzer_merges_technical_match():
+    """Test that job matches carry the merged technical match."""
+    analyzer = ResumeAnalyzer()
+    analyzer.openai_service.cache = InMemoryCache()
+    llm_content = {
+        "match_score": 70,
+        "technical_match": {"matched_skills": ["Python"], "missing_skills": ["Kubernetes"], "skill_coverage_score": 50}
+    }
+    analyzer.openai_service.analyze_job_match = AsyncMock(return_value={
+        "status": "success",
+        "content": llm_content,
+        "token_usage": {"total_tokens": 10, "prompt_tokens": 8, "completion_tokens": 2, "total_cost": 0.001}
+    })
+
+    result = await analyzer._match_job(RESUME, JOB_DESCRIPTION)
+    assert result["content"]["technical_match"] == {
+        "matched_skills": ["Python", "PostgreSQL"],
+        "missing_skills": ["Kubernetes", "Kafka"],
+        "skill_coverage_score": 50
+    }
+    assert result["content"]["match_score"] == 70
+    assert analyzer.openai_service.analyze_job_match.call_args.kwargs["known_skills"]["missing_skills"] == ["Kafka"]
+    # The service's (possibly cached) content is left untouched
+    assert llm_content["technical_match"]["missing_skills"] == ["Kubernetes"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,119 @@
+import pytest
+from types import SimpleNamespace
+from typing import Optional
+from unittest.mock import AsyncMock, MagicMock
+from pydantic import BaseModel, Field, ValidationError
+from app.services.cache import InMemoryCache
+from app.services.openai_service import (
+    JOB_MATCH_FUNCTIONS,
+    RESUME_ANALYSIS_FUNCTIONS,
+    OpenAIService,
+    _parse_function_arguments
+)
+from app.utils.schema import strict_json_schema
+from app.utils.validation import ResumeSectionsAnalysis
+
+EDUCATION_ENTRY = {
+    "text": "BS Computer Science, MIT, 2018",
+    "subject": "Computer Science",
+    "course": "BS",
+    "school": "MIT",
+    "subject_course_school_reputation": {
+        "domestic_score": 10,
+        "domestic_score_rationale": "Top ranked program nationally",
+        "international_score": 10,
+        "international_score_rationale": "Top ranked program worldwide"
+    }
+}
+
+
+def _objects(schema):
+    """Yield every object schema node."""
+    if isinstance(schema, dict):
+        if schema.get("type") == "object":
+            yield schema
+        for value in schema.values():
+            yield from _objects(value)
+    elif isinstance(schema, list):
+        for item in schema:
+            yield from _objects(item)
+
+
+@pytest.mark.parametrize("functions", [RESUME_ANALYSIS_FUNCTIONS, JOB_MATCH_FUNCTIONS])
+def test_function_schemas_are_strict(functions):
+    """Test that every object is closed and requires all of its properties."""
+    parameters = functions[0]["parameters"]
+    objects = list(_objects(parameters))
+    assert objects
+    for node in objects:
+        assert node["additionalProperties"] is False
+        assert node["required"] == list(node["properties"])
+    for keyword in ("oneOf", "minimum", "maximum", "title"):
+        assert f'"{keyword}"' not in str(parameters).replace("'", '"')
+
+
+def test_strict_schema_keeps_property_names_and_inlines_refs():
+    """Test that keyword stripping does not touch property names."""
+    class Inner(BaseModel):
+        value: int = Field(ge=0)
+
+    class Outer(BaseModel):
+        title: str = "untitled"
+        inner: Inner = Field(description="Nested model")
+        note: Optional[str] = None
+
+    schema = strict_json_schema(Outer)
+    assert list(schema["properties"]) == ["title", "inner", "note"]
+    assert schema["properties"]["title"] == {"type": "string"}
+    assert schema["properties"]["inner"] == {"$ref": "#/$defs/Inner"}
+    assert schema["$defs"]["Inner"]["properties"]["value"] == {"type": "integer"}
+    assert schema["required"] == ["title", "inner", "note"]
+
+
+def test_output_validates_against_source_model():
+    """Test that outputs are validated with the models the schema came from."""
+    output = {"sections": [{"type": "Education", "points": [EDUCATION_ENTRY]}]}
+    ResumeSectionsAnalysis.model_validate(output)
+
+    out_of_range = {**EDUCATION_ENTRY}
+    out_of_range["subject_course_school_reputation"] = {
+        **EDUCATION_ENTRY["subject_course_school_reputation"], "domestic_score": 11
+    }
+    with pytest.raises(ValidationError):
+        ResumeSectionsAnalysis.model_validate({"sections": [{"type": "Education", "points": [out_of_range]}]})
+
+
+@pytest.mark.asyncio
+async def test_invalid_output_is_not_cached(tool_call_response):
+    """Test that output failing validation is returned but requested again next time."""
+    invalid = {"sections": [{"type": "Education", "points": [{**EDUCATION_ENTRY, "school": None}]}]}
+    valid = {"sections": [{"type": "Education", "points": [EDUCATION_ENTRY]}]}
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(side_effect=[
+        tool_call_response(invalid), tool_call_response(valid), tool_call_response(valid)
+    ])
+    service = OpenAIService(client)
+    service.cache = InMemoryCache()
+
+    results = [await service.analyze_resume_content("resume") for _ in range(3)]
+
+    assert [result["content"] for result in results] == [invalid, valid, valid]
+    assert client.chat.completions.create.await_count == 2
+
+
+def test_parse_function_arguments():
+    """Test parsing tool call arguments with a fallback to legacy function calls."""
+    tool_message = SimpleNamespace(
+        tool_calls=[SimpleNamespace(function=SimpleNamespace(arguments='{"sections": []}'))]
+    )
+    assert _parse_function_arguments(tool_message) == {"sections": []}
+
+    legacy_message = SimpleNamespace(
+        tool_calls=None,
+        function_call=SimpleNamespace(arguments='{"match_score": 80}')
+    )
+    assert _parse_function_arguments(legacy_message) == {"match_score": 80}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,79 @@
+import pytest
+from app.services.cache import make_cache_key
+from app.services.resume_analyzer.processors.normalize import normalize_text
+
+
+def test_normalize_collapses_whitespace():
+    """Test that spaces, tabs and blank lines are collapsed."""
+    text = "  EXPERIENCE \n\n\n\nSoftware   Engineer\t at  Tech Corp  \n\n"
+    assert normalize_text(text) == "EXPERIENCE\n\nSoftware Engineer at Tech Corp"
+
+
+def test_normalize_unifies_bullets_and_quotes():
+    """Test that bullet glyphs and typographic quotes are mapped to one style."""
+    text = "\u2022 Led \u201cProject X\u201d\n\u25aa Built the team\u2019s API\n\uf0b7 Cut costs \u2014 by 20%\n* Shipped v2"
+    assert normalize_text(text) == (
+        "- Led \"Project X\"\n"
+        "- Built the team's API\n"
+        "- Cut costs - by 20%\n"
+        "- Shipped v2"
+    )
+
+
+def test_normalize_keeps_negative_numbers():
+    """Test that a leading minus sign is not mistaken for a bullet."""
+    assert normalize_text("-5% churn") == "-5% churn"
+
+
+def test_normalize_dehyphenates_line_breaks():
+    """Test that words split across lines by PDF extraction are joined."""
+    assert normalize_text("Led the develop-\nment of a pipeline") == "Led the development of a pipeline"
+    assert normalize_text("Worked 2019-\n2021") == "Worked 2019-\n2021"
+
+
+def test_normalize_strips_headers_and_footers():
+    """Test that page numbers and repeated running headers are removed."""
+    text = (
+        "Jane Doe - Resume\nEXPERIENCE\n- Built things\nPage 1 of 2\n"
+        "\f"
+        "Jane Doe - Resume\nPROJECTS\n- Built more things\nPage 2 of 2\n"
+    )
+    assert normalize_text(text) == (
+        "Jane Doe - Resume\nEXPERIENCE\n- Built things\n\nPROJECTS\n- Built more things"
+    )
+
+
+def test_normalize_keeps_numbers_without_page_breaks():
+    """Test that short number lines are kept in documents without page breaks."""
+    assert normalize_text("LANGUAGES\nPython\n5\nyears") == "LANGUAGES\nPython\n5\nyears"
+
+
+def test_normalize_keeps_edge_lines_that_differ_in_digits():
+    """Test that page edge lines differing only in numbers are not treated as running headers."""
+    text = "Engineer, 2019 - 2021\n- Built things\fEngineer, 2016 - 2019\n- Built more things"
+    assert normalize_text(text) == (
+        "Engineer, 2019 - 2021\n- Built things\nEngineer, 2016 - 2019\n- Built more things"
+    )
+
+
+def test_normalize_removes_invisible_characters():
+    """Test that zero-width characters, soft hyphens and ligatures are cleaned up."""
+    assert normalize_text("\ufeffPro\u200bfi\u00adcient in e\ufb03cient code") == "Proficient in efficient code"
+
+
+def test_normalize_is_idempotent():
+    """Test that normalizing twice gives the same result as normalizing once."""
+    text = "\u2022 Led  \u201cProject X\u201d\n\n\n devel-\nopment\fPage 2"
+    once = normalize_text(text)
+    assert normalize_text(once) == once
+
+
+def test_cosmetic_variants_share_cache_key():
+    """Test that cosmetically different resumes map to the same cache key."""
+    variant_a = "EXPERIENCE\n\u2022 Improved performance by 40%\n"
+    variant_b = "EXPERIENCE  \r\n\u25cf  Improved  performance by 40%\r\n\r\n"
+    assert make_cache_key(normalize_text(variant_a)) == make_cache_key(normalize_text(variant_b))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
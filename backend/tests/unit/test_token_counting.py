@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import patch
+from app.services.resume_analyzer.utils import token
+from app.services.resume_analyzer.utils.token import (
+    CHARS_PER_TOKEN,
+    count_message_tokens,
+    count_tokens,
+    count_tokens_batch,
+    get_encoding
+)
+from app.services.resume_analyzer.processors.section import estimate_tokens
+
+
+class FakeEncoding:
+    """Whitespace tokenizer standing in for a tiktoken encoding."""
+
+    def encode_ordinary(self, text):
+        return text.split()
+
+    def encode_ordinary_batch(self, texts):
+        return [text.split() for text in texts]
+
+
+@pytest.fixture
+def fake_encoding():
+    """Route token counting through the fake encoding."""
+    with patch.object(token, "get_encoding", return_value=FakeEncoding()):
+        yield
+
+
+def test_count_tokens_uses_encoding(fake_encoding):
+    """Test that counts come from the encoder rather than the length heuristic."""
+    assert count_tokens("Expérience professionnelle en Python", "gpt-4o") == 4
+    assert estimate_tokens("Built a data pipeline") == 4
+
+
+def test_count_tokens_batch_matches_single(fake_encoding):
+    """Test that batch counting gives the same counts as counting one by one."""
+    texts = ["Led a team of five", "", "Reduced latency by 40%"]
+    assert count_tokens_batch(texts) == [count_tokens(text) for text in texts]
+
+
+def test_count_message_tokens_includes_overhead(fake_encoding):
+    """Test that chat formatting overhead is added to message content tokens."""
+    messages = [
+        {"role": "system", "content": "You analyze resumes"},
+        {"role": "user", "content": "Built things"}
+    ]
+    expected = 3 + 2 + token.TOKENS_PER_MESSAGE * 2 + token.TOKENS_PER_REPLY
+    assert count_message_tokens(messages) == expected
+
+
+def test_count_tokens_falls_back_without_encoding():
+    """Test that the character heuristic is used when no encoding can be loaded."""
+    with patch.object(token, "get_encoding", return_value=None):
+        text = "x" * 40
+        assert count_tokens(text) == 40 // CHARS_PER_TOKEN
+        assert count_tokens_batch([text, "abcd"]) == [10, 1]
+
+
+def test_get_encoding_is_loaded_once():
+    """Test that the encoder for a model is only loaded on the first call."""
+    get_encoding.cache_clear()
+    try:
+        with patch.object(token.tiktoken, "encoding_for_model", side_effect=KeyError("unknown")), \
+             patch.object(token.tiktoken, "get_encoding", return_value=FakeEncoding()) as mock_get:
+            first = get_encoding("gpt-4o-2024-08-06")
+            second = get_encoding("gpt-4o-2024-08-06")
+        assert first is second
+        mock_get.assert_called_once_with("o200k_base")
+    finally:
+        get_encoding.cache_clear()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,109 @@
+import pytest
+import tenacity
+from unittest.mock import AsyncMock, MagicMock
+from app.core import tracing
+from app.services import openai_service
+from app.services.analysis_store import InMemoryAnalysisStore
+from app.services.cache import InMemoryCache
+from app.services.openai_service import OpenAIService
+from app.services.resume_analyzer import ResumeAnalyzer
+
+pytest.importorskip("opentelemetry.sdk")
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+MODEL = "tracing-test-model"
+
+
+@pytest.fixture
+def spans():
+    exporter = InMemorySpanExporter()
+    assert tracing.configure_tracing(span_processor=SimpleSpanProcessor(exporter))
+    yield exporter
+    tracing.disable_tracing()
+
+
+def _named(exporter, name):
+    return [span for span in exporter.get_finished_spans() if span.name == name]
+
+
+def test_spans_are_noops_when_disabled():
+    """Test that nothing is recorded without a configured exporter."""
+    tracing.disable_tracing()
+    assert not tracing.configure_tracing(exporter="")
+    with tracing.span("unused", some__attribute=1) as span:
+        span.set_attribute("other", 2)
+    tracing.set_attributes(ignored=True)
+    assert not tracing.tracing_enabled()
+
+
+@pytest.mark.asyncio
+async def test_llm_call_attributes(spans, tool_call_response):
+    """Test model, token counts and cache hits on LLM spans, with cache lookups as children."""
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(return_value=tool_call_response({
+        "situation_rationale": "No context", "action_rationale": "Built it", "result_rationale": "No outcome"
+    }))
+    service = OpenAIService(client)
+    service.cache = InMemoryCache()
+
+    star = {"situation": False, "action": True, "result": False, "complete": False}
+    await service.explain_point("Experience", "Built a cache", star, model=MODEL)
+    await service.explain_point("Experience", "Built a cache", star, model=MODEL)
+
+    first, second = _named(spans, "openai.explain_point")
+    assert first.attributes["llm.model"] == MODEL
+    assert first.attributes["llm.cache_hit"] is False
+    assert first.attributes["llm.prompt_tokens"] == 100
+    assert first.attributes["llm.cached_tokens"] == 40
+    assert second.attributes["llm.cache_hit"] is True
+
+    lookups = _named(spans, "cache.get")
+    assert [lookup.attributes["cache.hit"] for lookup in lookups] == [False, True]
+    assert lookups[0].attributes["cache.namespace"] == "star_rationale"
+    assert lookups[0].parent.span_id == first.context.span_id
+
+
+@pytest.mark.asyncio
+async def test_retries_are_counted_on_one_span(spans, monkeypatch, tool_call_response):
+    """Test that retried calls are one span with their retry count."""
+    monkeypatch.setattr(openai_service, "RETRY_WAIT", tenacity.wait_none())
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(side_effect=[
+        TimeoutError("Request timed out"),
+        tool_call_response({"sections": [{"type": "Skills", "points": []}]})
+    ])
+    service = OpenAIService(client)
+
+    result = await service.analyze_section("Skills", "Python", model=MODEL)
+
+    assert result["status"] == "success"
+    span, = _named(spans, "openai.analyze_section")
+    assert span.attributes["llm.retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_analysis_stages_are_child_spans(spans):
+    """Test that each pipeline stage is traced under its analysis."""
+    analyzer = ResumeAnalyzer(analysis_store=InMemoryAnalysisStore())
+    analyzer.openai_service.cache = InMemoryCache()
+    analyzer.openai_service.analyze_resume_content = AsyncMock(return_value={
+        "status": "success",
+        "content": {"sections": [{"type": "Experience", "points": []}]},
+        "token_usage": {"total_tokens": 10, "prompt_tokens": 8, "completion_tokens": 2, "total_cost": 0.001}
+    })
+
+    await analyzer.analyze_resume("Jane Doe\nEXPERIENCE\n- Built a cache")
+
+    analysis, = _named(spans, "analyze_resume")
+    assert analysis.attributes["analysis.status"] == "success"
+    assert analysis.attributes["llm.total_tokens"] == 10
+    stages = [
+        span for span in spans.get_finished_spans()
+        if span.name.startswith("analysis.") and span.parent.span_id == analysis.context.span_id
+    ]
+    assert [span.name for span in stages] == [f"analysis.{name}" for name in analyzer.pipeline.stage_names]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])